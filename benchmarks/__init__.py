@@ -0,0 +1 @@
+# Бенчмарки производительности (запуск из корня репозитория: python -m benchmarks.<модуль>)
@@ -0,0 +1,45 @@
+"""
+Бенчмарк генерации config.xml и meta.json на синтетических моделях.
+
+При удвоении числа классов время должно расти примерно вдвое
+(индекс агрегаций делает генерацию линейной).
+
+Запуск: python -m benchmarks.bench_model_index
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import write_model_xml
+from model.parser import ModelParser
+
+SIZES = (1_000, 2_000, 4_000, 8_000, 16_000)
+
+
+def bench(classes: int) -> float:
+    """Время генерации обоих артефактов для модели из classes классов"""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False) as tmp:
+        write_model_xml(tmp, classes)
+    try:
+        parser = ModelParser(tmp.name)
+        parser.parse()
+        start = time.perf_counter()
+        parser.generate_config_xml()
+        parser.generate_meta_json()
+        return time.perf_counter() - start
+    finally:
+        os.unlink(tmp.name)
+
+
+def main() -> None:
+    previous = None
+    print(f"{'classes':>10} {'time, s':>10} {'ratio':>8}")
+    for classes in SIZES:
+        elapsed = bench(classes)
+        ratio = f"{elapsed / previous:.2f}" if previous else '-'
+        print(f"{classes:>10} {elapsed:>10.4f} {ratio:>8}")
+        previous = elapsed
+
+
+if __name__ == '__main__':
+    main()
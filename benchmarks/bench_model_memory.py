@@ -0,0 +1,50 @@
+"""
+Бенчмарк памяти разобранной модели на синтетических моделях.
+
+Измеряется память, удерживаемая ModelParser после разбора (tracemalloc),
+в пересчёте на класс модели.
+
+Запуск: python -m benchmarks.bench_model_memory
+"""
+import gc
+import os
+import tempfile
+import tracemalloc
+
+from benchmarks.synthetic import write_model_xml
+from model.parser import ModelParser
+
+SIZES = (10_000, 50_000, 100_000)
+ATTRIBUTES = 8
+
+
+def bench(classes: int) -> int:
+    """Память (в байтах), занимаемая разобранной моделью из classes классов"""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False) as tmp:
+        write_model_xml(tmp, classes, ATTRIBUTES)
+    try:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            parser = ModelParser(tmp.name)
+            parser.parse(streaming=True)
+            gc.collect()
+            retained = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        del parser
+        return retained
+    finally:
+        os.unlink(tmp.name)
+
+
+def main() -> None:
+    print(f"{'classes':>10} {'retained, MiB':>14} {'bytes/class':>12}")
+    for classes in SIZES:
+        retained = bench(classes)
+        print(f"{classes:>10} {retained / (1 << 20):>14.2f} {retained // classes:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Бенчмарк параллельного разбора модели, выгруженной несколькими файлами.
+
+Время разбора фрагментов в пуле процессов должно определяться самым
+большим фрагментом (плюс запуск пула и объединение), а не суммой всех.
+
+Запуск: python -m benchmarks.bench_sharded_parse
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import write_model_shards
+from model.parser import ModelParser
+
+CLASSES = 200_000
+SHARDS = (1, 2, 4, 8)
+
+
+def bench(xml_file) -> float:
+    """Время разбора модели из одного файла или списка фрагментов"""
+    start = time.perf_counter()
+    ModelParser(xml_file).parse()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'shards':>8} {'all, s':>10} {'largest, s':>12}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for shards in SHARDS:
+            paths = [os.path.join(temp_dir, f"shard{shards}_{i}.xml") for i in range(shards)]
+            write_model_shards(paths, CLASSES)
+            elapsed = bench(paths[0] if shards == 1 else paths)
+            # Самый большой фрагмент отдельно (без проверки модели)
+            largest = max(paths, key=os.path.getsize)
+            start = time.perf_counter()
+            ModelParser(largest)._read(largest, streaming=False)
+            largest_time = time.perf_counter() - start
+            print(f"{shards:>8} {elapsed:>10.3f} {largest_time:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Бенчмарк холодного запуска команд main.py (в стиле python -X importtime).
+
+Каждая команда запускается в отдельном интерпретаторе несколько раз;
+выводятся медианы общего времени процесса и суммарного времени импорта
+и число загруженных модулей. Команды delta и apply вызываются из скриптов
+тысячи раз, поэтому для них проверяется, что тяжёлые модули (xml.etree,
+пул процессов) не импортируются, а время импорта укладывается в бюджет:
+при нарушении код возврата 1.
+
+Бюджет задан отношением к времени импорта эталонного набора модулей
+стандартной библиотеки, без которых команды не обходятся. Эталон
+замеряется вперемежку с командой, поэтому отношение почти не зависит
+от машины и её загрузки.
+
+Запуск: python -m benchmarks.bench_startup [-n 9]
+"""
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+TEST_DATA = ROOT / 'tests' / 'test_data'
+
+# Модули, которые не должны загружаться командами быстрого пути
+FORBIDDEN = ('xml.etree', 'multiprocessing', 'concurrent.futures')
+FAST_COMMANDS = ('delta', 'apply')
+
+# Модули, которые нужны любой команде: разбор JSON, журнал, пути, аннотации
+REFERENCE_IMPORTS = 'import json, logging, pathlib, typing'
+# Во сколько раз импорт быстрой команды может превышать импорт эталона:
+# собственные модули проекта добавляют к нему 10-25%, а argparse
+# со справкой (shutil, locale) — ещё около 15%
+IMPORT_BUDGET = {'delta': 1.3, 'apply': 1.3}
+
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def commands(work_dir: Path) -> Dict[str, List[str]]:
+    """Аргументы команд на копиях тестовых данных"""
+    config = work_dir / 'config.json'
+    patched = work_dir / 'patched_config.json'
+    model = work_dir / 'model.xml'
+    shutil.copy(TEST_DATA / 'config_original.json', config)
+    shutil.copy(TEST_DATA / 'config_patched.json', patched)
+    shutil.copy(TEST_DATA / 'model.xml', model)
+    out = work_dir / 'out'
+    return {
+        'model': ['--output-dir', str(out), 'model', '--xml', str(model)],
+        'delta': ['--output-dir', str(out), 'delta', '--config', str(config), '--patched-config', str(patched)],
+        'apply': ['--output-dir', str(out), 'apply', '--config', str(config)],
+    }
+
+
+def run_once(args: List[str], work_dir: Path) -> Tuple[float, int, Set[str]]:
+    """Время процесса, суммарное время импорта (мкс) и загруженные модули"""
+    # Замеряется обычный запуск с кэшем байт-кода, даже если его запись отключена
+    env = {key: value for key, value in os.environ.items() if key != 'PYTHONDONTWRITEBYTECODE'}
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=work_dir, env=env, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"Команда {args} завершилась с кодом {proc.returncode}:\n{proc.stderr}")
+
+    total = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            modules.add(match.group(4))
+            if len(match.group(3)) == 1:
+                total += int(match.group(2))  # Импорты верхнего уровня
+    return elapsed, total, modules
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--repeat', type=int, default=9, help="Запусков на команду")
+    args = parser.parse_args(argv)
+
+    failed = False
+    print(f"{'command':>8} {'wall, ms':>10} {'imports, ms':>12} {'ratio':>6} {'modules':>8}  heavy")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        for name, command in commands(work_dir).items():
+            runs, ratios = [], []
+            for _ in range(args.repeat):
+                runs.append(run_once([str(ROOT / 'main.py'), *command], work_dir))
+                reference = run_once(['-c', REFERENCE_IMPORTS], work_dir)[1]
+                ratios.append(runs[-1][1] / reference)
+            wall = statistics.median(run[0] for run in runs)
+            imports = statistics.median(run[1] for run in runs)
+            ratio = statistics.median(ratios)
+            modules = runs[-1][2]
+            heavy = sorted({prefix for prefix in FORBIDDEN
+                            for module in modules if module == prefix or module.startswith(prefix + '.')})
+            print(f"{name:>8} {wall * 1000:>10.1f} {imports / 1000:>12.1f} {ratio:>6.2f} {len(modules):>8}  "
+                  f"{', '.join(heavy) or '-'}")
+            if name not in FAST_COMMANDS:
+                continue
+            if heavy:
+                print(f"Команда {name} загружает тяжёлые модули", file=sys.stderr)
+                failed = True
+            if ratio > IMPORT_BUDGET[name]:
+                print(f"Импорт команды {name} в {ratio:.2f} раза дольше эталона "
+                      f"(бюджет {IMPORT_BUDGET[name]})", file=sys.stderr)
+                failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,206 @@
+"""
+Бенчмарки парсера и обработчика конфигураций на синтетических данных.
+
+Для каждого сценария измеряются время (лучшее из нескольких запусков)
+и пиковая память (tracemalloc, отдельным запуском). Результаты пишутся
+в JSON и сравниваются с сохранённым базовым прогоном.
+
+Запуск:
+    python -m benchmarks.harness --profile quick
+    python -m benchmarks.harness --profile full --output bench_results.json
+    python -m benchmarks.harness --save-baseline   # обновить benchmarks/baseline.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic import make_config_pair, write_model_xml
+from model import json_stream
+from model.config_processor import ConfigProcessor
+from model.parser import ModelParser
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+
+# Порог шума: более мелкие базовые значения не сравниваются
+NOISE_FLOOR = {'seconds': 0.001, 'peak_bytes': 64 << 10}
+
+# Размеры синтетических входов для каждого профиля
+PROFILES = {
+    'quick': {
+        'models': [
+            {'classes': 1_000, 'attributes': 4, 'fanout': 4, 'depth': None},
+        ],
+        'configs': [
+            {'keys': 1_000, 'change_ratio': 0.05},
+            {'keys': 100_000, 'change_ratio': 0.05},
+        ],
+    },
+    'full': {
+        'models': [
+            {'classes': 1_000, 'attributes': 4, 'fanout': 4, 'depth': None},
+            {'classes': 10_000, 'attributes': 8, 'fanout': 8, 'depth': None},
+            {'classes': 10_000, 'attributes': 2, 'fanout': 2, 'depth': 200},
+            {'classes': 100_000, 'attributes': 4, 'fanout': 16, 'depth': None},
+        ],
+        'configs': [
+            {'keys': 1_000, 'change_ratio': 0.05},
+            {'keys': 100_000, 'change_ratio': 0.05},
+            {'keys': 1_000_000, 'change_ratio': 0.01},
+            {'keys': 10_000_000, 'change_ratio': 0.001},
+        ],
+    },
+}
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Лучшее время из repeat запусков и пиковая память отдельного запуска"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': best, 'peak_bytes': peak}
+
+
+def bench_model(params: Dict, repeat: int, work_dir: str) -> List[Dict]:
+    """Сценарии ModelParser для одной синтетической модели"""
+    xml_path = os.path.join(work_dir, 'model.xml')
+    with open(xml_path, 'w', encoding='utf-8') as f:
+        write_model_xml(f, params['classes'], params['attributes'], params['fanout'], params['depth'])
+
+    parser = ModelParser(xml_path)
+    parser.parse()
+    meta = parser.generate_meta_json()
+    label = 'classes={classes},attrs={attributes},fanout={fanout},depth={depth}'.format(**params)
+
+    def parse():
+        ModelParser(xml_path).parse()
+
+    cases = {
+        'ModelParser.parse': parse,
+        'generate_config_xml': lambda: parser.write_config_xml(io.StringIO()),
+        'generate_meta_json': parser.generate_meta_json,
+        'write_meta_json': lambda: json_stream.dump(meta, io.StringIO()),
+    }
+    return [
+        {'name': name, 'input': label, **measure(func, repeat)}
+        for name, func in cases.items()
+    ]
+
+
+def bench_config(params: Dict, repeat: int, work_dir: str) -> List[Dict]:
+    """Сценарии ConfigProcessor для одной синтетической пары конфигураций"""
+    original, patched = make_config_pair(params['keys'], params['change_ratio'])
+    delta = ConfigProcessor.generate_delta(original, patched)
+    result = ConfigProcessor.apply_delta(original, delta)
+    output_path = os.path.join(work_dir, 'config.json')
+    label = 'keys={keys},change_ratio={change_ratio}'.format(**params)
+
+    cases = {
+        'generate_delta': lambda: ConfigProcessor.generate_delta(original, patched),
+        'apply_delta': lambda: ConfigProcessor.apply_delta(original, delta),
+        'save_config': lambda: ConfigProcessor.save_config(result, output_path),
+    }
+    return [
+        {'name': name, 'input': label, **measure(func, repeat)}
+        for name, func in cases.items()
+    ]
+
+
+def run(profile: str, repeat: int) -> Dict:
+    """Прогон всех сценариев профиля"""
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for params in PROFILES[profile]['models']:
+            results.extend(bench_model(params, repeat, work_dir))
+        for params in PROFILES[profile]['configs']:
+            results.extend(bench_config(params, repeat, work_dir))
+
+    return {
+        'profile': profile,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Сценарии, ставшие медленнее или прожорливее базовых более чем на tolerance"""
+    base = {(r['name'], r['input']): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        reference = base.get((result['name'], result['input']))
+        if reference is None:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            if reference[metric] < NOISE_FLOOR[metric]:
+                continue
+            if result[metric] > reference[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{result['name']} [{result['input']}]: {metric} "
+                    f"{reference[metric]:.4g} -> {result[metric]:.4g}"
+                )
+    return regressions
+
+
+def print_table(report: Dict) -> None:
+    print(f"{'scenario':<22} {'input':<48} {'time, s':>10} {'peak, MiB':>10}")
+    for r in report['results']:
+        print(f"{r['name']:<22} {r['input']:<48} {r['seconds']:>10.4f} "
+              f"{r['peak_bytes'] / (1 << 20):>10.2f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки на синтетических данных")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick')
+    parser.add_argument('--repeat', type=int, default=3, help="Число запусков для замера времени")
+    parser.add_argument('--output', type=Path, help="Файл для результатов в формате JSON")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help="Базовый прогон")
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="Допустимое ухудшение относительно базового прогона (доля)")
+    parser.add_argument('--save-baseline', action='store_true', help="Сохранить прогон как базовый")
+    args = parser.parse_args(argv)
+
+    report = run(args.profile, args.repeat)
+    print_table(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=4), encoding='utf-8')
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=4), encoding='utf-8')
+        print(f"Базовый прогон сохранён: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"Базовый прогон {args.baseline} не найден, сравнение пропущено")
+        return 0
+
+    regressions = compare(report, json.loads(args.baseline.read_text(encoding='utf-8')), args.tolerance)
+    if regressions:
+        print("Регрессии относительно базового прогона:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("Регрессий относительно базового прогона нет")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
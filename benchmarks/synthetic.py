@@ -0,0 +1,108 @@
+"""Генераторы синтетических входных данных для бенчмарков"""
+import random
+from collections import deque
+from typing import Dict, List, Optional, TextIO, Tuple
+
+
+def model_parents(classes: int, fanout: int = 4, depth: Optional[int] = None) -> List[Optional[int]]:
+    """
+    Родитель каждого класса в синтетическом дереве агрегаций.
+
+    Классы раскладываются по уровням, у каждого не больше fanout дочерних.
+    Если задана depth, дерево не глубже depth уровней: когда все места
+    заполнены, лишние классы распределяются по предпоследнему уровню.
+    """
+    parents: List[Optional[int]] = [None]
+    levels = [0]
+    children = [0]
+    open_parents = deque([0])
+    overflow: List[int] = []
+
+    for i in range(1, classes):
+        while open_parents and (children[open_parents[0]] >= fanout or
+                                (depth is not None and levels[open_parents[0]] >= depth - 1)):
+            done = open_parents.popleft()
+            if depth is not None and levels[done] == depth - 2:
+                overflow.append(done)
+
+        if open_parents:
+            parent = open_parents[0]
+        else:
+            parent = overflow[i % len(overflow)] if overflow else 0
+
+        parents.append(parent)
+        levels.append(levels[parent] + 1)
+        children.append(0)
+        children[parent] += 1
+        open_parents.append(i)
+
+    return parents
+
+
+def _write_model_range(f: TextIO, parents: List[Optional[int]], start: int, stop: int,
+                       attributes: int) -> None:
+    """Записывает XMI-документ с классами start..stop-1 и агрегациями от них"""
+    f.write('<?xml version="1.0"?>\n<XMI>\n')
+    for i in range(start, stop):
+        is_root = 'true' if i == 0 else 'false'
+        f.write(f'    <Class name="C{i}" isRoot="{is_root}" documentation="Class {i}">\n')
+        for a in range(attributes):
+            attr_type = 'uint32' if a % 2 == 0 else 'string'
+            f.write(f'        <Attribute name="attr{a}" type="{attr_type}" />\n')
+        f.write('    </Class>\n')
+    for i in range(start, stop):
+        parent = parents[i]
+        if parent is None:
+            continue
+        f.write(
+            f'    <Aggregation source="C{i}" target="C{parent}" '
+            f'sourceMultiplicity="0..{i % 50 + 1}" targetMultiplicity="1" />\n'
+        )
+    f.write('</XMI>\n')
+
+
+def write_model_xml(f: TextIO, classes: int, attributes: int = 2, fanout: int = 4,
+                    depth: Optional[int] = None) -> None:
+    """
+    Записывает синтетическую UML-модель: дерево из classes классов,
+    у каждого класса attributes атрибутов и до fanout дочерних классов
+    (глубина дерева ограничивается depth, если он задан).
+    """
+    _write_model_range(f, model_parents(classes, fanout, depth), 0, classes, attributes)
+
+
+def write_model_shards(paths: List[str], classes: int, attributes: int = 2, fanout: int = 4) -> None:
+    """
+    Записывает синтетическую модель write_model_xml фрагментами по файлам
+    paths: классы делятся на len(paths) последовательных диапазонов, агрегация
+    от класса попадает во фрагмент этого класса
+    """
+    parents = model_parents(classes, fanout)
+    for n, path in enumerate(paths):
+        with open(path, 'w', encoding='utf-8') as f:
+            _write_model_range(f, parents, classes * n // len(paths),
+                               classes * (n + 1) // len(paths), attributes)
+
+
+def make_config_pair(keys: int, change_ratio: float = 0.01,
+                     seed: int = 0) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Пара плоских конфигураций из keys параметров, в которой доля change_ratio
+    ключей изменена: поровну удалений, изменений и добавлений.
+    """
+    rnd = random.Random(seed)
+    original = {f"param{i}": str(rnd.randrange(1000)) for i in range(keys)}
+    patched = dict(original)
+
+    changes = int(keys * change_ratio)
+    changed_keys = rnd.sample(range(keys), min(keys, changes - changes // 3))
+    for n, i in enumerate(changed_keys):
+        key = f"param{i}"
+        if n % 2:
+            del patched[key]
+        else:
+            patched[key] = str(1000 + rnd.randrange(1000))
+    for i in range(changes // 3):
+        patched[f"added_param{i}"] = str(rnd.randrange(1000))
+
+    return original, patched
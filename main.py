@@ -1,59 +1,34 @@
+"""
+Генерация конфигурации базовой станции по UML-модели и delta конфигураций.
+
+Запуск:
+    python main.py                 # все устаревшие стадии (то же, что run)
+    python main.py model [--xml input/model/*.xml] [--config-xml out/config.xml] [--meta out/meta.json]
+    python main.py delta [--config ...] [--patched-config ...] [--delta ...] [--result ...]
+    python main.py apply [--config ...] [--delta out/delta.json] [--result ...]
+
+Пути по умолчанию берутся из AppConfig (--input-dir и --output-dir меняют
+каталоги). Тяжёлые модули (парсер модели с xml.etree, пул процессов)
+импортируются только стадиями, которым они нужны, а argparse — только для
+справки и ошибок в аргументах, чтобы частые вызовы delta и apply из
+скриптов запускались быстро.
+"""
 import json
 import logging
-from model.parser import ModelParser
-from model.config_processor import ConfigProcessor
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 from model.config import AppConfig
+from model.metrics import metrics
 from model.exceptions import ModelError, ConfigError
+from model.logging_setup import setup_logging
 
+if TYPE_CHECKING:
+    import argparse
 
-def setup_logging():
-    """Настройка логирования с гарантированным выводом в консоль и файл"""
-    logger = logging.getLogger()
-
-    # Если логгер уже настроен - только проверим обработчики
-    if logger.handlers:
-        # Проверяем наличие консольного обработчика
-        has_console = any(
-            isinstance(h, logging.StreamHandler)
-            and not isinstance(h, logging.FileHandler)
-            for h in logger.handlers
-        )
-
-        # Проверяем наличие файлового обработчика
-        has_file = any(
-            isinstance(h, logging.FileHandler)
-            for h in logger.handlers
-        )
-
-        # Добавляем недостающие обработчики
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
-        if not has_console:
-            console_handler = logging.StreamHandler()
-            console_handler.setFormatter(formatter)
-            logger.addHandler(console_handler)
-
-        if not has_file:
-            file_handler = logging.FileHandler('app.log', mode='a', encoding='utf-8')
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
-
-        return
-
-    # Первоначальная настройка логгера
-    logger.setLevel(logging.INFO)
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
-    # Консольный вывод
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-
-    # Файловый вывод (режим 'a' - добавление в существующий файл)
-    file_handler = logging.FileHandler('app.log', mode='a', encoding='utf-8')
-    file_handler.setFormatter(formatter)
-
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    from model.manifest import BuildManifest
 
 
 def ensure_dirs():
@@ -76,47 +51,324 @@ def ensure_dirs():
         raise RuntimeError(error_msg) from e
 
 
-def main():
-    """Основная функция"""
-    setup_logging()
-    logging.info("=" * 50)
-    logging.info("Запуск программы")
+def run_model_stage(inputs: List[Path], outputs: List[Path]) -> None:
+    """Генерация config.xml и meta.json по UML-модели (из одного или нескольких файлов)"""
+    from model import json_stream
+    from model.fileutil import atomic_write
+    from model.model_cache import ModelCache
+    from model.parser import ModelParser
+
+    config_path, meta_path = outputs
+
+    xml_files = [str(path) for path in inputs]
+    parser = ModelParser(xml_files[0] if len(xml_files) == 1 else xml_files)
+    parser.parse(cache=ModelCache(AppConfig.CACHE_DIR / 'model'))
+
+    with atomic_write(config_path) as f:
+        parser.write_config_xml(f)
+
+    with atomic_write(meta_path) as f:
+        json_stream.dump(parser.generate_meta_json(), f)
+
+
+def run_delta_stage(inputs: List[Path], outputs: List[Path]) -> None:
+    """Генерация delta.json и res_patched_config.json по конфигурациям"""
+    from model.config_processor import ConfigProcessor
+
+    config_path, patched_path = inputs
+    delta_path, result_path = outputs
+
+    processor = ConfigProcessor()
+    original = processor.load_config(str(config_path))
+    patched = processor.load_config(str(patched_path))
+
+    delta = processor.generate_delta(original, patched)
+    processor.save_config(delta, str(delta_path))
+
+    result = processor.apply_delta(original, delta, in_place=True)
+    processor.save_config(result, str(result_path))
+
+
+def run_apply_stage(inputs: List[Path], outputs: List[Path]) -> None:
+    """Применение готового delta.json к конфигурации"""
+    from model.config_processor import ConfigProcessor
+
+    config_path, delta_path = inputs
+    result_path, = outputs
+
+    processor = ConfigProcessor()
+    original = processor.load_config(str(config_path))
+    delta = processor.load_config(str(delta_path))
+
+    result = processor.apply_delta(original, delta, in_place=True)
+    processor.save_config(result, str(result_path))
+
+
+STAGES = {
+    'model': run_model_stage,
+    'delta': run_delta_stage,
+    'apply': run_apply_stage,
+}
+
+# Стадии полного запуска, отслеживаемые манифестом сборки
+PIPELINE = ('model', 'delta')
+
+
+def setup_metrics() -> None:
+    """
+    Включение метрик переменными окружения: APP_METRICS=1 — замеры стадий
+    в metrics.json, APP_PROFILE=1 — дополнительно профили cProfile стадий
+    в выходном каталоге.
+    """
+    profile = os.environ.get('APP_PROFILE') == '1'
+    enabled = profile or os.environ.get('APP_METRICS') == '1'
+    metrics.configure(enabled, profile_dir=str(AppConfig.OUTPUT_DIR) if profile else None)
+
+
+def save_metrics() -> None:
+    """Сохранение собранных метрик рядом с остальными выходными файлами"""
+    if not metrics.enabled:
+        return
+    from model.fileutil import atomic_write
+
+    metrics_path = AppConfig.get_output_path('metrics')
+    metrics_path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(metrics_path) as f:
+        json.dump(metrics.report(), f, indent=4, ensure_ascii=False)
+    logging.info(f"Метрики сохранены: {metrics_path}")
+
+
+def execute_stage(stage: str, inputs: List[Path], outputs: List[Path],
+                  settings: Optional[Tuple[bool, bool, Optional[str]]] = None) -> List[Dict[str, Any]]:
+    """
+    Выполнение стадии с замером. Возвращает записи метрик стадии, чтобы
+    их можно было передать из процесса пула в основной процесс.
+    """
+    if settings is not None:
+        metrics.configure(*settings)
+    start = len(metrics.records)
+    with metrics.stage(f"stage:{stage}", profile=True):
+        STAGES[stage](inputs, outputs)
+    return metrics.take_since(start)
 
-    try:
-        ensure_dirs()
 
-        # Проверка входных файлов
-        required_files = {
-            'xml': AppConfig.get_input_path('xml'),
-            'config': AppConfig.get_input_path('config'),
-            'patched_config': AppConfig.get_input_path('patched_config')
+def run_stages(manifest: 'BuildManifest') -> None:
+    """
+    Выполнение устаревших стадий.
+
+    Стадии независимы, поэтому при нескольких устаревших стадиях они
+    выполняются параллельно в отдельных процессах. Выходы каждой стадии
+    записываются атомарно, манифест обновляется по мере их завершения.
+    Ошибка каждой стадии записывается в лог; после завершения всех стадий
+    пробрасывается ошибка первой из них в порядке PIPELINE.
+    """
+    stale = {}
+    for stage in PIPELINE:
+        inputs, outputs = AppConfig.get_stage_paths(stage)
+        if manifest.is_stale(stage, inputs, outputs):
+            manifest.invalidate(stage)
+            stale[stage] = (inputs, outputs)
+        else:
+            logging.info(f"Стадия '{stage}' актуальна, пропуск")
+
+    if not stale:
+        return
+
+    # Одна стадия выполняется в текущем процессе: запуск пула дороже её самой
+    if len(stale) == 1:
+        (stage, (inputs, outputs)), = stale.items()
+        metrics.records.extend(execute_stage(stage, inputs, outputs))
+        manifest.record(stage, inputs, outputs)
+        manifest.save()
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    errors = {}
+    with ProcessPoolExecutor(max_workers=len(stale)) as executor:
+        futures = {
+            executor.submit(execute_stage, stage, inputs, outputs, metrics.settings()): stage
+            for stage, (inputs, outputs) in stale.items()
         }
+        for future in as_completed(futures):
+            stage = futures[future]
+            try:
+                metrics.records.extend(future.result())
+            except Exception as e:
+                logging.error(f"Стадия {stage}: {e}")
+                errors[stage] = e
+                continue
+            manifest.record(stage, *stale[stage])
+            manifest.save()
+
+    for stage in PIPELINE:
+        if stage in errors:
+            raise errors[stage]
+
+
+# Опции команд: флаг, принимает ли несколько значений, справка
+COMMAND_OPTIONS: Dict[str, List[Tuple[str, bool, str]]] = {
+    'model': [
+        ('--xml', True, "Файл модели или её фрагменты"),
+        ('--config-xml', False, "Выходной config.xml"),
+        ('--meta', False, "Выходной meta.json"),
+    ],
+    'delta': [
+        ('--config', False, "Исходная конфигурация"),
+        ('--patched-config', False, "Изменённая конфигурация"),
+        ('--delta', False, "Выходной delta.json"),
+        ('--result', False, "Выходной res_patched_config.json"),
+    ],
+    'apply': [
+        ('--config', False, "Исходная конфигурация"),
+        ('--delta', False, "delta.json (по умолчанию — выход стадии delta)"),
+        ('--result', False, "Выходной res_patched_config.json"),
+    ],
+}
+COMMAND_HELP = {
+    'run': "Все устаревшие стадии (по умолчанию)",
+    'model': "Только config.xml и meta.json по модели",
+    'delta': "Только delta.json и res_patched_config.json",
+    'apply': "Только применение готового delta.json",
+}
+GLOBAL_OPTIONS = ('--input-dir', '--output-dir')
+
+
+def _dest(flag: str) -> str:
+    """Имя атрибута аргументов для флага: --patched-config -> patched_config"""
+    return flag[2:].replace('-', '_')
+
+
+def build_arg_parser() -> 'argparse.ArgumentParser':
+    """Аргументы командной строки: команда и пути, переопределяющие AppConfig"""
+    import argparse
 
-        missing = [str(f) for f in required_files.values() if not f.exists()]
-        if missing:
-            raise FileNotFoundError(f"Отсутствуют файлы: {', '.join(missing)}")
+    parser = argparse.ArgumentParser(description="Генерация конфигурации базовой станции")
+    parser.add_argument('--input-dir', type=Path, help=f"Каталог входных файлов (по умолчанию {AppConfig.INPUT_DIR})")
+    parser.add_argument('--output-dir', type=Path, help=f"Каталог выходных файлов (по умолчанию {AppConfig.OUTPUT_DIR})")
+    commands = parser.add_subparsers(dest='command', metavar='команда')
+    for command, help_text in COMMAND_HELP.items():
+        subparser = commands.add_parser(command, help=help_text)
+        for flag, many, option_help in COMMAND_OPTIONS.get(command, ()):
+            subparser.add_argument(flag, type=Path, nargs='+' if many else None, help=option_help)
+    return parser
 
-        # Обработка модели
-        parser = ModelParser(str(required_files['xml']))
-        parser.parse()
 
-        # Генерация выходных файлов
-        with open(str(AppConfig.get_output_path('config')), 'w', encoding='utf-8') as f:
-            f.write(parser.generate_config_xml())
+def parse_args_fast(argv: List[str]) -> Optional[SimpleNamespace]:
+    """
+    Разбор обычного вызова без argparse: его импорт вместе с shutil и locale,
+    которые он загружает для справки, сопоставим со временем работы команд
+    delta и apply. None — аргументы разбирает argparse: справка, ошибки,
+    --опция=значение, сокращённые опции и значения, начинающиеся с '-'.
+    """
+    values: Dict[str, Any] = dict.fromkeys(map(_dest, GLOBAL_OPTIONS))
+    values['command'] = None
+    options = dict.fromkeys(GLOBAL_OPTIONS, False)
 
-        with open(str(AppConfig.get_output_path('meta')), 'w', encoding='utf-8') as f:
-            json.dump(parser.generate_meta_json(), f, indent=4, ensure_ascii=False)
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        i += 1
+        if values['command'] is None and arg in COMMAND_HELP:
+            values['command'] = arg
+            options = {flag: many for flag, many, _ in COMMAND_OPTIONS.get(arg, ())}
+            values.update(dict.fromkeys(map(_dest, options)))
+            continue
+        many = options.get(arg)
+        if many is None:
+            return None
+        taken = []
+        while i < len(argv) and not argv[i].startswith('-') and (many or not taken):
+            taken.append(Path(argv[i]))
+            i += 1
+        if not taken:
+            return None
+        values[_dest(arg)] = taken if many else taken[0]
+    return SimpleNamespace(**values)
 
-        # Обработка конфигов
-        processor = ConfigProcessor()
-        original = processor.load_config(str(required_files['config']))
-        patched = processor.load_config(str(required_files['patched_config']))
 
-        delta = processor.generate_delta(original, patched)
-        processor.save_config(delta, str(AppConfig.get_output_path('delta')))
+def parse_args(argv: Optional[List[str]] = None) -> SimpleNamespace:
+    """Аргументы командной строки; argparse загружается, только если без него не обойтись"""
+    if argv is None:
+        argv = sys.argv[1:]
+    args = parse_args_fast(argv)
+    if args is None:
+        args = SimpleNamespace(**vars(build_arg_parser().parse_args(argv)))
+    return args
 
-        result = processor.apply_delta(original, delta)
-        processor.save_config(result, str(AppConfig.get_output_path('result')))
+
+def command_paths(args: SimpleNamespace) -> Tuple[List[Path], List[Path]]:
+    """Входные и выходные файлы отдельной стадии: явные пути или пути AppConfig"""
+    if args.command == 'model':
+        inputs = args.xml or AppConfig.get_input_paths('xml')
+        return inputs, [args.config_xml or AppConfig.get_output_path('config'),
+                        args.meta or AppConfig.get_output_path('meta')]
+    if args.command == 'delta':
+        return ([args.config or AppConfig.get_input_path('config'),
+                 args.patched_config or AppConfig.get_input_path('patched_config')],
+                [args.delta or AppConfig.get_output_path('delta'),
+                 args.result or AppConfig.get_output_path('result')])
+    return ([args.config or AppConfig.get_input_path('config'),
+             args.delta or AppConfig.get_output_path('delta')],
+            [args.result or AppConfig.get_output_path('result')])
+
+
+def missing_inputs(paths: List[Path], file_type: Optional[str] = None) -> List[str]:
+    """Отсутствующие входные файлы (пустой список путей — шаблон glob без совпадений)"""
+    if not paths and file_type:
+        return [str(AppConfig.get_input_path(file_type))]
+    return [str(f) for f in paths if not f.exists()]
+
+
+def check_inputs(missing: List[str]) -> None:
+    if missing:
+        raise FileNotFoundError(f"Отсутствуют файлы: {', '.join(missing)}")
+
+
+def run_all() -> None:
+    """Полный запуск: все стадии, входы или выходы которых изменились"""
+    from model.manifest import BuildManifest
+
+    ensure_dirs()
+
+    # Проверка входных файлов
+    check_inputs([
+        path
+        for file_type in ('xml', 'config', 'patched_config')
+        for path in missing_inputs(AppConfig.get_input_paths(file_type), file_type)
+    ])
+
+    # Перезапускаются только стадии с изменившимися входами или выходами
+    run_stages(BuildManifest.load(AppConfig.get_manifest_path()))
+
+
+def run_command(args: SimpleNamespace) -> None:
+    """Выполнение одной стадии без проверки манифеста"""
+    inputs, outputs = command_paths(args)
+    check_inputs(missing_inputs(inputs, 'xml' if args.command == 'model' else None))
+    for path in outputs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    metrics.records.extend(execute_stage(args.command, inputs, outputs))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Основная функция"""
+    args = parse_args(argv)
+    setup_logging()
+    if args.input_dir:
+        AppConfig.INPUT_DIR = args.input_dir
+    if args.output_dir:
+        AppConfig.OUTPUT_DIR = args.output_dir
+    setup_metrics()
+    logging.info("=" * 50)
+    logging.info(f"Запуск программы: {args.command or 'run'}")
+
+    try:
+        if args.command in (None, 'run'):
+            run_all()
+        else:
+            run_command(args)
+        save_metrics()
 
         logging.info("Программа завершена успешно")
         return 0
@@ -0,0 +1,186 @@
+"""
+Пакетная обработка конфигураций множества базовых станций.
+
+Запуск: python -m model.batch <каталог или манифест> [-o out/batch] [-j N]
+
+Каталог содержит по подкаталогу на станцию с файлами config.json и
+patched_config.json. Манифест — JSON-список объектов
+{"name": ..., "config": ..., "patched_config": ...}.
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from .config import AppConfig
+from .config_processor import ConfigProcessor
+from .exceptions import ConfigError, ModelError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchItem:
+    """Пара конфигураций одной станции"""
+    name: str
+    config: str
+    patched_config: str
+    output_dir: str
+
+
+@dataclass
+class BatchResult:
+    """Результат обработки одной пары"""
+    name: str
+    ok: bool
+    error: Optional[str] = None
+    operations: int = 0
+    seconds: float = 0.0
+
+
+def discover_items(source: Path, output_dir: Path) -> List[BatchItem]:
+    """Список пар из каталога станций или JSON-манифеста"""
+    source = Path(source)
+    config_name = AppConfig.get_input_name('config')
+    patched_name = AppConfig.get_input_name('patched_config')
+
+    if source.is_dir():
+        return [
+            BatchItem(
+                name=site.name,
+                config=str(site / config_name),
+                patched_config=str(site / patched_name),
+                output_dir=str(output_dir / site.name)
+            )
+            for site in sorted(source.iterdir())
+            if site.is_dir()
+        ]
+
+    try:
+        with open(source, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        base = source.parent
+        items = [
+            BatchItem(
+                name=_check_name(entry["name"], source),
+                config=str(base / entry["config"]),
+                patched_config=str(base / entry["patched_config"]),
+                output_dir=str(output_dir / entry["name"])
+            )
+            for entry in entries
+        ]
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"Ошибка чтения манифеста {source}: {e}") from e
+    except (KeyError, TypeError) as e:
+        raise ConfigError(f"Некорректный манифест {source}: {e}") from e
+
+    seen = set()
+    for item in items:
+        if item.name in seen:
+            raise ConfigError(f"Имя станции {item.name!r} повторяется в манифесте {source}")
+        seen.add(item.name)
+    return items
+
+
+def _check_name(name: str, source: Path) -> str:
+    """
+    Имя станции из манифеста становится именем подкаталога результатов,
+    поэтому не может содержать разделители путей или ссылаться на родителя
+    """
+    if not isinstance(name, str):
+        raise TypeError(f"имя станции должно быть строкой: {name!r}")
+    separators = {'/', '\\', os.sep, os.altsep} - {None}
+    if name in ('', '.', '..') or any(sep in name for sep in separators):
+        raise ConfigError(f"Недопустимое имя станции {name!r} в манифесте {source}")
+    return name
+
+
+def process_item(item: BatchItem) -> BatchResult:
+    """Вычисление и применение delta для одной пары (выполняется в процессе пула)"""
+    start = time.perf_counter()
+    processor = ConfigProcessor()
+    try:
+        original = processor.load_config(item.config)
+        patched = processor.load_config(item.patched_config)
+        delta = processor.generate_delta(original, patched)
+
+        os.makedirs(item.output_dir, exist_ok=True)
+        processor.save_config(delta, os.path.join(item.output_dir, AppConfig.get_output_name('delta')))
+        result = processor.apply_delta(original, delta, in_place=True)
+        processor.save_config(result, os.path.join(item.output_dir, AppConfig.get_output_name('result')))
+    except ConfigError as e:
+        return BatchResult(item.name, False, f"Ошибка конфигурации: {e}", seconds=time.perf_counter() - start)
+    except ModelError as e:
+        return BatchResult(item.name, False, f"Ошибка модели: {e}", seconds=time.perf_counter() - start)
+    except OSError as e:
+        return BatchResult(item.name, False, f"Ошибка файловой системы: {e}", seconds=time.perf_counter() - start)
+    except Exception as e:
+        # Ошибка одной пары не должна прерывать пакет и терять готовые результаты
+        logger.exception(f"Непредвиденная ошибка при обработке {item.name}")
+        return BatchResult(item.name, False, f"Непредвиденная ошибка: {type(e).__name__}: {e}",
+                           seconds=time.perf_counter() - start)
+
+    operations = len(delta["additions"]) + len(delta["deletions"]) + len(delta["updates"])
+    return BatchResult(item.name, True, operations=operations, seconds=time.perf_counter() - start)
+
+
+def run_batch(items: List[BatchItem], workers: Optional[int] = None,
+              chunksize: Optional[int] = None) -> List[BatchResult]:
+    """
+    Обработка пар в пуле процессов.
+
+    Задачи отправляются порциями, чтобы накладные расходы на передачу
+    между процессами не преобладали для небольших конфигураций.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(items) // (workers * 4))
+    if workers == 1 or len(items) <= 1:
+        return [process_item(item) for item in items]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(process_item, items, chunksize=chunksize))
+
+
+def summarize(results: List[BatchResult], elapsed: float) -> str:
+    """Итоговая сводка: пропускная способность и ошибки"""
+    failed = [r for r in results if not r.ok]
+    rate = len(results) / elapsed if elapsed > 0 else float('inf')
+    lines = [
+        f"Обработано пар: {len(results)}, успешно: {len(results) - len(failed)}, "
+        f"с ошибками: {len(failed)}",
+        f"Время: {elapsed:.2f} с, {rate:.1f} пар/с, "
+        f"операций delta: {sum(r.operations for r in results)}"
+    ]
+    lines.extend(f"  {r.name}: {r.error}" for r in failed)
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Пакетная генерация и применение delta")
+    parser.add_argument('source', type=Path, help="Каталог станций или JSON-манифест пар")
+    parser.add_argument('-o', '--output', type=Path, default=AppConfig.OUTPUT_DIR / 'batch',
+                        help="Каталог результатов")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Число процессов")
+    parser.add_argument('--chunksize', type=int, default=None, help="Размер порции задач")
+    args = parser.parse_args(argv)
+
+    try:
+        items = discover_items(args.source, args.output)
+    except ConfigError as e:
+        logger.error(f"Ошибка конфигурации: {e}")
+        return 1
+
+    start = time.perf_counter()
+    results = run_batch(items, args.workers, args.chunksize)
+    print(summarize(results, time.perf_counter() - start))
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import List, Tuple
 
 
 class AppConfig:
@@ -6,7 +7,10 @@ class AppConfig:
 
     INPUT_DIR = Path('input')
     OUTPUT_DIR = Path('out')
+    CACHE_DIR = Path('.cache')
 
+    # Имя входного файла может быть шаблоном glob (например, 'model/*.xml'):
+    # модель, выгруженная несколькими файлами, разбирается по фрагментам
     _INPUT_MAPPING = {
         'xml': 'impulse_test_input.xml',
         'config': 'config.json',
@@ -17,29 +21,75 @@ class AppConfig:
         'config': 'config.xml',
         'meta': 'meta.json',
         'delta': 'delta.json',
-        'result': 'res_patched_config.json'
+        'result': 'res_patched_config.json',
+        'metrics': 'metrics.json'
     }
 
+    # Стадии конвейера: входные и выходные файлы каждой стадии
+    _STAGES = {
+        'model': (('xml',), ('config', 'meta')),
+        'delta': (('config', 'patched_config'), ('delta', 'result')),
+    }
+
+    MANIFEST_FILE = '.manifest.json'
+
     @classmethod
-    def get_input_path(cls, file_type: str) -> Path:
-        """Полный путь к входному файлу"""
+    def get_input_name(cls, file_type: str) -> str:
+        """Имя входного файла"""
         if file_type not in cls._INPUT_MAPPING:
             raise ValueError(f"Неизвестный тип файла: {file_type}")
-        return cls.INPUT_DIR / cls._INPUT_MAPPING[file_type]
+        return cls._INPUT_MAPPING[file_type]
 
     @classmethod
-    def get_output_path(cls, file_type: str) -> Path:
-        """Полный путь к выходному файлу"""
+    def get_output_name(cls, file_type: str) -> str:
+        """Имя выходного файла"""
         if file_type not in cls._OUTPUT_MAPPING:
             raise ValueError(f"Неизвестный тип файла: {file_type}")
-        return cls.OUTPUT_DIR / cls._OUTPUT_MAPPING[file_type]
+        return cls._OUTPUT_MAPPING[file_type]
+
+    @classmethod
+    def get_input_path(cls, file_type: str) -> Path:
+        """Полный путь к входному файлу"""
+        return cls.INPUT_DIR / cls.get_input_name(file_type)
+
+    @classmethod
+    def get_input_paths(cls, file_type: str) -> List[Path]:
+        """
+        Входные файлы типа: для шаблона glob — все совпадения в порядке
+        имён (пустой список, если совпадений нет), иначе — один путь
+        """
+        name = cls.get_input_name(file_type)
+        if any(char in name for char in '*?['):
+            return sorted(cls.INPUT_DIR.glob(name))
+        return [cls.INPUT_DIR / name]
+
+    @classmethod
+    def get_output_path(cls, file_type: str) -> Path:
+        """Полный путь к выходному файлу"""
+        return cls.OUTPUT_DIR / cls.get_output_name(file_type)
+
+    @classmethod
+    def get_manifest_path(cls) -> Path:
+        """Путь к манифесту сборки артефактов"""
+        return cls.OUTPUT_DIR / cls.MANIFEST_FILE
+
+    @classmethod
+    def get_stage_paths(cls, stage: str) -> Tuple[List[Path], List[Path]]:
+        """Входные и выходные файлы стадии конвейера"""
+        if stage not in cls._STAGES:
+            raise ValueError(f"Неизвестная стадия: {stage}")
+        inputs, outputs = cls._STAGES[stage]
+        return (
+            [path for ft in inputs for path in cls.get_input_paths(ft)],
+            [cls.get_output_path(ft) for ft in outputs]
+        )
 
     @classmethod
     def validate_input_files(cls) -> bool:
         """Проверка наличия входных файлов"""
         try:
             return all(
-                cls.get_input_path(ft).exists()
+                (paths := cls.get_input_paths(ft)) and all(path.exists() for path in paths)
                 for ft in cls._INPUT_MAPPING
             )
         except (ValueError, OSError):
@@ -1,25 +1,68 @@
 import json
 import logging
-from typing import Dict, Any
-from .types import Delta, DeltaOperation, ConfigDict
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Optional, Tuple
+from .types import Delta, DeltaOperation, ConfigDict, MergeConflict, MergeResult, NestedConfig
 from .exceptions import ConfigError, ConfigValidationError
+from .fileutil import atomic_path, atomic_write
+from .metrics import delta_counts, instrumented
+
+if TYPE_CHECKING:
+    from .digest import ConfigDigest
+    from .overlay import DeltaOverlay
+    from .validator import ConfigValidator
 
 logger = logging.getLogger(__name__)
 
+# Виды изменения ключа при объединении delta
+_ADDED, _DELETED, _UPDATED, _ABSENT = 'added', 'deleted', 'updated', 'absent'
+
+# Отсутствие ключа при трёхстороннем слиянии (значение может быть и None)
+_MISSING = object()
+
+
+def _change_kind(base: Any, value: Any) -> str:
+    """Вид изменения ключа в ветке относительно base"""
+    if value is _MISSING:
+        return 'delete'
+    return 'update' if base is not _MISSING else 'add'
+
+
+def _escape_pointer(key: str) -> str:
+    """Экранирование ключа для JSON Pointer (RFC 6901)"""
+    return key.replace('~', '~0').replace('/', '~1')
+
+
+def _split_pointer(pointer: str) -> List[str]:
+    """Разбор JSON Pointer на список ключей"""
+    if not pointer.startswith('/'):
+        raise ConfigValidationError(f"Некорректный путь JSON Pointer: {pointer!r}")
+    return [
+        part.replace('~1', '/').replace('~0', '~')
+        for part in pointer[1:].split('/')
+    ]
+
 
 class ConfigProcessor:
     """Обработчик конфигурационных JSON-файлов"""
 
     @staticmethod
-    def load_config(file_path: str) -> ConfigDict:
+    @instrumented("ConfigProcessor.load_config", lambda r, *a, **k: {"keys": len(r)})
+    def load_config(file_path: str, validator: Optional['ConfigValidator'] = None) -> ConfigDict:
         """
         Загружает конфигурацию из JSON-файла
+
+        Если передан validator (ConfigValidator.for_model), конфигурация
+        в структуре config.xml проверяется по модели; все нарушения
+        собираются в ConfigValidationError.violations.
         """
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 config = json.load(f)
                 if not isinstance(config, dict):
                     raise ConfigValidationError("Конфигурация должна быть JSON-объектом")
+                if validator is not None:
+                    validator.validate(config)
                 return config
         except json.JSONDecodeError as e:
             raise ConfigError(f"Ошибка декодирования JSON в файле {file_path}: {e}") from e
@@ -27,22 +70,71 @@ class ConfigProcessor:
             raise ConfigError(f"Ошибка доступа к файлу {file_path}: {e}") from e
 
     @staticmethod
-    def save_config(config: Dict[str, Any], file_path: str) -> None:
+    @instrumented("ConfigProcessor.save_config", lambda r, config, *a, **k: {"keys": len(config)})
+    def save_config(config: Mapping, file_path: str, compact: bool = False) -> None:
         """
         Сохраняет конфигурацию в JSON-файл
 
+        Запись потоковая: формат совпадает с json.dump(indent=4), при
+        compact=True — без отступов и пробелов. Помимо dict принимает любое
+        отображение (например, DeltaOverlay), которое записывается по парам
+        без материализации.
         """
+        from . import json_stream
+
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
+            with atomic_write(file_path) as f:
+                json_stream.dump(config, f, compact=compact)
         except OSError as e:
             raise ConfigError(f"Ошибка записи в файл {file_path}: {e}") from e
 
     @staticmethod
-    def generate_delta(original: ConfigDict, patched: ConfigDict) -> Delta:
+    @instrumented("ConfigProcessor.save_delta_compact", lambda r, *a, **k: {"operations": r})
+    def save_delta_compact(delta: Delta, file_path: str) -> int:
+        """
+        Сохраняет delta в компактном формате JSON Lines (для .gz — со сжатием).
+        Возвращает число записанных операций.
+        """
+        from . import delta_format
+
+        try:
+            with atomic_path(file_path) as tmp_path:
+                with delta_format.open_delta(tmp_path, 'w') as f:
+                    return delta_format.write_operations(delta_format.iter_operations(delta), f)
+        except OSError as e:
+            raise ConfigError(f"Ошибка записи в файл {file_path}: {e}") from e
+
+    @staticmethod
+    @instrumented("ConfigProcessor.load_delta_compact", lambda r, *a, **k: delta_counts(r))
+    def load_delta_compact(file_path: str) -> Delta:
+        """Загружает delta из компактного формата"""
+        from . import delta_format
+
+        try:
+            with delta_format.open_delta(file_path, 'r') as f:
+                return delta_format.to_delta(delta_format.read_operations(f))
+        except OSError as e:
+            raise ConfigError(f"Ошибка доступа к файлу {file_path}: {e}") from e
+
+    @staticmethod
+    @instrumented("ConfigProcessor.generate_delta", lambda r, *a, **k: delta_counts(r))
+    def generate_delta(original: ConfigDict, patched: ConfigDict,
+                       digests: Optional[Tuple['ConfigDigest', 'ConfigDigest']] = None) -> Delta:
         """
         Вычисляет разницу между двумя версиями конфигурации
+
+        Если переданы дайджесты обеих версий, сравниваются только ключи
+        из различающихся корзин (операции в delta идут по корзинам), а для
+        совпадающих конфигураций delta возвращается без обхода ключей.
         """
+        if digests is not None:
+            original_digest, patched_digest = digests
+            buckets = original_digest.diff_buckets(patched_digest)
+            if not buckets:
+                return {"additions": [], "deletions": [], "updates": []}
+            original = original_digest.select(original, buckets)
+            patched = patched_digest.select(patched, buckets)
+
         additions = [
             {"key": k, "value": v, "from_": None, "to": None}
             for k, v in patched.items()
@@ -64,11 +156,32 @@ class ConfigProcessor:
         }
 
     @staticmethod
-    def apply_delta(original: ConfigDict, delta: Delta) -> ConfigDict:
+    @instrumented("ConfigProcessor.generate_delta_file", lambda r, *a, **k: r)
+    def generate_delta_file(original_path: str, patched_path: str, delta_path: str,
+                            run_size: int = 500_000) -> Dict[str, int]:
+        """
+        Потоковое вычисление delta.json для конфигураций, не помещающихся в память.
+        Результат совпадает с generate_delta + save_config.
+        """
+        from .stream_diff import StreamingDiff
+
+        return StreamingDiff(run_size).diff_files(original_path, patched_path, delta_path)
+
+    @staticmethod
+    @instrumented("ConfigProcessor.apply_delta", lambda r, *a, **k: {"keys": len(r)})
+    def apply_delta(original: ConfigDict, delta: Delta, in_place: bool = False,
+                    digest: Optional['ConfigDigest'] = None) -> ConfigDict:
         """
         Применяет изменения к исходной конфигурации
+
+        При in_place=True изменяется и возвращается сам original без копирования —
+        для вызывающих, которым исходная конфигурация больше не нужна.
+        Переданный дайджест original обновляется до дайджеста результата
+        за O(числа операций).
         """
-        result = original.copy()
+        if digest is not None:
+            digest.apply_delta(original, delta)
+        result = original if in_place else original.copy()
 
         # Удаляем удаленные ключи
         for key in delta["deletions"]:
@@ -82,3 +195,272 @@ class ConfigProcessor:
         result.update({a["key"]: a["value"] for a in delta["additions"]})
 
         return result
+
+    @staticmethod
+    @instrumented("ConfigProcessor.compose_deltas", lambda r, *a, **k: delta_counts(r))
+    def compose_deltas(deltas: Iterable[Delta], original: Optional[ConfigDict] = None) -> Delta:
+        """
+        Объединяет цепочку delta в одну эквивалентную за O(общего числа операций).
+
+        Применение результата к исходной конфигурации даёт тот же набор ключей
+        и значений, что и последовательное применение цепочки. Если передана
+        исходная конфигурация, изменения, вернувшие значение к исходному,
+        отбрасываются, а from_ заполняется исходными значениями; без неё
+        from_ для ключа, сначала удалённого, а затем заданного снова, неизвестен (None),
+        а ключ, добавленный и затем удалённый, остаётся в deletions: он мог быть
+        в исходной конфигурации.
+        """
+        # Состояние ключа относительно исходной конфигурации:
+        # [вид, исходное значение, текущее значение, известно ли исходное значение]
+        state: Dict[str, list] = {}
+
+        def assign(key: str, value: Any, from_: Any, added: bool) -> None:
+            entry = state.get(key)
+            if entry is None:
+                if original is not None:
+                    in_base, from_, known = key in original, original.get(key), True
+                else:
+                    in_base, known = not added, True
+                state[key] = [_UPDATED if in_base else _ADDED, from_, value, known]
+            elif entry[0] in (_ADDED, _ABSENT):
+                entry[0], entry[2] = _ADDED, value
+            else:
+                entry[0], entry[2] = _UPDATED, value
+
+        for delta in deltas:
+            for key in delta["deletions"]:
+                entry = state.get(key)
+                if entry is None:
+                    if original is None or key in original:
+                        from_ = original.get(key) if original is not None else None
+                        state[key] = [_DELETED, from_, None, original is not None]
+                    else:
+                        state[key] = [_ABSENT, None, None, True]
+                elif entry[0] == _ADDED:
+                    # Без original добавление могло перезаписать ключ исходной
+                    # конфигурации, поэтому удаление сохраняется
+                    entry[0] = _ABSENT if original is not None else _DELETED
+                elif entry[0] == _UPDATED:
+                    entry[0] = _DELETED
+
+            for update in delta["updates"]:
+                assign(update["key"], update["to"], update.get("from_"), added=False)
+
+            for addition in delta["additions"]:
+                assign(addition["key"], addition["value"], None, added=True)
+
+        result: Delta = {"additions": [], "deletions": [], "updates": []}
+        for key, (kind, from_, to, known) in state.items():
+            if kind == _ADDED:
+                result["additions"].append({"key": key, "value": to, "from_": None, "to": None})
+            elif kind == _DELETED:
+                result["deletions"].append(key)
+            elif kind == _UPDATED and not (known and from_ == to):
+                result["updates"].append({"key": key, "value": None, "from_": from_, "to": to})
+
+        return result
+
+    @staticmethod
+    def invert_delta(delta: Delta, original: ConfigDict) -> Delta:
+        """
+        Обратная delta для отката: переводит результат применения delta
+        обратно в original. Восстанавливаемые значения читаются из original
+        (а не из from_, который после compose_deltas без исходной
+        конфигурации может быть неизвестен), ключи, которых в original
+        не было, удаляются. Удаление отсутствующего в original ключа,
+        как и в apply_delta, ничего не меняло и не восстанавливается.
+        Из original читаются только ключи операций.
+        """
+        additions = [
+            {"key": key, "value": original[key], "from_": None, "to": None}
+            for key in delta["deletions"] if key in original
+        ]
+
+        deletions = []
+        updates = []
+        changed = [(a["key"], a["value"]) for a in delta["additions"]]
+        changed.extend((u["key"], u["to"]) for u in delta["updates"])
+        for key, current in changed:
+            if key in original:
+                updates.append({"key": key, "value": None, "from_": current, "to": original[key]})
+            else:
+                deletions.append(key)
+
+        return {"additions": additions, "deletions": deletions, "updates": updates}
+
+    @staticmethod
+    @instrumented("ConfigProcessor.merge3", lambda r, *a, **k: {
+        **delta_counts(r["delta"]), "conflicts": len(r["conflicts"])})
+    def merge3(base: ConfigDict, ours: ConfigDict, theirs: ConfigDict,
+               in_place: bool = False) -> MergeResult:
+        """
+        Трёхстороннее слияние двух версий одной базовой конфигурации.
+
+        Изменения, сделанные только в одной ветке или одинаково в обеих,
+        переносятся автоматически. Ключи, изменённые в ветках по-разному,
+        попадают в список конфликтов и сохраняют значение из base
+        (или остаются отсутствующими). Каждый ключ объединения
+        рассматривается один раз; при in_place=True результат строится
+        в самом base без копирования.
+        """
+        merged = base if in_place else base.copy()
+        delta: Delta = {"additions": [], "deletions": [], "updates": []}
+        conflicts: List[MergeConflict] = []
+
+        def resolve(key: str, base_value: Any, ours_value: Any, theirs_value: Any) -> None:
+            if ours_value == theirs_value or theirs_value == base_value:
+                value = ours_value
+            elif ours_value == base_value:
+                value = theirs_value
+            else:
+                conflicts.append({
+                    "key": key,
+                    "kind": f"{_change_kind(base_value, ours_value)}/{_change_kind(base_value, theirs_value)}",
+                    "base": None if base_value is _MISSING else base_value,
+                    "ours": None if ours_value is _MISSING else ours_value,
+                    "theirs": None if theirs_value is _MISSING else theirs_value,
+                })
+                return
+
+            if value is base_value or value == base_value:
+                return
+            if value is _MISSING:
+                delta["deletions"].append(key)
+            elif base_value is _MISSING:
+                merged[key] = value
+                delta["additions"].append({"key": key, "value": value, "from_": None, "to": None})
+            else:
+                merged[key] = value
+                delta["updates"].append({"key": key, "value": None, "from_": base_value, "to": value})
+
+        # Сравнение _MISSING с любым значением даёт False, с самим собой — True
+        for key, base_value in base.items():
+            ours_value, theirs_value = ours.get(key, _MISSING), theirs.get(key, _MISSING)
+            if ours_value == base_value == theirs_value:
+                continue
+            resolve(key, base_value, ours_value, theirs_value)
+        for key, ours_value in ours.items():
+            if key not in base:
+                resolve(key, _MISSING, ours_value, theirs.get(key, _MISSING))
+        for key, theirs_value in theirs.items():
+            if key not in base and key not in ours:
+                resolve(key, _MISSING, _MISSING, theirs_value)
+
+        # Удаления применяются в конце: при in_place=True merged — это сам base,
+        # и проверки принадлежности base выше должны видеть исходный набор ключей
+        for key in delta["deletions"]:
+            del merged[key]
+
+        return {"merged": merged, "delta": delta, "conflicts": conflicts}
+
+    @staticmethod
+    @instrumented("ConfigProcessor.apply_delta_stream", lambda r, *a, **k: {"keys": len(r)})
+    def apply_delta_stream(original: ConfigDict, file_path: str,
+                           in_place: bool = False) -> ConfigDict:
+        """
+        Применяет delta из компактного файла построчно,
+        не загружая список операций в память
+        """
+        from . import delta_format
+
+        result = original if in_place else original.copy()
+        try:
+            with delta_format.open_delta(file_path, 'r') as f:
+                for op in delta_format.read_operations(f):
+                    if op[0] == delta_format.DELETE:
+                        result.pop(op[1], None)
+                    else:
+                        result[op[1]] = op[-1]
+        except OSError as e:
+            raise ConfigError(f"Ошибка доступа к файлу {file_path}: {e}") from e
+        return result
+
+    @staticmethod
+    def apply_delta_lazy(original: ConfigDict, delta: Delta) -> 'DeltaOverlay':
+        """
+        Ленивое применение изменений: представление поверх исходной конфигурации,
+        которое читается, обходится и сохраняется без копирования словаря
+        """
+        from .overlay import DeltaOverlay
+
+        return DeltaOverlay(original, delta)
+
+    @staticmethod
+    @instrumented("ConfigProcessor.generate_nested_delta", lambda r, *a, **k: delta_counts(r))
+    def generate_nested_delta(original: NestedConfig, patched: NestedConfig) -> Delta:
+        """
+        Вычисляет структурную разницу между вложенными конфигурациями.
+
+        Ключи операций — пути JSON Pointer ("/a/b"). Объекты разбираются
+        рекурсивно (каждое значение сравнивается один раз, а не на каждом
+        уровне вложенности), остальные значения (включая списки)
+        сравниваются и заменяются целиком.
+        """
+        delta: Delta = {"additions": [], "deletions": [], "updates": []}
+        stack = [('', original, patched)]
+
+        while stack:
+            prefix, old, new = stack.pop()
+            for key, old_value in old.items():
+                path = f"{prefix}/{_escape_pointer(key)}"
+                if key not in new:
+                    delta["deletions"].append(path)
+                    continue
+                new_value = new[key]
+                if old_value is new_value:
+                    continue
+                # Объекты разбираются без предварительного сравнения целиком:
+                # иначе каждое поддерево сравнивалось бы на каждом уровне вложенности
+                if isinstance(old_value, dict) and isinstance(new_value, dict):
+                    stack.append((path, old_value, new_value))
+                elif old_value != new_value:
+                    delta["updates"].append(
+                        {"key": path, "value": None, "from_": old_value, "to": new_value}
+                    )
+            delta["additions"].extend(
+                {"key": f"{prefix}/{_escape_pointer(k)}", "value": v, "from_": None, "to": None}
+                for k, v in new.items()
+                if k not in old
+            )
+
+        return delta
+
+    @staticmethod
+    @instrumented("ConfigProcessor.apply_nested_delta", lambda r, original, delta, *a, **k: delta_counts(delta))
+    def apply_nested_delta(original: NestedConfig, delta: Delta) -> NestedConfig:
+        """
+        Применяет структурную разницу к вложенной конфигурации.
+
+        Копируются только объекты на путях изменённых ключей,
+        нетронутые поддеревья разделяются с исходной конфигурацией.
+        """
+        result = original.copy()
+        copied = {id(result)}
+
+        def parent_of(pointer: str):
+            *parents, key = _split_pointer(pointer)
+            node = result
+            for part in parents:
+                child = node.get(part)
+                if not isinstance(child, dict):
+                    raise ConfigValidationError(f"Путь {pointer!r} не найден в конфигурации")
+                if id(child) not in copied:
+                    child = child.copy()
+                    copied.add(id(child))
+                    node[part] = child
+                node = child
+            return node, key
+
+        for pointer in delta["deletions"]:
+            node, key = parent_of(pointer)
+            node.pop(key, None)
+
+        for update in delta["updates"]:
+            node, key = parent_of(update["key"])
+            node[key] = update["to"]
+
+        for addition in delta["additions"]:
+            node, key = parent_of(addition["key"])
+            node[key] = addition["value"]
+
+        return result
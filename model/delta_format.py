@@ -0,0 +1,80 @@
+"""
+Компактный формат delta: JSON Lines, одна операция на строку.
+
+    ["-", key]              удаление
+    ["~", key, from_, to]   изменение
+    ["+", key, value]       добавление
+
+Операции записываются в порядке применения (удаления, изменения,
+добавления), поэтому файл можно применять построчно. Файлы с
+расширением .gz читаются и пишутся через gzip.
+"""
+import gzip
+import json
+from typing import Any, Iterable, Iterator, List, TextIO
+
+from .exceptions import ConfigValidationError
+from .types import Delta
+
+DELETE = '-'
+UPDATE = '~'
+ADD = '+'
+
+_SEPARATORS = (',', ':')
+
+
+def open_delta(file_path: str, mode: str) -> TextIO:
+    """Открытие файла delta с прозрачным сжатием для .gz"""
+    if file_path.endswith('.gz'):
+        return gzip.open(file_path, mode + 't', encoding='utf-8')
+    return open(file_path, mode, encoding='utf-8')
+
+
+def iter_operations(delta: Delta) -> Iterator[List[Any]]:
+    """Операции delta в компактном виде и в порядке применения"""
+    for key in delta["deletions"]:
+        yield [DELETE, key]
+    for update in delta["updates"]:
+        yield [UPDATE, update["key"], update.get("from_"), update["to"]]
+    for addition in delta["additions"]:
+        yield [ADD, addition["key"], addition["value"]]
+
+
+def write_operations(operations: Iterable[List[Any]], f: TextIO) -> int:
+    """Запись операций по одной на строку; возвращает их количество"""
+    count = 0
+    for op in operations:
+        f.write(json.dumps(op, ensure_ascii=False, separators=_SEPARATORS))
+        f.write('\n')
+        count += 1
+    return count
+
+
+def read_operations(f: TextIO) -> Iterator[List[Any]]:
+    """Построчное чтение операций с проверкой формата"""
+    for line_no, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            op = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ConfigValidationError(f"Строка {line_no}: некорректный JSON: {e}") from e
+        if not (isinstance(op, list) and op and
+                (op[0] == DELETE and len(op) == 2 or
+                 op[0] == UPDATE and len(op) == 4 or
+                 op[0] == ADD and len(op) == 3)):
+            raise ConfigValidationError(f"Строка {line_no}: неизвестная операция {op!r}")
+        yield op
+
+
+def to_delta(operations: Iterable[List[Any]]) -> Delta:
+    """Сборка структуры Delta из компактных операций"""
+    delta: Delta = {"additions": [], "deletions": [], "updates": []}
+    for op in operations:
+        if op[0] == DELETE:
+            delta["deletions"].append(op[1])
+        elif op[0] == UPDATE:
+            delta["updates"].append({"key": op[1], "value": None, "from_": op[2], "to": op[3]})
+        else:
+            delta["additions"].append({"key": op[1], "value": op[2], "from_": None, "to": None})
+    return delta
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import logging
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+
+from .exceptions import ConfigError
+from .fileutil import atomic_write
+from .types import ConfigDict, Delta
+
+logger = logging.getLogger(__name__)
+
+_HASH_BYTES = 16
+_HASH_MASK = (1 << (8 * _HASH_BYTES)) - 1
+
+
+# Ключ, удалённый при обновлении дайджеста по delta
+_REMOVED = object()
+
+
+def _canonical(value: Any) -> Any:
+    """
+    Значение, у которого равные по == значения (1, 1.0, True) совпадают:
+    так generate_delta и дайджест одинаково считают значения неизменными
+    """
+    if isinstance(value, int):  # В том числе bool
+        return int(value)
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in value.items()}
+    return value
+
+
+def _item_hash(key: str, value: Any) -> int:
+    """Хэш пары ключ-значение (значения, равные по ==, дают один хэш)"""
+    if isinstance(value, str):
+        encoded = b's' + value.encode('utf-8')
+    else:
+        encoded = b'j' + json.dumps(_canonical(value), sort_keys=True, ensure_ascii=False).encode('utf-8')
+    key_bytes = key.encode('utf-8')
+    digest = hashlib.blake2b(len(key_bytes).to_bytes(4, 'big'), digest_size=_HASH_BYTES)
+    digest.update(key_bytes)
+    digest.update(encoded)
+    return int.from_bytes(digest.digest(), 'big')
+
+
+def _node_hash(left: int, right: int) -> int:
+    return int.from_bytes(hashlib.blake2b(
+        left.to_bytes(_HASH_BYTES, 'big') + right.to_bytes(_HASH_BYTES, 'big'),
+        digest_size=_HASH_BYTES
+    ).digest(), 'big')
+
+
+class ConfigDigest:
+    """
+    Дерево Меркла над конфигурацией.
+
+    Ключи распределяются по buckets корзинам по crc32 ключа (корзина —
+    отрезок ключей, упорядоченных по хэшу). Хэш корзины — сумма хэшей
+    её пар по модулю 2^128, поэтому добавление, удаление и изменение
+    ключа обновляют его за O(1). Корзины — листья двоичного дерева
+    в массиве (узел i имеет детей 2i и 2i+1), корень совпадает у равных
+    конфигураций. Отличающиеся корзины находятся спуском по несовпадающим
+    узлам за O(изменений · log buckets). Индекс ключей по корзинам позволяет
+    выбрать ключи отличающихся корзин без обхода всей конфигурации.
+    """
+
+    VERSION = 1
+    DEFAULT_BUCKETS = 4096
+    SUFFIX = '.digest'
+
+    def __init__(self, buckets: int = DEFAULT_BUCKETS):
+        if buckets < 1 or buckets & (buckets - 1):
+            raise ValueError("Число корзин должно быть степенью двойки")
+        self.buckets = buckets
+        self.keys = 0
+        self._tree: List[int] = [0] * (2 * buckets)
+        self._dirty: Set[int] = set(range(buckets))
+        # Ключи каждой корзины; None — индекс неизвестен (дайджест загружен с диска)
+        self._index: Optional[List[Dict[str, None]]] = [{} for _ in range(buckets)]
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], buckets: int = DEFAULT_BUCKETS) -> 'ConfigDigest':
+        """Дайджест конфигурации за один проход"""
+        digest = cls(buckets)
+        tree = digest._tree
+        index = digest._index
+        for key, value in config.items():
+            bucket = digest.bucket(key)
+            tree[buckets + bucket] = (tree[buckets + bucket] + _item_hash(key, value)) & _HASH_MASK
+            index[bucket][key] = None
+        digest.keys = len(config)
+        return digest
+
+    def bucket(self, key: str) -> int:
+        """Номер корзины ключа"""
+        return zlib.crc32(key.encode('utf-8')) & (self.buckets - 1)
+
+    def _change(self, key: str, value: Any, sign: int) -> None:
+        leaf = self.bucket(key)
+        node = self.buckets + leaf
+        self._tree[node] = (self._tree[node] + sign * _item_hash(key, value)) & _HASH_MASK
+        self._dirty.add(leaf)
+        if self._index is not None:
+            if sign > 0:
+                self._index[leaf][key] = None
+            else:
+                self._index[leaf].pop(key, None)
+
+    def add(self, key: str, value: Any) -> None:
+        """Учёт нового ключа"""
+        self._change(key, value, 1)
+        self.keys += 1
+
+    def remove(self, key: str, value: Any) -> None:
+        """Учёт удалённого ключа с его последним значением"""
+        self._change(key, value, -1)
+        self.keys -= 1
+
+    def apply_delta(self, original: Mapping[str, Any], delta: Delta) -> None:
+        """
+        Обновление дайджеста original до результата применения delta
+        (вызывается до изменения original). Операции учитываются в порядке
+        apply_delta по рабочему представлению конфигурации, поэтому ключ,
+        удалённый и заданный снова в одной delta, вычитается один раз.
+        Из original читаются только ключи операций.
+        """
+        changed: Dict[str, Any] = {}  # Текущие значения изменённых ключей
+
+        def current(key: str) -> Any:
+            return changed[key] if key in changed else original.get(key, _REMOVED)
+
+        for key in delta["deletions"]:
+            if (value := current(key)) is not _REMOVED:
+                self.remove(key, value)
+                changed[key] = _REMOVED
+
+        assignments = [(u["key"], u["to"]) for u in delta["updates"]]
+        assignments.extend((a["key"], a["value"]) for a in delta["additions"])
+        for key, value in assignments:
+            if (previous := current(key)) is not _REMOVED:
+                self.remove(key, previous)
+            self.add(key, value)
+            changed[key] = value
+
+    def _refresh(self) -> None:
+        """Пересчёт узлов над изменившимися листьями"""
+        tree = self._tree
+        level = {(self.buckets + leaf) >> 1 for leaf in self._dirty}
+        while level and 0 not in level:
+            for node in level:
+                tree[node] = _node_hash(tree[2 * node], tree[2 * node + 1])
+            level = {node >> 1 for node in level if node > 1}
+        self._dirty.clear()
+
+    @property
+    def root(self) -> int:
+        """Корневой хэш"""
+        if self._dirty:
+            self._refresh()
+        return self._tree[1]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ConfigDigest):
+            return NotImplemented
+        return self.buckets == other.buckets and self.keys == other.keys and self.root == other.root
+
+    def diff_buckets(self, other: 'ConfigDigest') -> List[int]:
+        """Номера корзин, в которых конфигурации различаются"""
+        if self.buckets != other.buckets:
+            raise ValueError("Дайджесты с разным числом корзин несравнимы")
+        if self.root == other.root:
+            return []
+
+        result = []
+        stack = [1]
+        while stack:
+            node = stack.pop()
+            if self._tree[node] == other._tree[node]:
+                continue
+            if node >= self.buckets:
+                result.append(node - self.buckets)
+            else:
+                stack.extend((2 * node + 1, 2 * node))
+        return result
+
+    def select(self, config: Mapping[str, Any], buckets: Iterable[int]) -> ConfigDict:
+        """
+        Часть конфигурации из заданных корзин (ключи — по корзинам) за
+        O(ключей этих корзин). У дайджеста, загруженного с диска, индекс
+        строится по config при первом вызове.
+        """
+        if self._index is None:
+            self._index = [{} for _ in range(self.buckets)]
+            for key in config:
+                self._index[self.bucket(key)][key] = None
+        return {
+            key: config[key]
+            for bucket in sorted(set(buckets))
+            for key in self._index[bucket]
+            if key in config
+        }
+
+    @classmethod
+    def path_for(cls, config_path: str) -> Path:
+        """Файл дайджеста рядом с конфигурацией"""
+        return Path(f"{config_path}{cls.SUFFIX}")
+
+    def save_for(self, config_path: str) -> None:
+        """Атомарное сохранение дайджеста рядом с конфигурацией"""
+        stat = os.stat(config_path)
+        leaves = self._tree[self.buckets:]
+        try:
+            with atomic_write(self.path_for(config_path)) as f:
+                json.dump({
+                    "version": self.VERSION,
+                    "source": [stat.st_size, stat.st_mtime_ns],
+                    "keys": self.keys,
+                    "leaves": [f"{leaf:032x}" for leaf in leaves],
+                }, f)
+        except OSError as e:
+            raise ConfigError(f"Ошибка записи дайджеста {config_path}: {e}") from e
+
+    @classmethod
+    def load_for(cls, config_path: str) -> Optional['ConfigDigest']:
+        """
+        Сохранённый дайджест конфигурации или None, если его нет,
+        он повреждён или конфигурация изменилась после его записи
+        """
+        path = cls.path_for(config_path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            stat = os.stat(config_path)
+            if data["version"] != cls.VERSION or data["source"] != [stat.st_size, stat.st_mtime_ns]:
+                return None
+            digest = cls(len(data["leaves"]))
+            digest._index = None
+            digest._tree[digest.buckets:] = [int(leaf, 16) for leaf in data["leaves"]]
+            digest.keys = data["keys"]
+            return digest
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Дайджест {path} повреждён и будет пересчитан: {e}")
+            return None
@@ -22,4 +22,13 @@ class ConfigError(ModelError):
 
 class ConfigValidationError(ConfigError):
     """Ошибка валидации конфигурации"""
+
+    def __init__(self, message: str = '', violations=None):
+        super().__init__(message)
+        # Все найденные нарушения: список пар (путь JSON Pointer, описание)
+        self.violations = violations or []
+
+
+class CyclicAggregationError(ModelError):
+    """Цикл в графе агрегаций модели"""
     pass
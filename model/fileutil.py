@@ -0,0 +1,34 @@
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Union
+
+PathLike = Union[str, Path]
+
+
+@contextmanager
+def atomic_path(path: PathLike) -> Iterator[str]:
+    """
+    Временный путь рядом с path, который после успешного выхода из блока
+    атомарно переименовывается в path. Читатели видят либо старый файл,
+    либо полностью записанный новый; при ошибке временный файл удаляется.
+    """
+    path = Path(path)
+    # Файл создаёт вызывающий код с обычными правами (с учётом umask);
+    # суффикс сохраняется, чтобы, например, .gz определялся по имени
+    tmp_path = str(path.parent / f".{path.name}.{os.getpid()}.{os.urandom(4).hex()}.tmp{path.suffix}")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+@contextmanager
+def atomic_write(path: PathLike, mode: str = 'w', encoding: str = 'utf-8') -> Iterator[IO]:
+    """Открытие файла на запись с атомарной заменой (см. atomic_path)"""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
@@ -0,0 +1,353 @@
+import json
+import re
+from collections.abc import Mapping
+from itertools import chain, islice
+from json.encoder import c_make_encoder, encode_basestring
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from .exceptions import ConfigValidationError
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Символы, которые могут следовать за значением JSON
+_VALUE_END = frozenset(' \t\n\r,:]}')
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Буферизованное чтение JSON-текста с декодированием отдельных значений"""
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int) -> None:
+        """Дочитывает данные, отбрасывая уже разобранную часть буфера"""
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self) -> str:
+        """Следующий непробельный символ ('' в конце файла)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._fill(self.chunk_size)
+
+    def expect(self, char: str) -> None:
+        """Пропускает обязательный символ-разделитель"""
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(f"Ожидался символ {char!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        """
+        Декодирует очередное значение.
+
+        Значение считается полным, только если за ним в буфере следует
+        разделитель (или файл закончился): иначе число на границе блока
+        могло бы быть прочитано не полностью — '1.' из '1.5e3' декодируется
+        как 1. Размер дочитывания растёт вдвое, чтобы крупные значения
+        не разбирались заново на каждом блоке.
+        """
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                if self.eof or (end < len(self.buf) and self.buf[end] in _VALUE_END):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill(size)
+            size *= 2
+
+
+def iter_object_items(f: TextIO, chunk_size: int = 1 << 16) -> Iterator[Tuple[str, Any]]:
+    """
+    Потоковое чтение пар ключ-значение JSON-объекта верхнего уровня.
+
+    В памяти одновременно находится только текущая пара и буфер чтения.
+    """
+    reader = _Reader(f, chunk_size)
+    if reader.peek() != '{':
+        raise ConfigValidationError("Конфигурация должна быть JSON-объектом")
+    reader.pos += 1
+
+    if reader.peek() == '}':
+        reader.pos += 1
+    else:
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Ключ объекта должен быть строкой", reader.buf, reader.pos)
+            reader.expect(':')
+            yield key, reader.value()
+            if reader.peek() == ',':
+                reader.pos += 1
+                continue
+            reader.expect('}')
+            break
+
+    if reader.peek():
+        raise json.JSONDecodeError("Лишние данные после JSON-объекта", reader.buf, reader.pos)
+
+
+# Размер порции элементов, кодируемой за один вызов C-кодировщика json.
+# Текст порции копируется при сборке частей, поэтому от её размера зависит
+# пиковая память записи: 256 элементов дают те же ~70 КБ, что и json.dump
+_CHUNK = 256
+_INDENT = '    '
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
+_compact_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+_pretty_encoders: Dict[int, Callable[[Any], str]] = {}
+
+
+def _pretty_encoder(level: int) -> Callable[[Any], str]:
+    """
+    C-кодировщик плоских контейнеров на уровне level: с разделителем
+    ',\n' + отступ он выдаёт то же, что json.dump(indent=4), но без
+    медленного Python-кодировщика, который json использует при indent.
+    """
+    encode = _pretty_encoders.get(level)
+    if encode is None:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',\n' + _INDENT * level, ': '))
+        if c_make_encoder is None:
+            encode = encoder.encode
+        else:
+            # JSONEncoder.encode создаёт C-кодировщик заново при каждом вызове,
+            # что для небольших контейнеров дороже самого кодирования.
+            # Проверка циклов не нужна: плоские контейнеры их не содержат
+            iterencode = c_make_encoder(
+                None, encoder.default, encode_basestring, None, encoder.key_separator,
+                encoder.item_separator, False, False, True)
+
+            def encode(value: Any) -> str:
+                return ''.join(iterencode(value, 0))
+        _pretty_encoders[level] = encode
+    return encode
+
+
+def _is_flat(values: Iterable[Any]) -> bool:
+    """Нет ли среди значений контейнеров (проверка точных типов без цикла на Python)"""
+    return _SCALAR_TYPES.issuperset(map(type, values))
+
+
+def _encode_key(key: Any) -> str:
+    """Ключ объекта с теми же преобразованиями не-строк, что и в json"""
+    if type(key) is str:
+        return encode_basestring(key)
+    return _compact_encoder.encode({key: 0})[1:-3]
+
+
+def _encode_scalar(value: Any) -> str:
+    """Текст скаляра точного типа из _SCALAR_TYPES"""
+    value_type = type(value)
+    if value_type is str:
+        return encode_basestring(value)
+    if value_type is int:
+        return int.__repr__(value)
+    if value is None:
+        return 'null'
+    if value_type is bool:
+        return 'true' if value else 'false'
+    return _compact_encoder.encode(value)
+
+
+def _is_records(values: List[Any]) -> bool:
+    """Состоит ли список только из непустых плоских объектов и списков"""
+    types = set(map(type, values))
+    if not types.issubset((dict, list)) or not all(map(len, values)):
+        return False
+    if list in types:
+        if dict in types:
+            return all(map(_is_flat, (v.values() if type(v) is dict else v for v in values)))
+        return _is_flat(chain.from_iterable(values))
+    return _is_flat(chain.from_iterable(map(dict.values, values)))
+
+
+def _encode_records(values: List[Any], level: int) -> str:
+    """
+    Текст списка непустых плоских контейнеров одним вызовом C-кодировщика.
+
+    Кодировщик следующего уровня разделяет все элементы одинаково, поэтому
+    границы между контейнерами затем переносятся на уровень списка. Перевод
+    строки внутри строк JSON экранируется, так что сочетание закрывающей
+    скобки, разделителя и открывающей встречается только на этих границах.
+    """
+    outer, inner = _INDENT * (level + 1), _INDENT * (level + 2)
+    separator = ',\n' + inner
+    text = _pretty_encoder(level + 2)(values)
+    for closing in '}]':
+        for opening in '{[':
+            text = text.replace(closing + separator + opening,
+                                f"\n{outer}{closing},\n{outer}{opening}\n{inner}")
+    return (f"[\n{outer}{text[1]}\n{inner}{text[2:-2]}"
+            f"\n{outer}{text[-2]}\n{_INDENT * level}]")
+
+
+def _encode_small(value: Any, level: int) -> Optional[str]:
+    """
+    Текст скаляра или небольшого контейнера на уровне level; None, если
+    значение нужно кодировать по частям.
+
+    Контейнер кодируется целиком, если вместе с вложенными в нём не больше
+    _CHUNK элементов: плоские части — одним вызовом C-кодировщика, остальное
+    собирается из них без генераторов iter_encode.
+    """
+    if type(value) in _SCALAR_TYPES:
+        return _encode_scalar(value)
+    budget = [_CHUNK]
+    return _encode_tree(value, level, budget)
+
+
+def _encode_tree(value: Any, level: int, budget: List[int]) -> Optional[str]:
+    """Текст контейнера для _encode_small; budget — оставшееся число элементов"""
+    value_type = type(value)
+    if value_type is dict:
+        values = value.values()
+    elif value_type is list:
+        values = value
+    else:
+        return None
+    budget[0] -= len(value)
+    if budget[0] < 0:
+        return None
+    if not value:
+        return '{}' if value_type is dict else '[]'
+
+    inner = level + 1
+    indent = _INDENT * inner
+    if _is_flat(values):
+        text = _pretty_encoder(inner)(value)
+        return f"{text[0]}\n{indent}{text[1:-1]}\n{_INDENT * level}{text[-1]}"
+    if value_type is list and _is_records(value):
+        return _encode_records(value, level)
+
+    parts = []
+    for item in values:
+        if type(item) in _SCALAR_TYPES:
+            parts.append(_encode_scalar(item))
+            continue
+        text = _encode_tree(item, inner, budget)
+        if text is None:
+            return None
+        parts.append(text)
+    if value_type is dict:
+        parts = [f"{key}: {text}" for key, text in zip(map(_encode_key, value), parts)]
+        opening, closing = '{', '}'
+    else:
+        opening, closing = '[', ']'
+    text = (',\n' + indent).join(parts)
+    return f"{opening}\n{indent}{text}\n{_INDENT * level}{closing}"
+
+
+def _iter_object(items: Iterator[Tuple[Any, Any]], level: int, compact: bool) -> Iterator[str]:
+    if compact:
+        opening, separator, key_separator, closing = '{', ',', ':', '}'
+    else:
+        indent = _INDENT * (level + 1)
+        opening, separator, key_separator = '{\n' + indent, ',\n' + indent, ': '
+        closing = '\n' + _INDENT * level + '}'
+    encode = _compact_encoder.encode if compact else _pretty_encoder(level + 1)
+
+    first = True
+    while chunk := dict(islice(items, _CHUNK)):
+        if compact or _is_flat(chunk.values()):
+            # Порция без вложенных контейнеров кодируется целиком
+            text = encode(chunk)
+            yield (opening if first else separator) + text[1:-1]
+            first = False
+            continue
+        parts = []
+        for key, value in chunk.items():
+            prefix = (opening if first else separator) + _encode_key(key) + key_separator
+            first = False
+            text = _encode_small(value, level + 1)
+            if text is not None:
+                parts.append(prefix + text)
+                continue
+            parts.append(prefix)
+            yield ''.join(parts)
+            parts.clear()
+            yield from iter_encode(value, level + 1)
+        yield ''.join(parts)
+    yield '{}' if first else closing
+
+
+def _iter_array(values: Sequence, level: int, compact: bool) -> Iterator[str]:
+    if not values:
+        yield '[]'
+        return
+    if compact:
+        opening, separator, closing = '[', ',', ']'
+    else:
+        indent = _INDENT * (level + 1)
+        opening, separator = '[\n' + indent, ',\n' + indent
+        closing = '\n' + _INDENT * level + ']'
+    encode = _compact_encoder.encode if compact else _pretty_encoder(level + 1)
+
+    first = True
+    for start in range(0, len(values), _CHUNK):
+        chunk = values[start:start + _CHUNK]
+        if compact or _is_flat(chunk):
+            text = encode(chunk)
+            yield (opening if first else separator) + text[1:-1]
+            first = False
+            continue
+        parts = []
+        for value in chunk:
+            prefix = opening if first else separator
+            first = False
+            text = _encode_small(value, level + 1)
+            if text is not None:
+                parts.append(prefix + text)
+                continue
+            parts.append(prefix)
+            yield ''.join(parts)
+            parts.clear()
+            yield from iter_encode(value, level + 1)
+        yield ''.join(parts)
+    yield closing
+
+
+def iter_encode(value: Any, level: int = 0, compact: bool = False) -> Iterator[str]:
+    """
+    Кодирование значения в JSON по частям.
+
+    По умолчанию результат совпадает с json.dump(indent=4, ensure_ascii=False),
+    сдвинутым на level уровней вложенности; при compact=True — с
+    json.dump(separators=(',', ':'), ensure_ascii=False). Большие объекты
+    и списки кодируются порциями по _CHUNK элементов, поэтому в памяти
+    не строится текст всего значения. Отображения, отличные от dict
+    (например, DeltaOverlay), обходятся по парам без материализации.
+    """
+    if isinstance(value, Mapping):
+        return _iter_object(iter(value.items()), level, compact)
+    if isinstance(value, (list, tuple)):
+        return _iter_array(value, level, compact)
+    return iter((_compact_encoder.encode(value),))
+
+
+def dump(value: Any, f: TextIO, compact: bool = False, buffer_size: int = 1 << 13) -> None:
+    """Потоковая запись значения в файл; части копятся в буфере до buffer_size символов"""
+    parts: List[str] = []
+    size = 0
+    for part in iter_encode(value, compact=compact):
+        parts.append(part)
+        size += len(part)
+        if size >= buffer_size:
+            f.write(''.join(parts))
+            parts.clear()
+            size = 0
+    if parts:
+        f.write(''.join(parts))
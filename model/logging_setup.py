@@ -0,0 +1,51 @@
+import logging
+
+
+def setup_logging():
+    """Настройка логирования с гарантированным выводом в консоль и файл"""
+    logger = logging.getLogger()
+
+    # Если логгер уже настроен - только проверим обработчики
+    if logger.handlers:
+        # Проверяем наличие консольного обработчика
+        has_console = any(
+            isinstance(h, logging.StreamHandler)
+            and not isinstance(h, logging.FileHandler)
+            for h in logger.handlers
+        )
+
+        # Проверяем наличие файлового обработчика
+        has_file = any(
+            isinstance(h, logging.FileHandler)
+            for h in logger.handlers
+        )
+
+        # Добавляем недостающие обработчики
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+        if not has_console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(formatter)
+            logger.addHandler(console_handler)
+
+        if not has_file:
+            file_handler = logging.FileHandler('app.log', mode='a', encoding='utf-8')
+            file_handler.setFormatter(formatter)
+            logger.addHandler(file_handler)
+
+        return
+
+    # Первоначальная настройка логгера
+    logger.setLevel(logging.INFO)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    # Консольный вывод
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+
+    # Файловый вывод (режим 'a' - добавление в существующий файл)
+    file_handler = logging.FileHandler('app.log', mode='a', encoding='utf-8')
+    file_handler.setFormatter(formatter)
+
+    logger.addHandler(console_handler)
+    logger.addHandler(file_handler)
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from .fileutil import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+class BuildManifest:
+    """
+    Манифест сборки артефактов: хэши входов и выходов каждой стадии.
+
+    Стадия считается актуальной, если её входы не изменились с момента
+    последней записи, а выходы существуют и совпадают с записанными.
+    Хэши файлов кэшируются по (размер, mtime), поэтому повторная проверка
+    неизменных файлов не читает их содержимое.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.files: Dict[str, List] = {}  # путь -> [размер, mtime_ns, sha256]
+        self.stages: Dict[str, Dict[str, Dict[str, str]]] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> 'BuildManifest':
+        """Загрузка манифеста; отсутствующий или повреждённый манифест считается пустым"""
+        manifest = cls(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == cls.VERSION:
+                manifest.files = data["files"]
+                manifest.stages = data["stages"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logger.warning(f"Манифест сборки {path} повреждён и будет пересоздан: {e}")
+        return manifest
+
+    def save(self) -> None:
+        """Атомарное сохранение манифеста"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.path) as f:
+            json.dump({"version": self.VERSION, "files": self.files, "stages": self.stages}, f)
+
+    def file_hash(self, path: Path) -> str:
+        """SHA-256 файла ('' если файла нет) с кэшем по размеру и mtime"""
+        key = str(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.files.pop(key, None)
+            return ''
+
+        cached = self.files.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        self.files[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def _hashes(self, paths: Iterable[Path]) -> Dict[str, str]:
+        return {str(path): self.file_hash(path) for path in paths}
+
+    def is_stale(self, stage: str, inputs: Iterable[Path], outputs: Iterable[Path]) -> bool:
+        """Нужно ли перезапускать стадию"""
+        record = self.stages.get(stage)
+        if record is None:
+            return True
+        outputs = self._hashes(outputs)
+        return (
+            record["inputs"] != self._hashes(inputs)
+            or record["outputs"] != outputs
+            or not all(outputs.values())
+        )
+
+    def record(self, stage: str, inputs: Iterable[Path], outputs: Iterable[Path]) -> None:
+        """Запоминает входы и выходы успешно выполненной стадии"""
+        self.stages[stage] = {
+            "inputs": self._hashes(inputs),
+            "outputs": self._hashes(outputs),
+        }
+
+    def invalidate(self, stage: str) -> None:
+        """Сбрасывает запись стадии (например, перед её перезапуском)"""
+        self.stages.pop(stage, None)
@@ -0,0 +1,180 @@
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class StageRecord:
+    """Замер одной стадии"""
+
+    __slots__ = ('name', 'depth', 'wall_seconds', 'cpu_seconds', 'peak_bytes', 'counts',
+                 '_peak_acc', '_base_memory')
+
+    def __init__(self, name: str, depth: int):
+        self.name = name
+        self.depth = depth
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_bytes: Optional[int] = None
+        self.counts: Dict[str, int] = {}
+        self._peak_acc = 0
+        self._base_memory = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "peak_bytes": self.peak_bytes,
+            "counts": self.counts,
+            "pid": os.getpid(),
+        }
+
+
+class _NullRecord:
+    """Заглушка записи при выключенных метриках"""
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return {}
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_RECORD = _NullRecord()
+
+
+class Metrics:
+    """
+    Сбор метрик стадий: время, процессорное время, пиковая память
+    (через tracemalloc) и количество обработанных элементов.
+
+    В выключенном состоянии stage() и instrumented() сводятся
+    к одной проверке флага.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.profile_dir: Optional[str] = None
+        self.records: List[Dict[str, Any]] = []
+        self._stack: List[StageRecord] = []
+
+    def configure(self, enabled: bool, trace_memory: bool = True,
+                  profile_dir: Optional[str] = None) -> None:
+        """Включение или выключение сбора метрик"""
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.profile_dir = profile_dir if enabled else None
+        if self.trace_memory:
+            # tracemalloc и cProfile импортируются только при включённых метриках:
+            # модуль загружается при каждом запуске, в том числе без них
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def settings(self) -> Tuple[bool, bool, Optional[str]]:
+        """Настройки для передачи в другой процесс"""
+        return self.enabled, self.trace_memory, self.profile_dir
+
+    @contextmanager
+    def stage(self, name: str, profile: bool = False) -> Iterator[StageRecord]:
+        """
+        Замер блока кода. При profile=True и заданном profile_dir
+        профиль cProfile блока сохраняется в <profile_dir>/<name>.prof.
+        """
+        if not self.enabled:
+            yield _NULL_RECORD
+            return
+
+        record = StageRecord(name, len(self._stack))
+        if self.trace_memory:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent._peak_acc = max(parent._peak_acc, peak)
+            tracemalloc.reset_peak()
+            record._base_memory = current
+        self._stack.append(record)
+
+        profiler = None
+        if profile and self.profile_dir:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_seconds = time.perf_counter() - wall_start
+            record.cpu_seconds = time.process_time() - cpu_start
+
+            if profiler is not None:
+                profiler.disable()
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{name.replace(':', '_')}.prof"))
+
+            self._stack.pop()
+            if self.trace_memory:
+                peak = max(record._peak_acc, tracemalloc.get_traced_memory()[1])
+                record.peak_bytes = max(0, peak - record._base_memory)
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent._peak_acc = max(parent._peak_acc, peak)
+
+            self.records.append(record.to_dict())
+
+    def take_since(self, start: int) -> List[Dict[str, Any]]:
+        """Извлечение записей, добавленных после позиции start"""
+        taken = self.records[start:]
+        del self.records[start:]
+        return taken
+
+    def report(self) -> Dict[str, Any]:
+        """Содержимое metrics.json"""
+        return {"stages": self.records}
+
+
+metrics = Metrics()
+
+
+def instrumented(name: str, counts: Optional[Callable[..., Dict[str, int]]] = None):
+    """
+    Декоратор замера вызова функции.
+
+    counts(result, *args, **kwargs) возвращает количество обработанных
+    элементов, которое сохраняется вместе с замером. Аргументы передаются
+    в counts привязанными к сигнатуре функции: переданные по имени
+    позиционные параметры приходят в args, как при позиционном вызове.
+    """
+    def decorator(func):
+        signature = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal signature
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            with metrics.stage(name) as record:
+                result = func(*args, **kwargs)
+                if counts is not None:
+                    if signature is None:
+                        # inspect нужен только при включённых метриках
+                        import inspect
+                        signature = inspect.signature(func)
+                    bound = signature.bind(*args, **kwargs)
+                    record.counts.update(counts(result, *bound.args, **bound.kwargs))
+                return result
+        return wrapper
+    return decorator
+
+
+def delta_counts(delta) -> Dict[str, int]:
+    """Количество операций delta по видам"""
+    return {kind: len(delta[kind]) for kind in ("additions", "deletions", "updates")}
@@ -0,0 +1,107 @@
+import hashlib
+import logging
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Optional, Sequence, Union
+
+from .fileutil import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCache:
+    """
+    Дисковый кэш разобранной модели.
+
+    Ключ — SHA-256 содержимого XML и версия парсера, поэтому изменённая
+    модель или новая версия парсера никогда не читают старую запись.
+    Записи сохраняются через pickle и атомарно переименовываются,
+    повреждённые записи удаляются и считаются промахом. Кэш предназначен
+    только для локального каталога, которому доверяет пользователь.
+    """
+
+    SUFFIX = '.pickle'
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 256 << 20,
+                 max_age: float = 7 * 24 * 3600):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(xml_file: Union[str, Sequence[str]], version: int) -> str:
+        """
+        Ключ записи по содержимому файла модели и версии парсера.
+        Для модели из нескольких файлов учитываются содержимое и порядок всех файлов.
+        """
+        digest = hashlib.sha256(f"v{version}:".encode())
+        files = [xml_file] if isinstance(xml_file, (str, os.PathLike)) else xml_file
+        for i, path in enumerate(files):
+            if i:
+                # Граница файлов: без неё разные разбиения одного текста совпали бы
+                digest.update(f"\0{os.path.getsize(path)}:".encode())
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.SUFFIX}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Запись по ключу или None при промахе"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)  # Свежесть для вытеснения по возрасту и размеру
+        except FileNotFoundError:
+            value = None
+        except Exception as e:
+            logger.warning(f"Повреждённая запись кэша модели {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            value = None
+
+        if value is None:
+            self.misses += 1
+            logger.info(f"Кэш модели: промах ({key[:12]})")
+        else:
+            self.hits += 1
+            logger.info(f"Кэш модели: попадание ({key[:12]})")
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Атомарная запись значения с последующим вытеснением старых записей"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with atomic_write(self._path(key), 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self.evict()
+        except OSError as e:
+            # Кэш — оптимизация: ошибка записи не должна прерывать работу
+            logger.warning(f"Не удалось сохранить кэш модели: {e}")
+
+    def evict(self) -> None:
+        """Удаление записей старше max_age и самых старых сверх max_bytes"""
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
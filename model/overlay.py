@@ -0,0 +1,69 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Set
+
+from .types import ConfigDict, Delta
+
+
+class DeltaOverlay(Mapping):
+    """
+    Ленивый результат применения delta: представление исходной
+    конфигурации с наложенными изменениями без копирования словаря.
+
+    Порядок ключей и значения совпадают с результатом
+    ConfigProcessor.apply_delta. Исходная конфигурация не должна
+    меняться, пока используется представление.
+    """
+
+    def __init__(self, original: ConfigDict, delta: Delta):
+        self._original = original
+        self._removed: Set[str] = set()  # Удалённые ключи исходной конфигурации
+        self._changed: Dict[str, Any] = {}  # Новые значения ключей, оставшихся на месте
+        self._appended: Dict[str, Any] = {}  # Ключи, добавленные в конец
+
+        for key in delta["deletions"]:
+            if key in self._appended:
+                del self._appended[key]
+            elif key in self._original:
+                self._removed.add(key)
+                self._changed.pop(key, None)
+
+        for update in delta["updates"]:
+            self._set(update["key"], update["to"])
+
+        for addition in delta["additions"]:
+            self._set(addition["key"], addition["value"])
+
+    def _set(self, key: str, value: Any) -> None:
+        """Запись значения с той же семантикой порядка, что и у dict"""
+        if key in self._original and key not in self._removed:
+            self._changed[key] = value
+        else:
+            self._appended[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._appended:
+            return self._appended[key]
+        if key in self._removed:
+            raise KeyError(key)
+        if key in self._changed:
+            return self._changed[key]
+        return self._original[key]
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._appended:
+            return True
+        return key in self._original and key not in self._removed
+
+    def __iter__(self) -> Iterator[str]:
+        removed = self._removed
+        if removed:
+            yield from (key for key in self._original if key not in removed)
+        else:
+            yield from self._original
+        yield from self._appended
+
+    def __len__(self) -> int:
+        return len(self._original) - len(self._removed) + len(self._appended)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
@@ -1,20 +1,70 @@
+import os
+import sys
 import xml.etree.ElementTree as ET
 import logging
 from dataclasses import dataclass
-from typing import Dict, List, Optional
-from model.exceptions import InvalidXMLError, NoRootClassError
+from itertools import repeat
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+from model.exceptions import CyclicAggregationError, InvalidXMLError, NoRootClassError
+from model.metrics import instrumented
+from model.model_cache import ModelCache
+from model.query import ModelIndex, find_cycle
 
 logger = logging.getLogger(__name__)
 
+# Версия формата разобранной модели (входит в ключ кэша)
+PARSER_VERSION = 2
 
-@dataclass
+# Максимальный размер (в символах) поддерева, кэшируемого при генерации config.xml
+_SUBTREE_CACHE_LIMIT = 1 << 16
+# Суммарный размер кэша поддеревьев
+_SUBTREE_CACHE_BUDGET = 1 << 24
+
+
+def _shift(block: str, indent: int) -> str:
+    """Сдвиг всех строк блока XML на indent пробелов"""
+    if not indent:
+        return block
+    prefix = ' ' * indent
+    return prefix + block.replace('\n', '\n' + prefix)
+
+
+# Код неограниченной кратности '*'
+MANY = -1
+
+Multiplicity = Union[int, str, None]
+
+
+def _encode_multiplicity(value: Optional[str]) -> Multiplicity:
+    """
+    Целочисленный код границы кратности: число, MANY для '*'.
+    Нестандартные значения сохраняются строкой, чтобы вывод не менялся.
+    """
+    if value is None:
+        return None
+    if value == '*':
+        return MANY
+    # isdigit() пропускает цифры Unicode ('²'), которые int() не принимает
+    if value.isascii() and value.isdigit() and str(int(value)) == value:
+        return int(value)
+    return sys.intern(value)
+
+
+def _decode_multiplicity(code: Multiplicity) -> Optional[str]:
+    """Строковое представление границы кратности"""
+    if code is None or isinstance(code, str):
+        return code
+    return '*' if code == MANY else str(code)
+
+
+@dataclass(frozen=True, slots=True)
 class ClassAttribute:
-    """Атрибут класса модели"""
+    """Атрибут класса модели (одинаковые атрибуты разделяются между классами)"""
     name: str
     type: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Aggregation:
     """Связь между классами"""
     source: str
@@ -23,34 +73,242 @@ class Aggregation:
     target_multiplicity: str
 
 
-@dataclass
+@dataclass(slots=True, init=False)
 class ClassInfo:
-    """Информация о классе"""
+    """
+    Информация о классе. Кратности хранятся кодами (min_code, max_code),
+    а конструктор и свойства min_multiplicity/max_multiplicity принимают
+    и возвращают прежние строки.
+    """
     name: str
     is_root: bool
     documentation: str
-    attributes: List[ClassAttribute]
-    min_multiplicity: Optional[str] = None  # Минимальная кратность
-    max_multiplicity: Optional[str] = None  # Максимальная кратность
+    attributes: Tuple[ClassAttribute, ...]
+    min_code: Multiplicity  # Минимальная кратность (код)
+    max_code: Multiplicity  # Максимальная кратность (код)
+
+    def __init__(self, name: str, is_root: bool, documentation: str,
+                 attributes: Sequence[ClassAttribute],
+                 min_multiplicity: Optional[str] = None,
+                 max_multiplicity: Optional[str] = None):
+        self.name = name
+        self.is_root = is_root
+        self.documentation = documentation
+        self.attributes = tuple(attributes)
+        self.min_code = _encode_multiplicity(min_multiplicity)
+        self.max_code = _encode_multiplicity(max_multiplicity)
+
+    @property
+    def min_multiplicity(self) -> Optional[str]:
+        """Минимальная кратность"""
+        return _decode_multiplicity(self.min_code)
+
+    @min_multiplicity.setter
+    def min_multiplicity(self, value: Optional[str]) -> None:
+        self.min_code = _encode_multiplicity(value)
+
+    @property
+    def max_multiplicity(self) -> Optional[str]:
+        """Максимальная кратность"""
+        return _decode_multiplicity(self.max_code)
+
+    @max_multiplicity.setter
+    def max_multiplicity(self, value: Optional[str]) -> None:
+        self.max_code = _encode_multiplicity(value)
+
+
+# Таблицы фрагмента модели: классы и агрегации в виде кортежей полей
+# (кортежи передаются между процессами в несколько раз быстрее объектов)
+ShardTables = Tuple[List[tuple], List[tuple]]
+
+
+def _parse_shard(xml_file: str, streaming: bool) -> ShardTables:
+    """Разбор одного фрагмента модели в процессе пула"""
+    parser = ModelParser(xml_file)
+    try:
+        parser._read(xml_file, streaming)
+    except ET.ParseError as e:
+        raise InvalidXMLError(f"Ошибка парсинга XML {xml_file}: {e}") from e
+    classes = [
+        (info.name, info.is_root, info.documentation, tuple((a.name, a.type) for a in info.attributes))
+        for info in parser.classes.values()
+    ]
+    aggregations = [
+        (agg.source, agg.target, agg.source_multiplicity, agg.target_multiplicity)
+        for agg in parser.aggregations
+    ]
+    return classes, aggregations
+
+
+def _model_counts(result, parser: "ModelParser", *args, **kwargs) -> Dict[str, int]:
+    """Размер разобранной модели для метрик parse()"""
+    return {"classes": len(parser.classes), "aggregations": len(parser.aggregations)}
+
+
+def _class_counts(result, parser: "ModelParser", *args, **kwargs) -> Dict[str, int]:
+    """Число классов модели для метрик генерации config.xml"""
+    return {"classes": len(parser.classes)}
 
 
 class ModelParser:
     """Парсер UML модели из XML"""
 
-    def __init__(self, xml_file: str):
+    def __init__(self, xml_file: Union[str, Sequence[str]]):
+        # Один файл модели или список файлов-фрагментов (например, по подсистемам)
         self.xml_file = xml_file
         self.classes: Dict[str, ClassInfo] = {}
         self.aggregations: List[Aggregation] = []
         self.root_class: Optional[str] = None
+        # Индекс агрегаций: дочерние классы по цели и родители по источнику
+        self.children: Dict[str, List[str]] = {}
+        self.parents: Dict[str, List[str]] = {}
+        # Кратности агрегаций, встреченных раньше своего класса-источника
+        self._pending_multiplicity: Dict[str, str] = {}
+        # Общие экземпляры одинаковых атрибутов
+        self._attribute_pool: Dict[Tuple[str, str], ClassAttribute] = {}
+        self._query: Optional[ModelIndex] = None
+        # Ключ содержимого модели (см. ModelCache.key_for), вычисляется один раз
+        self._content_key: Optional[str] = None
+
+    @instrumented("ModelParser.parse", _model_counts)
+    def parse(self, streaming: bool = False, cache: Optional[ModelCache] = None,
+              max_workers: Optional[int] = None) -> None:
+        """
+        Основной метод парсинга XML
+
+        При streaming=True файл читается потоково через ET.iterparse:
+        элементы разбираются за один проход и освобождаются сразу после
+        обработки, поэтому пиковое потребление памяти не растёт с размером файла.
+
+        Если передан cache, модель с тем же содержимым берётся из кэша
+        без разбора XML, а после разбора сохраняется в него.
 
-    def parse(self) -> None:
-        """Основной метод парсинга XML"""
-        try:
-            tree = ET.parse(self.xml_file)
+        Модель из нескольких файлов разбирается параллельно в пуле из
+        max_workers процессов (по умолчанию — по числу ядер), после чего
+        фрагменты объединяются.
+        """
+        # Состояние предыдущего разбора не должно влиять на новый
+        self.classes = {}
+        self.aggregations = []
+        self.root_class = None
+        self._pending_multiplicity = {}
+        self._content_key = None
+
+        key = None
+        if cache is not None:
+            key = self._content_key = cache.key_for(self.xml_file, PARSER_VERSION)
+            if (state := cache.get(key)) is not None:
+                self.classes, self.aggregations, self.root_class = state
+                self._build_index()
+                self._validate_model()
+                return
+
+        files = [self.xml_file] if isinstance(self.xml_file, (str, os.PathLike)) else list(self.xml_file)
+        if len(files) == 1:
+            try:
+                self._read(files[0], streaming)
+            except ET.ParseError as e:
+                raise InvalidXMLError(f"Ошибка парсинга XML: {e}") from e
+        else:
+            self._merge_shards(files, self._parse_shards(files, streaming, max_workers))
+        self._build_index()
+        self._validate_model()
+
+        if cache is not None:
+            cache.put(key, (self.classes, self.aggregations, self.root_class))
+
+    def content_key(self) -> str:
+        """
+        Ключ содержимого модели, тот же, что у ModelCache: при разборе
+        с кэшем берётся готовый, иначе файлы хэшируются при первом вызове
+        """
+        if self._content_key is None:
+            self._content_key = ModelCache.key_for(self.xml_file, PARSER_VERSION)
+        return self._content_key
+
+    def _read(self, xml_file: str, streaming: bool) -> None:
+        """Разбор классов и связей одного файла без проверки модели"""
+        if streaming:
+            self._iterparse_classes(xml_file)
+        else:
+            tree = ET.parse(xml_file)
             self._parse_classes(tree.getroot())
-            self._validate_model()
-        except ET.ParseError as e:
-            raise InvalidXMLError(f"Ошибка парсинга XML: {e}") from e
+
+    @staticmethod
+    def _parse_shards(files: List[str], streaming: bool, max_workers: Optional[int]) -> List[ShardTables]:
+        """
+        Параллельный разбор фрагментов модели. Крупные файлы отправляются
+        в пул первыми, чтобы общее время определял самый большой фрагмент.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = min(len(files), max_workers or os.cpu_count() or 1)
+        by_size = sorted(range(len(files)), key=lambda i: os.path.getsize(files[i]), reverse=True)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {i: executor.submit(_parse_shard, files[i], streaming) for i in by_size}
+            return [futures[i].result() for i in range(len(files))]
+
+    def _merge_shards(self, files: List[str], shards: List[ShardTables]) -> None:
+        """
+        Объединение фрагментов модели в порядке файлов. Класс может быть
+        объявлен только в одном фрагменте, корневой класс — один на модель,
+        концы агрегаций должны ссылаться на объявленные классы. Кратности
+        устанавливаются так же, как при разборе одного файла из всех фрагментов.
+        """
+        owners: Dict[str, str] = {}
+        for xml_file, (classes, aggregations) in zip(files, shards):
+            for name, is_root, documentation, attributes in classes:
+                if name in owners:
+                    raise InvalidXMLError(f"Класс {name} объявлен в нескольких файлах: {owners[name]}, {xml_file}")
+                owners[name] = xml_file
+                name = sys.intern(name)
+                self.classes[name] = ClassInfo(
+                    name=name,
+                    is_root=is_root,
+                    documentation=sys.intern(documentation),
+                    attributes=tuple(self._attribute(*attr) for attr in attributes)
+                )
+            self.aggregations.extend(
+                Aggregation(*map(sys.intern, fields)) for fields in aggregations
+            )
+
+        roots = [name for name, info in self.classes.items() if info.is_root]
+        if len(roots) > 1:
+            raise InvalidXMLError(f"Корневой класс объявлен несколько раз: {', '.join(roots)}")
+        self.root_class = roots[0] if roots else None
+
+        for agg in self.aggregations:
+            for endpoint in (agg.source, agg.target):
+                if endpoint not in self.classes:
+                    raise InvalidXMLError(
+                        f"Агрегация {agg.source} -> {agg.target} ссылается на необъявленный класс {endpoint}")
+            self._set_multiplicity(agg.source, agg.source_multiplicity)
+
+    def _iterparse_classes(self, xml_file: str) -> None:
+        """Однопроходный потоковый парсинг классов и связей"""
+        parents: List[ET.Element] = []  # Цепочка открытых элементов
+        class_depth = 0  # Количество открытых элементов <Class>
+
+        for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+            if event == 'start':
+                parents.append(elem)
+                if elem.tag == 'Class':
+                    class_depth += 1
+                continue
+
+            parents.pop()
+            if elem.tag == 'Class':
+                class_depth -= 1
+                if name := elem.get('name'):
+                    self._parse_class_element(elem, name)
+            elif elem.tag == 'Aggregation':
+                if (src := elem.get('source')) and (tgt := elem.get('target')):
+                    self._parse_aggregation_element(elem, src, tgt)
+
+            # Атрибуты нужны классу до его закрытия, остальное освобождаем сразу
+            if class_depth == 0 and parents:
+                elem.clear()
+                parents[-1].remove(elem)
 
     def _parse_classes(self, root: ET.Element) -> None:
         """Парсинг классов и связей"""
@@ -66,78 +324,268 @@ class ModelParser:
 
     def _parse_class_element(self, elem: ET.Element, name: str) -> None:
         """Парсинг отдельного класса"""
+        name = sys.intern(name)
         self.classes[name] = ClassInfo(
             name=name,
             is_root=elem.get('isRoot', 'false').lower() == 'true',
-            documentation=elem.get('documentation', ''),
-            attributes=[
-                ClassAttribute(a.get('name'), a.get('type'))
+            documentation=sys.intern(elem.get('documentation', '')),
+            attributes=tuple(
+                self._attribute(a.get('name'), a.get('type'))
                 for a in elem.findall('.//Attribute')
                 if a.get('name') and a.get('type')
-            ]
+            )
         )
         if self.classes[name].is_root:
             self.root_class = name
 
+        # Агрегация могла встретиться раньше самого класса
+        if (multiplicity := self._pending_multiplicity.pop(name, None)) is not None:
+            self._set_multiplicity(name, multiplicity)
+
     def _parse_aggregation_element(self, elem: ET.Element, src: str, tgt: str) -> None:
         """Парсинг отдельной агрегации"""
         agg = Aggregation(
-            source=src,
-            target=tgt,
-            source_multiplicity=elem.get('sourceMultiplicity', '1'),
-            target_multiplicity=elem.get('targetMultiplicity', '1')
+            source=sys.intern(src),
+            target=sys.intern(tgt),
+            source_multiplicity=sys.intern(elem.get('sourceMultiplicity', '1')),
+            target_multiplicity=sys.intern(elem.get('targetMultiplicity', '1'))
         )
         self.aggregations.append(agg)
 
         # Обновляем кратность для класса-источника
         if src in self.classes:
-            min_max = agg.source_multiplicity.split('..')
-            self.classes[src].min_multiplicity = min_max[0]
-            self.classes[src].max_multiplicity = min_max[-1]
+            self._set_multiplicity(src, agg.source_multiplicity)
+        else:
+            self._pending_multiplicity[src] = agg.source_multiplicity
+
+    def _attribute(self, name: str, attr_type: str) -> ClassAttribute:
+        """Общий экземпляр атрибута с интернированными именем и типом"""
+        key = (name, attr_type)
+        attr = self._attribute_pool.get(key)
+        if attr is None:
+            attr = self._attribute_pool[key] = ClassAttribute(sys.intern(name), sys.intern(attr_type))
+        return attr
+
+    def _set_multiplicity(self, name: str, multiplicity: str) -> None:
+        """Установка кратности класса из строки вида 'min..max'"""
+        min_max = multiplicity.split('..')
+        info = self.classes[name]
+        info.min_code = _encode_multiplicity(min_max[0])
+        info.max_code = _encode_multiplicity(min_max[-1])
+
+    def _build_index(self) -> None:
+        """Построение индекса смежности по агрегациям за один проход"""
+        self.children = {}
+        self.parents = {}
+        self._query = None
+        for agg in self.aggregations:
+            self.children.setdefault(agg.target, []).append(agg.source)
+            self.parents.setdefault(agg.source, []).append(agg.target)
+
+    def _class_order(self) -> List[str]:
+        """
+        Порядок классов для meta.json: обратный обход графа агрегаций
+        (дочерние классы раньше родителя), начиная с корня.
+        Классы, недостижимые из корня, добавляются следом в порядке объявления.
+        """
+        order: List[str] = []
+        visited = set()
+        starts = [self.root_class] if self.root_class else []
+        starts.extend(name for name in self.classes if name not in self.parents)
+        starts.extend(self.classes)
+
+        for start in starts:
+            if start in visited:
+                continue
+            visited.add(start)
+            stack = [(start, iter(self.children.get(start, ())))]
+            while stack:
+                name, children = stack[-1]
+                for child in children:
+                    if child not in visited:
+                        visited.add(child)
+                        stack.append((child, iter(self.children.get(child, ()))))
+                        break
+                else:
+                    stack.pop()
+                    if name in self.classes:
+                        order.append(name)
+
+        return order
 
     def _validate_model(self) -> None:
         """Проверка валидности модели"""
         if not self.root_class:
             raise NoRootClassError("Не найден корневой класс")
+        cycle = find_cycle(self.children)
+        if cycle:
+            raise CyclicAggregationError(f"Цикл агрегаций: {' -> '.join(cycle)}")
+
+    @property
+    def query(self) -> ModelIndex:
+        """Индекс запросов к модели (строится при первом обращении)"""
+        if self._query is None:
+            self._query = ModelIndex(self)
+        return self._query
 
-    def generate_config_xml(self) -> str:
+    @instrumented("ModelParser.generate_config_xml", _class_counts)
+    def generate_config_xml(self, expand: bool = False,
+                            counts: Optional[Dict[str, int]] = None) -> str:
         """Генерация config.xml"""
+        return ''.join(self.iter_config_xml(expand, counts))
+
+    @instrumented("ModelParser.write_config_xml", _class_counts)
+    def write_config_xml(self, f: TextIO, expand: bool = False,
+                         counts: Optional[Dict[str, int]] = None) -> None:
+        """Потоковая запись config.xml в открытый файл"""
+        f.writelines(self.iter_config_xml(expand, counts))
+
+    def instance_counts(self, expand: bool = False,
+                        counts: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        """
+        Количество экземпляров каждого класса в config.xml.
+
+        По умолчанию каждый класс выводится одним шаблонным элементом.
+        При expand=True класс разворачивается до максимальной кратности
+        (для неограниченной '*' берётся минимальная, но не меньше 1).
+        Явные значения из counts имеют приоритет.
+        """
+        result = {}
+        for name, info in self.classes.items():
+            result[name] = self._max_instances(info) if expand else 1
+        if counts:
+            result.update(counts)
+        if self.root_class:
+            result[self.root_class] = 1
+        return result
+
+    @staticmethod
+    def _max_instances(info: ClassInfo) -> int:
+        """Максимальное число экземпляров класса по его кратности"""
+        if info.max_code is None:
+            return 1
+        max_code, min_code = info.max_code, info.min_code
+        # Нестандартная запись числа (например, '007') хранится строкой;
+        # цифры Unicode ('²') числом не считаются
+        if isinstance(max_code, str) and max_code.isascii() and max_code.isdigit():
+            max_code = int(max_code)
+        if isinstance(min_code, str) and min_code.isascii() and min_code.isdigit():
+            min_code = int(min_code)
+        if isinstance(max_code, int) and max_code != MANY:
+            return max_code
+        if isinstance(min_code, int) and min_code != MANY:
+            return max(min_code, 1)
+        return 1
+
+    def iter_config_xml(self, expand: bool = False,
+                        counts: Optional[Dict[str, int]] = None) -> Iterator[str]:
+        """
+        Нерекурсивная генерация config.xml по частям.
+
+        Поддеревья небольших классов рендерятся один раз снизу вверх и затем
+        переиспользуются со сдвигом отступа, поэтому развёртывание классов
+        по кратностям не требует обхода каждого экземпляра.
+        Крупные поддеревья обходятся по явному стеку: глубина иерархии
+        не ограничена лимитом рекурсии, а память зависит от глубины дерева
+        и размера кэша, но не от размера результата.
+        """
         if not self.root_class:
             raise NoRootClassError("Невозможно сгенерировать XML без корневого класса")
 
-        def build_xml(class_name: str, indent: int = 0) -> str:
-            """Рекурсивное построение XML"""
-            class_info = self.classes[class_name]
-            xml = [f"{' ' * indent}<{class_name}>"]
+        instances = self.instance_counts(expand, counts)
+        blocks = self._render_blocks(instances)
+        # Сдвинутые блоки кэшируются в пределах того же бюджета, что и сами блоки
+        shifted: Dict[Tuple[str, int], str] = {}
+        shifted_size = 0
 
-            # Атрибуты класса
-            xml.extend(
-                f"{' ' * (indent + 4)}<{attr.name}>{attr.type}</{attr.name}>"
-                for attr in class_info.attributes
-            )
+        def block_at(class_name: str, indent: int) -> str:
+            nonlocal shifted_size
+            key = (class_name, indent)
+            block = shifted.get(key)
+            if block is None:
+                block = _shift(blocks[class_name], indent)
+                if shifted_size + len(block) <= _SUBTREE_CACHE_BUDGET:
+                    shifted[key] = block
+                    shifted_size += len(block)
+            return block
 
-            # Дочерние классы
-            xml.extend(
-                build_xml(agg.source, indent + 4)
-                for agg in self.aggregations
-                if agg.target == class_name
-            )
+        if self.root_class in blocks:
+            yield blocks[self.root_class]
+            return
 
-            xml.append(f"{' ' * indent}</{class_name}>")
-            return '\n'.join(xml)
+        yield self._open_element(self.root_class, 0)
+        stack = [(self.root_class, 0, self._child_runs(self.root_class, instances, blocks))]
 
-        return build_xml(self.root_class)
+        while stack:
+            class_name, indent, children = stack[-1]
+            run = next(children, None)
+            if run is None:
+                stack.pop()
+                yield f"\n{' ' * indent}</{class_name}>"
+                continue
+
+            child, count = run
+            if child in blocks:
+                chunk = '\n' + block_at(child, indent + 4)
+                for _ in range(count):
+                    yield chunk
+            else:
+                yield '\n' + self._open_element(child, indent + 4)
+                stack.append((child, indent + 4, self._child_runs(child, instances, blocks)))
+
+    def _child_runs(self, class_name: str, instances: Dict[str, int],
+                    blocks: Dict[str, str]) -> Iterator[Tuple[str, int]]:
+        """Дочерние классы с числом экземпляров; некэшированные — по одному"""
+        for child in self.children.get(class_name, ()):
+            count = instances.get(child, 1)
+            if child in blocks:
+                yield child, count
+            else:
+                yield from repeat((child, 1), count)
+
+    def _render_blocks(self, instances: Dict[str, int]) -> Dict[str, str]:
+        """
+        Рендеринг поддеревьев с нулевым отступом снизу вверх.
+        Кэшируются только поддеревья не длиннее _SUBTREE_CACHE_LIMIT символов,
+        пока суммарный размер кэша не превысит _SUBTREE_CACHE_BUDGET.
+        """
+        blocks: Dict[str, str] = {}
+        total = 0
+        for class_name in self._class_order():
+            if total > _SUBTREE_CACHE_BUDGET:
+                break
+            parts = [self._open_element(class_name, 0)]
+            size = len(parts[0])
+            for child in self.children.get(class_name, ()):
+                count = instances.get(child, 1)
+                if count <= 0:
+                    continue
+                if child not in blocks:
+                    break
+                chunk = '\n' + _shift(blocks[child], 4)
+                size += len(chunk) * count
+                if size > _SUBTREE_CACHE_LIMIT:
+                    break
+                parts.append(chunk * count)
+            else:
+                parts.append(f"\n</{class_name}>")
+                blocks[class_name] = ''.join(parts)
+                total += size
+        return blocks
 
+    def _open_element(self, class_name: str, indent: int) -> str:
+        """Открывающий тег класса вместе с его атрибутами"""
+        return f"{' ' * indent}<{class_name}>" + ''.join(
+            f"\n{' ' * (indent + 4)}<{attr.name}>{attr.type}</{attr.name}>"
+            for attr in self.classes[class_name].attributes
+        )
+
+    @instrumented("ModelParser.generate_meta_json", lambda r, *a, **k: {"classes": len(r)})
     def generate_meta_json(self) -> List[Dict]:
         """Генерация meta.json согласно ТЗ"""
-        order = ["MetricJob", "CPLANE", "MGMT", "RU", "HWE", "COMM", "BTS"]
-        source_classes = {agg.source for agg in self.aggregations}
         result = []
 
-        for cls in order:
-            if cls not in self.classes:
-                continue
-
+        for cls in self._class_order():
             info = self.classes[cls]
             entry = {
                 "class": cls,
@@ -147,13 +595,12 @@ class ModelParser:
                                   {"name": attr.name, "type": attr.type}
                                   for attr in info.attributes
                               ] + [
-                                  {"name": agg.source, "type": "class"}
-                                  for agg in self.aggregations
-                                  if agg.target == cls
+                                  {"name": child, "type": "class"}
+                                  for child in self.children.get(cls, ())
                               ]
             }
 
-            if cls in source_classes:
+            if cls in self.parents:
                 entry.update({
                     "min": info.min_multiplicity,
                     "max": info.max_multiplicity
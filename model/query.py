@@ -0,0 +1,169 @@
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from model.parser import ModelParser
+
+
+def find_cycle(children: Dict[str, List[str]]) -> Optional[List[str]]:
+    """
+    Поиск цикла в графе агрегаций (итеративный DFS с раскраской).
+    Возвращает классы цикла, начиная и заканчивая одним и тем же классом,
+    или None, если циклов нет.
+    """
+    state: Dict[str, int] = {}  # 1 — в текущем пути обхода, 2 — обработан
+    for start in children:
+        if start in state:
+            continue
+        state[start] = 1
+        path = [start]
+        stack = [iter(children.get(start, ()))]
+        while stack:
+            for child in stack[-1]:
+                child_state = state.get(child)
+                if child_state == 1:
+                    return path[path.index(child):] + [child]
+                if child_state is None:
+                    state[child] = 1
+                    path.append(child)
+                    stack.append(iter(children.get(child, ())))
+                    break
+            else:
+                state[path.pop()] = 2
+                stack.pop()
+    return None
+
+
+class ModelIndex:
+    """
+    Предвычисленный индекс запросов к модели.
+
+    Классы нумеруются обходом в глубину от корня (эйлеров обход):
+    поддерево класса занимает отрезок [tin, tout) этой нумерации, поэтому
+    принадлежность поддереву проверяется за O(1). Класс с несколькими
+    родителями попадает в отрезок только первого из них; для таких классов
+    дополнительно хранится полное множество предков.
+    """
+
+    def __init__(self, parser: 'ModelParser'):
+        self._children = parser.children
+        self._parents = parser.parents
+        self.order: List[str] = []
+        self.tin: Dict[str, int] = {}
+        self.tout: Dict[str, int] = {}
+        self.depth: Dict[str, int] = {}
+        self._tree_parent: Dict[str, Optional[str]] = {}
+        # Ближайший предок (или сам класс) с несколькими родителями
+        self._junction: Dict[str, Optional[str]] = {}
+        self._junction_ancestors: Dict[str, FrozenSet[str]] = {}
+        self._by_attribute: Dict[Tuple[str, str], List[str]] = {}
+        self._by_attribute_name: Dict[str, List[str]] = {}
+        self._by_attribute_type: Dict[str, List[str]] = {}
+
+        starts = [parser.root_class] if parser.root_class else []
+        starts.extend(name for name in parser.classes if name not in self._parents)
+        starts.extend(parser.classes)
+        for start in starts:
+            if start not in self.tin:
+                self._euler_tour(start)
+
+        for name in self.order:
+            if len(self._parents.get(name, ())) > 1:
+                self._junction_ancestors[name] = frozenset(self._walk_up(name))
+
+        for name, info in parser.classes.items():
+            for attr in info.attributes:
+                self._by_attribute.setdefault((attr.name, attr.type), []).append(name)
+                self._by_attribute_name.setdefault(attr.name, []).append(name)
+                self._by_attribute_type.setdefault(attr.type, []).append(name)
+
+    def _euler_tour(self, start: str) -> None:
+        """Нумерация поддерева start в порядке обхода в глубину"""
+        self._enter(start, None)
+        stack = [(start, iter(self._children.get(start, ())))]
+        while stack:
+            name, children = stack[-1]
+            for child in children:
+                if child not in self.tin:
+                    self._enter(child, name)
+                    stack.append((child, iter(self._children.get(child, ()))))
+                    break
+            else:
+                stack.pop()
+                self.tout[name] = len(self.order)
+
+    def _enter(self, name: str, parent: Optional[str]) -> None:
+        self.tin[name] = len(self.order)
+        self.order.append(name)
+        self._tree_parent[name] = parent
+        self.depth[name] = 0 if parent is None else self.depth[parent] + 1
+        if len(self._parents.get(name, ())) > 1:
+            self._junction[name] = name
+        else:
+            self._junction[name] = None if parent is None else self._junction[parent]
+
+    def _walk_up(self, name: str) -> Set[str]:
+        """Все предки класса по всем родителям"""
+        seen: Set[str] = set()
+        stack = list(self._parents.get(name, ()))
+        while stack:
+            parent = stack.pop()
+            if parent not in seen:
+                seen.add(parent)
+                stack.extend(self._parents.get(parent, ()))
+        return seen
+
+    def parent(self, name: str) -> Optional[str]:
+        """Родитель класса (первый по порядку агрегаций) или None"""
+        return self._tree_parent.get(name)
+
+    def parents(self, name: str) -> List[str]:
+        """Все родители класса"""
+        return list(self._parents.get(name, ()))
+
+    def children(self, name: str) -> List[str]:
+        """Дочерние классы"""
+        return list(self._children.get(name, ()))
+
+    def root_path(self, name: str) -> List[str]:
+        """Путь от класса до корня через первых родителей, включая оба конца"""
+        if name not in self.tin:
+            raise KeyError(name)
+        path = [name]
+        while (parent := self._tree_parent[path[-1]]) is not None:
+            path.append(parent)
+        return path
+
+    def is_descendant(self, ancestor: str, name: str) -> bool:
+        """Входит ли класс name в поддерево ancestor (сам ancestor входит)"""
+        if ancestor not in self.tin or name not in self.tin:
+            return False
+        if self.tin[ancestor] <= self.tin[name] < self.tout[ancestor]:
+            return True
+        junction = self._junction[name]
+        return junction is not None and ancestor in self._junction_ancestors[junction]
+
+    def subtree(self, name: str) -> List[str]:
+        """Классы поддерева name в порядке обхода, начиная с самого name"""
+        if name not in self.tin:
+            raise KeyError(name)
+        result = self.order[self.tin[name]:self.tout[name]]
+        if self._junction_ancestors:
+            seen = set(result)
+            for junction, ancestors in self._junction_ancestors.items():
+                if name in ancestors and junction not in seen:
+                    for member in self.order[self.tin[junction]:self.tout[junction]]:
+                        if member not in seen:
+                            seen.add(member)
+                            result.append(member)
+        return result
+
+    def classes_with_attribute(self, name: Optional[str] = None,
+                               type: Optional[str] = None) -> List[str]:
+        """Классы с атрибутом заданного имени и/или типа"""
+        if name is not None and type is not None:
+            return list(self._by_attribute.get((name, type), ()))
+        if name is not None:
+            return list(self._by_attribute_name.get(name, ()))
+        if type is not None:
+            return list(self._by_attribute_type.get(type, ()))
+        raise ValueError("Нужно указать имя или тип атрибута")
@@ -0,0 +1,343 @@
+"""
+Резидентный режим: модель разбирается один раз и держится в памяти,
+запросы на генерацию и применение delta и на генерацию config.xml
+обслуживаются через локальный сокет.
+
+Запуск:
+    python -m model.service --socket /tmp/yadro.sock
+    python -m model.service --port 8765        # localhost TCP
+
+Протокол — JSON Lines: одна строка запроса, одна строка ответа.
+    {"id": 1, "op": "generate_delta", "original": {...}, "patched": {...}}
+    {"id": 2, "op": "apply_delta", "original": {...}, "delta": {...}}
+    {"id": 3, "op": "render_config", "expand": false}
+    {"id": 4, "op": "ping"}
+Ответ: {"id": ..., "ok": true, "result": ...}
+или {"id": ..., "ok": false, "error": "..."}.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import stat
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .config import AppConfig
+from .config_processor import ConfigProcessor
+from .exceptions import ConfigError, ModelError
+from .logging_setup import setup_logging
+from .model_cache import ModelCache
+from .parser import PARSER_VERSION, ModelParser
+
+logger = logging.getLogger(__name__)
+
+# Предел строки запроса (asyncio.StreamReader)
+_LINE_LIMIT = 1 << 30
+
+
+# Модели процессов пула: ModelHolder передаётся в процесс ссылкой на файл,
+# а не разобранной моделью, и разбирается там один раз
+_local_holders: Dict[str, 'ModelHolder'] = {}
+
+
+def _local_holder(xml_file: str, cache: Optional[ModelCache]) -> 'ModelHolder':
+    holder = _local_holders.get(xml_file)
+    if holder is None:
+        holder = _local_holders[xml_file] = ModelHolder(xml_file, cache)
+    return holder
+
+
+class ModelHolder:
+    """
+    Разобранная модель с перезагрузкой при изменении XML.
+
+    Изменение определяется по (размер, mtime); содержимое хэшируется
+    только при изменении этих атрибутов, поэтому проверка неизменного
+    файла на каждом запросе стоит одного stat().
+    """
+
+    def __init__(self, xml_file: str, cache: Optional[ModelCache] = None):
+        self.xml_file = xml_file
+        self.cache = cache
+        self.parser: Optional[ModelParser] = None
+        self.reloads = 0
+        self._stat: Optional[Tuple[int, int]] = None
+        self._key: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        return _local_holder, (self.xml_file, self.cache)
+
+    def current(self) -> ModelParser:
+        """Актуальная модель; при изменении файла модель разбирается заново"""
+        with self._lock:
+            stat_result = os.stat(self.xml_file)
+            signature = (stat_result.st_size, stat_result.st_mtime_ns)
+            if self.parser is not None and signature == self._stat:
+                return self.parser
+
+            key = ModelCache.key_for(self.xml_file, PARSER_VERSION)
+            if self.parser is None or key != self._key:
+                parser = ModelParser(self.xml_file)
+                parser.parse(cache=self.cache)
+                self.parser = parser
+                self._key = key
+                self.reloads += 1
+                logger.info(f"Модель загружена: {self.xml_file} ({len(parser.classes)} классов)")
+            self._stat = signature
+            return self.parser
+
+
+def _render_config(holder: ModelHolder, expand: bool) -> str:
+    """Генерация config.xml по актуальной модели (выполняется в executor)"""
+    return holder.current().generate_config_xml(expand=expand)
+
+
+def _delta_size(delta: Dict[str, Any]) -> int:
+    return len(delta["additions"]) + len(delta["deletions"]) + len(delta["updates"])
+
+
+class ModelService:
+    """
+    Обработчик запросов резидентного режима.
+
+    Небольшие diff и применения delta выполняются прямо в цикле событий:
+    для них передача в другой процесс дороже самой операции. Конфигурации
+    крупнее inline_limit ключей и операций, а также генерация config.xml
+    (с возможной перезагрузкой модели) выполняются в executor, чтобы не
+    блокировать остальные запросы.
+    """
+
+    def __init__(self, holder: ModelHolder, executor: Optional[Executor] = None,
+                 inline_limit: int = 10_000):
+        self.holder = holder
+        self.executor = executor
+        self.inline_limit = inline_limit
+        self._handlers = {
+            'ping': self._ping,
+            'generate_delta': self._generate_delta,
+            'apply_delta': self._apply_delta,
+            'render_config': self._render_config,
+        }
+
+    async def _run(self, func, *args):
+        """Вызов func в executor (если задан) или в текущем потоке"""
+        if self.executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    @staticmethod
+    def _config(request: Dict[str, Any], name: str) -> Dict:
+        value = request.get(name)
+        if not isinstance(value, dict):
+            raise ConfigError(f"Поле '{name}' должно быть JSON-объектом")
+        return value
+
+    @staticmethod
+    def _delta(request: Dict[str, Any]) -> Dict:
+        """Поле delta с проверкой структуры операций"""
+        delta = ModelService._config(request, 'delta')
+        for field in ('additions', 'deletions', 'updates'):
+            if not isinstance(delta.get(field), list):
+                raise ConfigError(f"Поле delta.{field} должно быть списком")
+        if not all(isinstance(key, str) for key in delta["deletions"]):
+            raise ConfigError("Элементы delta.deletions должны быть строками")
+        for field, value_field in (('additions', 'value'), ('updates', 'to')):
+            for operation in delta[field]:
+                if not (isinstance(operation, dict) and isinstance(operation.get("key"), str)
+                        and value_field in operation):
+                    raise ConfigError(f"Операция delta.{field} должна содержать 'key' и '{value_field}': {operation!r}")
+        return delta
+
+    async def _ping(self, request: Dict[str, Any]) -> Any:
+        return "pong"
+
+    async def _generate_delta(self, request: Dict[str, Any]) -> Any:
+        original = self._config(request, 'original')
+        patched = self._config(request, 'patched')
+        if len(original) + len(patched) <= self.inline_limit:
+            return ConfigProcessor.generate_delta(original, patched)
+        return await self._run(ConfigProcessor.generate_delta, original, patched)
+
+    async def _apply_delta(self, request: Dict[str, Any]) -> Any:
+        original = self._config(request, 'original')
+        delta = self._delta(request)
+        # Запрос разобран только для этого вызова, копия не нужна
+        if len(original) + _delta_size(delta) <= self.inline_limit:
+            return ConfigProcessor.apply_delta(original, delta, in_place=True)
+        return await self._run(ConfigProcessor.apply_delta, original, delta, True)
+
+    async def _render_config(self, request: Dict[str, Any]) -> Any:
+        return await self._run(_render_config, self.holder, bool(request.get('expand', False)))
+
+    async def handle(self, request: Any) -> Dict[str, Any]:
+        """Ответ на один разобранный запрос"""
+        if not isinstance(request, dict):
+            return {"id": None, "ok": False, "error": "Запрос должен быть JSON-объектом"}
+
+        request_id = request.get('id')
+        handler = self._handlers.get(request.get('op'))
+        if handler is None:
+            return {"id": request_id, "ok": False, "error": f"Неизвестная операция: {request.get('op')}"}
+
+        try:
+            return {"id": request_id, "ok": True, "result": await handler(request)}
+        except ConfigError as e:
+            return {"id": request_id, "ok": False, "error": f"Ошибка конфигурации: {e}"}
+        except ModelError as e:
+            return {"id": request_id, "ok": False, "error": f"Ошибка модели: {e}"}
+        except OSError as e:
+            return {"id": request_id, "ok": False, "error": f"Ошибка файловой системы: {e}"}
+        except Exception as e:
+            logger.error(f"Ошибка обработки запроса {request_id}: {e}", exc_info=True)
+            return {"id": request_id, "ok": False, "error": f"Внутренняя ошибка: {e}"}
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter, lock: asyncio.Lock) -> None:
+        try:
+            response = await self.handle(json.loads(line))
+        except ValueError as e:
+            response = {"id": None, "ok": False, "error": f"Некорректный JSON: {e}"}
+        data = json.dumps(response, ensure_ascii=False).encode() + b'\n'
+        async with lock:
+            writer.write(data)
+            await writer.drain()
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Обслуживание одного соединения. Запросы соединения выполняются
+        конкурентно, ответы сопоставляются с запросами по id.
+        """
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self._respond(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            logger.warning(f"Соединение закрыто с ошибкой: {e}")
+        finally:
+            writer.close()
+
+    async def start(self, socket_path: Optional[str] = None,
+                    host: str = '127.0.0.1', port: int = 0) -> asyncio.AbstractServer:
+        """
+        Запуск сервера на Unix-сокете socket_path или, если он не задан
+        либо Unix-сокеты недоступны, на TCP host:port.
+        """
+        # Модель разбирается до первого запроса
+        self.holder.current()
+        if socket_path and hasattr(socket, 'AF_UNIX'):
+            _remove_stale_socket(socket_path)
+            server = await asyncio.start_unix_server(self.serve_connection, socket_path, limit=_LINE_LIMIT)
+        else:
+            server = await asyncio.start_server(self.serve_connection, host, port, limit=_LINE_LIMIT)
+        logger.info(f"Сервис запущен: {server_address(server)}")
+        return server
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """
+    Удаление оставшегося от прошлого запуска сокета. Другие файлы и сокет,
+    на котором слушает работающий сервер, не трогаются.
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ConfigError(f"Путь {socket_path} занят файлом, не являющимся сокетом")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        probe.settimeout(1.0)
+        try:
+            probe.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            pass
+        except OSError as e:
+            raise ConfigError(f"Не удалось проверить сокет {socket_path}: {e}") from e
+        else:
+            raise ConfigError(f"На сокете {socket_path} уже работает сервер")
+    os.unlink(socket_path)
+
+
+def server_address(server: asyncio.AbstractServer):
+    """Адрес сервера в формате, принимаемом ServiceClient"""
+    address = server.sockets[0].getsockname()
+    return address[:2] if isinstance(address, tuple) else address
+
+
+class ServiceClient:
+    """Синхронный клиент резидентного режима"""
+
+    def __init__(self, address, timeout: Optional[float] = 30.0):
+        family = socket.AF_UNIX if isinstance(address, (str, Path)) else socket.AF_INET
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(str(address) if family != socket.AF_INET else tuple(address))
+        self._file = self._sock.makefile('rb')
+        self._next_id = 0
+
+    def request(self, op: str, **payload) -> Any:
+        """Выполнение запроса; ошибка сервиса пробрасывается как ConfigError"""
+        self._next_id += 1
+        message = {"id": self._next_id, "op": op, **payload}
+        self._sock.sendall(json.dumps(message, ensure_ascii=False).encode() + b'\n')
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Сервис закрыл соединение")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise ConfigError(response["error"])
+        return response["result"]
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self) -> 'ServiceClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+async def serve(xml_file: str, socket_path: Optional[str], port: int, workers: Optional[int]) -> None:
+    holder = ModelHolder(xml_file, ModelCache(AppConfig.CACHE_DIR / 'model'))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        service = ModelService(holder, executor)
+        server = await service.start(socket_path, port=port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Резидентный сервис генерации и применения delta")
+    parser.add_argument('--xml', default=str(AppConfig.get_input_path('xml')), help="Файл UML-модели")
+    parser.add_argument('--socket', help="Путь Unix-сокета")
+    parser.add_argument('--port', type=int, default=8765, help="Порт localhost, если сокет не задан")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Число процессов для крупных diff")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    try:
+        asyncio.run(serve(args.xml, args.socket, args.port, args.workers))
+    except ModelError as e:
+        logger.error(f"Ошибка модели: {e}")
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
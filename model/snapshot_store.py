@@ -0,0 +1,200 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from . import json_stream
+from .config_processor import ConfigProcessor
+from .exceptions import ConfigError
+from .fileutil import atomic_write
+from .types import ConfigDict, Delta
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """
+    Локальное хранилище версий конфигурации.
+
+    Каждая версия хранится как delta относительно предыдущей, а каждая
+    checkpoint_interval-я — дополнительно целиком, поэтому чтение любой
+    версии требует не больше checkpoint_interval - 1 применений delta.
+    Объекты (снимки и delta) адресуются SHA-256 своего содержимого и
+    хранятся сжатыми в objects/, одинаковые объекты записываются один раз.
+    Список версий хранится в index.json и обновляется атомарно.
+    """
+
+    VERSION = 1
+    INDEX = 'index.json'
+
+    def __init__(self, root: Path, checkpoint_interval: int = 16):
+        if checkpoint_interval < 1:
+            raise ValueError("Интервал контрольных точек должен быть положительным")
+        self.root = Path(root)
+        self.checkpoint_interval = checkpoint_interval
+        self.entries: List[Dict[str, Any]] = []
+        self._head: Optional[ConfigDict] = None  # Копия последней версии
+        self._load_index()
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.root / self.INDEX, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            raise ConfigError(f"Ошибка чтения индекса хранилища {self.root}: {e}") from e
+        if not isinstance(data, dict):
+            raise ConfigError(f"Индекс хранилища {self.root} должен быть объектом JSON")
+        if data.get("version") != self.VERSION:
+            raise ConfigError(f"Неподдерживаемая версия хранилища {self.root}: {data.get('version')}")
+        interval, entries = data.get("checkpoint_interval"), data.get("entries")
+        if not isinstance(interval, int) or isinstance(interval, bool) or interval < 1:
+            raise ConfigError(f"Некорректный интервал контрольных точек в индексе {self.root}: {interval!r}")
+        if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+            raise ConfigError(f"Некорректный список версий в индексе {self.root}")
+        self.checkpoint_interval = interval
+        self.entries = entries
+
+    def _save_index(self) -> None:
+        with atomic_write(self.root / self.INDEX) as f:
+            json.dump({
+                "version": self.VERSION,
+                "checkpoint_interval": self.checkpoint_interval,
+                "entries": self.entries
+            }, f, indent=4)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / 'objects' / digest[:2] / f"{digest}.json.gz"
+
+    def _put(self, value: Any) -> str:
+        """
+        Запись объекта; возвращает его адрес. Текст кодируется по частям
+        и хэшируется по мере сжатия во временный файл, который затем
+        переименовывается по адресу, — объект не собирается в памяти целиком.
+        """
+        objects = self.root / 'objects'
+        objects.mkdir(parents=True, exist_ok=True)
+        tmp_path = objects / f".{os.getpid()}.{os.urandom(4).hex()}.tmp"
+        hasher = hashlib.sha256()
+        try:
+            with gzip.open(tmp_path, 'xb', compresslevel=6) as f:
+                for part in json_stream.iter_encode(value, compact=True):
+                    data = part.encode('utf-8')
+                    hasher.update(data)
+                    f.write(data)
+            digest = hasher.hexdigest()
+            path = self._object_path(digest)
+            if path.exists():
+                tmp_path.unlink()
+            else:
+                path.parent.mkdir(exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return digest
+
+    def _get(self, digest: str) -> Any:
+        try:
+            with gzip.open(self._object_path(digest), 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise ConfigError(f"Повреждён объект хранилища {digest}: {e}") from e
+
+    def _entry(self, version: int) -> Dict[str, Any]:
+        first = self.entries[0]["version"] if self.entries else 1
+        index = version - first
+        if not self.entries or index < 0 or index >= len(self.entries):
+            raise ConfigError(f"Версия {version} отсутствует в хранилище")
+        return self.entries[index]
+
+    def versions(self) -> List[int]:
+        """Номера хранимых версий"""
+        return [entry["version"] for entry in self.entries]
+
+    def commit(self, config: ConfigDict) -> int:
+        """Сохранение новой версии; возвращает её номер"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        if not self.entries:
+            version = 1
+            entry = {"version": version, "delta": None, "full": self._put(config)}
+        else:
+            previous = self._head if self._head is not None else self.get(self.entries[-1]["version"])
+            version = self.entries[-1]["version"] + 1
+            entry = {
+                "version": version,
+                "delta": self._put(ConfigProcessor.generate_delta(previous, config)),
+                "full": self._put(config) if (version - 1) % self.checkpoint_interval == 0 else None
+            }
+
+        self.entries.append(entry)
+        self._save_index()
+        self._head = config.copy()
+        return version
+
+    def get(self, version: int) -> ConfigDict:
+        """Конфигурация заданной версии"""
+        target = self._entry(version)
+        if self._head is not None and target is self.entries[-1]:
+            return self._head.copy()
+
+        first = self.entries[0]["version"]
+        start = version
+        while self._entry(start)["full"] is None:
+            start -= 1
+            if start < first:
+                raise ConfigError(f"Нет контрольной точки для версии {version}")
+        config = self._get(self._entry(start)["full"])
+        for v in range(start + 1, version + 1):
+            config = ConfigProcessor.apply_delta(config, self._get(self._entry(v)["delta"]), in_place=True)
+        return config
+
+    def diff(self, v1: int, v2: int) -> Delta:
+        """
+        Delta от версии v1 к версии v2, собранная из хранимых delta
+        (в обратном направлении — через обратную delta; только для неё
+        версия v2 восстанавливается целиком)
+        """
+        if v1 == v2:
+            self._entry(v1)
+            return {"additions": [], "deletions": [], "updates": []}
+        low, high = min(v1, v2), max(v1, v2)
+        delta = ConfigProcessor.compose_deltas(
+            self._get(self._entry(v)["delta"]) for v in range(low + 1, high + 1)
+        )
+        if v1 < v2:
+            return delta
+        # Для обратной delta нужны значения версии v2
+        return ConfigProcessor.invert_delta(delta, self.get(low))
+
+    def gc(self, keep_last: int) -> int:
+        """
+        Удаление версий, кроме последних keep_last, и объектов, на которые
+        больше нет ссылок. Старейшая оставшаяся версия сохраняется целиком.
+        Возвращает число удалённых объектов.
+        """
+        if keep_last < 1:
+            raise ValueError("Нужно оставить хотя бы одну версию")
+        if len(self.entries) > keep_last:
+            oldest = self.entries[-keep_last]
+            if oldest["full"] is None:
+                oldest["full"] = self._put(self.get(oldest["version"]))
+            oldest["delta"] = None
+            self.entries = self.entries[-keep_last:]
+            self._save_index()
+
+        referenced: Set[str] = {
+            digest for entry in self.entries
+            for digest in (entry["delta"], entry["full"]) if digest
+        }
+        removed = 0
+        for path in (self.root / 'objects').glob('*/*.json.gz'):
+            if path.name[:-len('.json.gz')] not in referenced:
+                path.unlink(missing_ok=True)
+                removed += 1
+        logger.info(f"Хранилище {self.root}: удалено объектов {removed}")
+        return removed
@@ -0,0 +1,203 @@
+import heapq
+import json
+import logging
+import os
+import tempfile
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .exceptions import ConfigError
+from .fileutil import atomic_write
+from .json_stream import iter_encode, iter_object_items
+
+logger = logging.getLogger(__name__)
+
+# Максимальное число сортированных серий, сливаемых за один проход
+_MAX_FAN_IN = 64
+# Вид операции merge join'а -> раздел delta.json
+_KINDS = {'add': "additions", 'del': "deletions", 'upd': "updates"}
+
+
+class ExternalSorter:
+    """
+    Внешняя сортировка записей (списков JSON-совместимых значений).
+
+    Записи копятся порциями по run_size, каждая порция сортируется
+    и сбрасывается во временный файл, затем серии сливаются через heapq.merge.
+    """
+
+    def __init__(self, run_size: int, tmp_dir: str):
+        self.run_size = run_size
+        self.tmp_dir = tmp_dir
+
+    def sort(self, records: Iterable[list], key) -> Iterator[list]:
+        runs: List[str] = []
+        batch: List[list] = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.run_size:
+                runs.append(self.spill(sorted(batch, key=key)))
+                batch = []
+
+        if not runs:
+            yield from sorted(batch, key=key)
+            return
+        if batch:
+            runs.append(self.spill(sorted(batch, key=key)))
+
+        yield from self.merge(runs, key)
+
+    def merge(self, runs: List[str], key) -> Iterator[list]:
+        """Слияние отсортированных серий (при необходимости в несколько проходов)"""
+        while len(runs) > _MAX_FAN_IN:
+            group, runs = runs[:_MAX_FAN_IN], runs[_MAX_FAN_IN:]
+            runs.append(self.spill(heapq.merge(*map(self.read, group), key=key)))
+
+        yield from heapq.merge(*map(self.read, runs), key=key)
+
+    def spill(self, records: Iterable[list]) -> str:
+        """Запись серии во временный файл (одна запись на строку)"""
+        fd, path = tempfile.mkstemp(suffix='.run', dir=self.tmp_dir)
+        with open(fd, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write('\n')
+        return path
+
+    @staticmethod
+    def read(path: str) -> Iterator[list]:
+        """Чтение серии с удалением файла после исчерпания"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    yield json.loads(line)
+        finally:
+            os.unlink(path)
+
+
+def _dump_at(value: Any, level: int) -> str:
+    """json.dumps с отступом 4, сдвинутый на заданный уровень вложенности"""
+    return ''.join(iter_encode(value, level))
+
+
+def _write_items(f: TextIO, name: str, items: Iterator[str], last: bool) -> None:
+    """Запись списка delta.json в формате json.dump(indent=4)"""
+    f.write(f'    "{name}": [')
+    first = True
+    for item in items:
+        f.write('\n' if first else ',\n')
+        f.write(item)
+        first = False
+    f.write(']' if first else '\n    ]')
+    f.write('\n' if last else ',\n')
+
+
+def _operation(key: str, value: Any, from_: Any, to: Any) -> str:
+    """Элемент additions/updates в формате json.dump(indent=4)"""
+    return (
+        '        {\n'
+        f'            "key": {_dump_at(key, 3)},\n'
+        f'            "value": {_dump_at(value, 3)},\n'
+        f'            "from_": {_dump_at(from_, 3)},\n'
+        f'            "to": {_dump_at(to, 3)}\n'
+        '        }'
+    )
+
+
+class StreamingDiff:
+    """
+    Вычисление delta.json для конфигураций, не помещающихся в память.
+
+    Оба файла читаются потоково, пары сортируются по ключу внешней
+    сортировкой и сливаются merge join'ом. Найденные операции снова
+    сортируются по позиции ключа во входном файле, поэтому результат
+    совпадает с ConfigProcessor.generate_delta + save_config побайтно.
+    Пиковая память определяется run_size, а не размером конфигураций.
+    """
+
+    def __init__(self, run_size: int = 500_000, tmp_dir: Optional[str] = None):
+        self.run_size = run_size
+        self.tmp_dir = tmp_dir
+
+    def diff_files(self, original_path: str, patched_path: str, delta_path: str) -> Dict[str, int]:
+        """Записывает delta.json и возвращает число операций каждого вида"""
+        counts = {"additions": 0, "deletions": 0, "updates": 0}
+        try:
+            with tempfile.TemporaryDirectory(dir=self.tmp_dir) as work_dir, \
+                    open(original_path, 'r', encoding='utf-8') as original, \
+                    open(patched_path, 'r', encoding='utf-8') as patched:
+                sorter = ExternalSorter(self.run_size, work_dir)
+                runs: Dict[str, List[str]] = {name: [] for name in counts}
+                pending: Dict[str, List[list]] = {name: [] for name in counts}
+
+                # Операции сбрасываются на диск порциями, отсортированными по позиции
+                for op in self._merge_join(sorter, original, patched):
+                    ops = pending[_KINDS[op[0]]]
+                    ops.append(op[1:])
+                    if len(ops) >= self.run_size:
+                        runs[_KINDS[op[0]]].append(sorter.spill(sorted(ops, key=itemgetter(0))))
+                        ops.clear()
+                for name, ops in pending.items():
+                    runs[name].append(sorter.spill(sorted(ops, key=itemgetter(0))))
+
+                def ops_of(name: str) -> Iterator[list]:
+                    for op in sorter.merge(runs[name], key=itemgetter(0)):
+                        counts[name] += 1
+                        yield op
+
+                with atomic_write(delta_path) as f:
+                    f.write('{\n')
+                    _write_items(f, "additions", (
+                        _operation(key, value, None, None)
+                        for _, key, value in ops_of("additions")
+                    ), last=False)
+                    _write_items(f, "deletions", (
+                        f'        {_dump_at(key, 2)}'
+                        for _, key in ops_of("deletions")
+                    ), last=False)
+                    _write_items(f, "updates", (
+                        _operation(key, None, from_, to)
+                        for _, key, from_, to in ops_of("updates")
+                    ), last=True)
+                    f.write('}')
+        except json.JSONDecodeError as e:
+            raise ConfigError(f"Ошибка декодирования JSON: {e}") from e
+        except OSError as e:
+            raise ConfigError(f"Ошибка доступа к файлу: {e}") from e
+
+        logger.info(f"Потоковый diff: {counts}")
+        return counts
+
+    def _sorted_items(self, sorter: ExternalSorter, f: TextIO) -> Iterator[Tuple[str, int, Any]]:
+        """
+        Пары файла, отсортированные по ключу. Для повторяющихся ключей,
+        как и в json.load, берётся последнее значение и первая позиция.
+        """
+        records = ([key, pos, value] for pos, (key, value) in enumerate(iter_object_items(f)))
+        for key, group in groupby(sorter.sort(records, key=itemgetter(0, 1)), key=itemgetter(0)):
+            first = next(group)
+            last = first
+            for last in group:
+                pass
+            yield key, first[1], last[2]
+
+    def _merge_join(self, sorter: ExternalSorter, original: TextIO, patched: TextIO) -> Iterator[list]:
+        """Слияние двух отсортированных потоков в операции delta"""
+        old_items = self._sorted_items(sorter, original)
+        new_items = self._sorted_items(sorter, patched)
+        old = next(old_items, None)
+        new = next(new_items, None)
+
+        while old is not None or new is not None:
+            if new is None or (old is not None and old[0] < new[0]):
+                yield ['del', old[1], old[0]]
+                old = next(old_items, None)
+            elif old is None or new[0] < old[0]:
+                yield ['add', new[1], new[0], new[2]]
+                new = next(new_items, None)
+            else:
+                if old[2] != new[2]:
+                    yield ['upd', old[1], old[0], old[2], new[2]]
+                old = next(old_items, None)
+                new = next(new_items, None)
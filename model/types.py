@@ -1,4 +1,4 @@
-from typing import TypedDict, List, Dict, Optional
+from typing import TypedDict, List, Dict, Optional, Any
 
 
 class Parameter(TypedDict):
@@ -32,4 +32,21 @@ class Delta(TypedDict):
     updates: List[DeltaOperation]
 
 
+class MergeConflict(TypedDict):
+    """Ключ, по-разному изменённый в обеих ветках трёхстороннего слияния"""
+    key: str
+    kind: str  # Вид изменений в ветках: "update/delete", "add/add" и т.п.
+    base: Optional[str]  # Значение в базовой конфигурации (None — ключа нет)
+    ours: Optional[str]  # Значение в нашей ветке (None — ключ удалён или отсутствует)
+    theirs: Optional[str]  # Значение в чужой ветке
+
+
 ConfigDict = Dict[str, str]  # Тип для JSON-конфигов
+NestedConfig = Dict[str, Any]  # Тип для вложенных JSON-конфигов
+
+
+class MergeResult(TypedDict):
+    """Результат трёхстороннего слияния конфигураций"""
+    merged: ConfigDict  # Конфликтующие ключи сохраняют значение из base
+    delta: Delta  # Изменения merged относительно base
+    conflicts: List[MergeConflict]
@@ -0,0 +1,283 @@
+"""
+Проверка конфигураций по UML-модели.
+
+Проверяется вложенная конфигурация, повторяющая структуру config.xml
+(классы — вложенные объекты или списки объектов, атрибуты — значения).
+Плоские конфигурации параметров (input/config.json: {"paramN": "..."}),
+с которыми работают delta-стадии, с классами модели не связаны и этим
+валидатором не проверяются: для них будет сообщено об отсутствии
+корневого класса.
+"""
+import weakref
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import accumulate, chain
+from operator import methodcaller
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .exceptions import ConfigValidationError
+from .parser import MANY, ClassInfo, ModelParser
+
+UINT32_MAX = (1 << 32) - 1
+
+# Отсутствующий атрибут в пакете значений
+_MISSING = object()
+# Замена экземпляра, не являющегося объектом (о нём уже сообщено)
+_INVALID: Dict[str, Any] = {}
+
+Violation = Tuple[str, str]  # (путь JSON Pointer, описание)
+
+# Число моделей, валидаторы которых хранятся одновременно
+_COMPILED_LIMIT = 16
+
+
+def _is_uint32(value: Any) -> bool:
+    if type(value) is str:
+        return value.isdigit() and value.isascii() and int(value) <= UINT32_MAX
+    return type(value) is int and 0 <= value <= UINT32_MAX
+
+
+def _is_boolean(value: Any) -> bool:
+    return type(value) is bool or value in ('true', 'false')
+
+
+def _is_string(value: Any) -> bool:
+    return type(value) is str
+
+
+def _check_uint32(values: Sequence[Any]) -> bool:
+    """Быстрая проверка пакета: все значения — int в диапазоне uint32"""
+    return {int}.issuperset(map(type, values)) and min(values) >= 0 and max(values) <= UINT32_MAX
+
+
+def _check_types(allowed: type) -> Callable[[Sequence[Any]], bool]:
+    return lambda values: {allowed}.issuperset(map(type, values))
+
+
+# Тип атрибута -> (проверка пакета, проверка значения, описание)
+_TYPE_CHECKS: Dict[str, Tuple[Callable[[Sequence[Any]], bool], Callable[[Any], bool], str]] = {
+    'uint32': (_check_uint32, _is_uint32, "целое от 0 до 4294967295"),
+    'boolean': (_check_types(bool), _is_boolean, "логическое значение"),
+    'string': (_check_types(str), _is_string, "строка"),
+}
+
+
+class _ClassCheck:
+    """Скомпилированные проверки одного класса"""
+
+    __slots__ = ('name', 'attributes', 'children', 'known')
+
+    def __init__(self, info: ClassInfo, children: List[Tuple[str, int, int]]):
+        self.name = info.name
+        # (имя атрибута, проверка пакета, проверка значения, описание типа)
+        self.attributes = tuple(
+            (attr.name, *_TYPE_CHECKS[attr.type])
+            for attr in info.attributes
+            if attr.type in _TYPE_CHECKS
+        )
+        self.children = tuple(children)  # (класс, минимум, максимум или MANY)
+        self.known = frozenset(attr.name for attr in info.attributes) | {name for name, _, _ in children}
+
+
+def _bounds(info: ClassInfo) -> Tuple[int, int]:
+    """
+    Допустимое число экземпляров класса внутри родителя; нестандартные
+    границы кратности не ограничивают число экземпляров
+    """
+    if info.min_code is None and info.max_code is None:
+        return 1, 1
+    low = info.min_code if isinstance(info.min_code, int) and info.min_code != MANY else 0
+    high = info.max_code if isinstance(info.max_code, int) else MANY
+    return low, high
+
+
+class _Batch:
+    """
+    Экземпляры класса, полученные из одного пакета родителей. Пути
+    экземпляров не строятся заранее, а вычисляются только для нарушений:
+    owners — номера родителей экземпляров (None — по одному на родителя),
+    offsets — накопленные длины списков, если экземпляры заданы списками.
+    """
+
+    __slots__ = ('parent', 'name', 'items', 'owners', 'offsets')
+
+    def __init__(self, parent: Optional['_Level'], name: str, items: List[Any],
+                 owners: Optional[List[int]] = None, offsets: Optional[List[int]] = None):
+        self.parent = parent
+        self.name = name
+        self.items = items
+        self.owners = owners
+        self.offsets = offsets
+
+    def path(self, i: int) -> str:
+        if self.parent is None:
+            return f"/{self.name}"
+        if self.offsets is None:
+            owner = self.owners[i] if self.owners is not None else i
+            return f"{self.parent.path(owner)}/{self.name}"
+        k = bisect_right(self.offsets, i)
+        position = i - (self.offsets[k - 1] if k else 0)
+        owner = self.owners[k] if self.owners is not None else k
+        return f"{self.parent.path(owner)}/{self.name}/{position}"
+
+
+class _Level:
+    """Все экземпляры класса на одном уровне обхода"""
+
+    __slots__ = ('batches', 'items', '_ends')
+
+    def __init__(self, batches: List[_Batch]):
+        self.batches = batches
+        self.items = list(chain.from_iterable(batch.items for batch in batches))
+        self._ends = list(accumulate(len(batch.items) for batch in batches))
+
+    def path(self, i: int) -> str:
+        k = bisect_right(self._ends, i)
+        return self.batches[k].path(i - (self._ends[k - 1] if k else 0))
+
+
+class ConfigValidator:
+    """
+    Проверка вложенной конфигурации, повторяющей структуру config.xml:
+    {"BTS": {"id": 1, "MGMT": {"MetricJob": [{...}, {...}]}}}.
+
+    Проверки компилируются один раз по классам модели. Экземпляры
+    обходятся по уровням, и каждый атрибут проверяется сразу для всех
+    экземпляров класса на уровне: сначала быстрая проверка типов пакета,
+    поэлементный разбор — только для пакетов с нарушениями. Собираются
+    все нарушения, а не только первое.
+    """
+
+    # Скомпилированные валидаторы по ключу содержимого модели (не больше _COMPILED_LIMIT)
+    _compiled: Dict[str, 'ConfigValidator'] = {}
+    # Быстрый путь без хэширования: валидатор для разбора (parser.classes) экземпляра парсера
+    _by_parser: 'weakref.WeakKeyDictionary[ModelParser, Tuple[dict, ConfigValidator]]' = weakref.WeakKeyDictionary()
+
+    def __init__(self, parser: ModelParser):
+        self.root_class = parser.root_class
+        self._classes: Dict[str, _ClassCheck] = {}
+        for name, info in parser.classes.items():
+            children = [
+                (child, *_bounds(parser.classes[child]))
+                for child in parser.children.get(name, ())
+                if child in parser.classes
+            ]
+            self._classes[name] = _ClassCheck(info, children)
+
+    @classmethod
+    def for_model(cls, parser: ModelParser) -> 'ConfigValidator':
+        """
+        Валидатор модели из кэша. Ключ — хэш содержимого XML (ModelParser.content_key),
+        поэтому разные парсеры одной модели используют один валидатор
+        """
+        cached = cls._by_parser.get(parser)
+        if cached is not None and cached[0] is parser.classes:
+            return cached[1]
+        key = parser.content_key()
+        validator = cls._compiled.get(key)
+        if validator is None:
+            if len(cls._compiled) >= _COMPILED_LIMIT:
+                del cls._compiled[next(iter(cls._compiled))]
+            validator = cls._compiled[key] = cls(parser)
+        cls._by_parser[parser] = (parser.classes, validator)
+        return validator
+
+    def violations(self, config: Any) -> List[Violation]:
+        """Все нарушения конфигурации"""
+        if not isinstance(config, dict):
+            return [('', "конфигурация должна быть JSON-объектом")]
+
+        found: List[Violation] = []
+        found.extend((f"/{key}", "неизвестный класс верхнего уровня")
+                     for key in config if key != self.root_class)
+        if self.root_class not in config:
+            found.append((f"/{self.root_class}", "отсутствует корневой класс"))
+            return found
+
+        levels = {self.root_class: [_Batch(None, self.root_class, [config[self.root_class]])]}
+        while levels:
+            next_levels: Dict[str, List[_Batch]] = defaultdict(list)
+            for class_name, batches in levels.items():
+                self._check_level(self._classes[class_name], _Level(batches), found, next_levels)
+            levels = next_levels
+        return found
+
+    def validate(self, config: Any) -> None:
+        """Проверка с исключением ConfigValidationError при нарушениях"""
+        found = self.violations(config)
+        if found:
+            preview = '; '.join(f"{path}: {message}" for path, message in found[:5])
+            more = f" (и ещё {len(found) - 5})" if len(found) > 5 else ''
+            raise ConfigValidationError(f"Нарушений в конфигурации: {len(found)}: {preview}{more}", found)
+
+    @staticmethod
+    def _check_level(check: _ClassCheck, level: _Level, found: List[Violation],
+                     next_levels: Dict[str, List[_Batch]]) -> None:
+        """Пакетная проверка всех экземпляров класса одного уровня"""
+        objects = level.items
+        if not {dict}.issuperset(map(type, objects)):
+            for i, instance in enumerate(objects):
+                if type(instance) is not dict:
+                    found.append((level.path(i), f"экземпляр класса {check.name} должен быть JSON-объектом"))
+                    objects[i] = _INVALID
+
+        if not all(map(check.known.issuperset, objects)):
+            for i, instance in enumerate(objects):
+                found.extend((f"{level.path(i)}/{key}", "неизвестный параметр")
+                             for key in instance if key not in check.known)
+
+        for name, batch_ok, value_ok, description in check.attributes:
+            values = list(map(methodcaller('get', name, _MISSING), objects))
+            if not values or batch_ok(values):
+                continue
+            for i, value in enumerate(values):
+                if objects[i] is _INVALID:
+                    continue
+                if value is _MISSING:
+                    found.append((f"{level.path(i)}/{name}", "отсутствует атрибут"))
+                elif not value_ok(value):
+                    found.append((f"{level.path(i)}/{name}", f"ожидается {description}, получено {value!r}"))
+
+        for child, low, high in check.children:
+            values = list(map(methodcaller('get', child, _MISSING), objects))
+            types = set(map(type, values))
+            if types == {dict}:
+                counts = None
+                next_levels[child].append(_Batch(level, child, values))
+            elif types == {list}:
+                counts = list(map(len, values))
+                next_levels[child].append(
+                    _Batch(level, child, list(chain.from_iterable(values)), offsets=list(accumulate(counts))))
+            else:
+                counts = []
+                singles, single_owners, lists, list_owners = [], [], [], []
+                for i, value in enumerate(values):
+                    if isinstance(value, list):
+                        lists.append(value)
+                        list_owners.append(i)
+                        counts.append(len(value))
+                    elif value is _MISSING:
+                        counts.append(0)
+                    else:
+                        singles.append(value)
+                        single_owners.append(i)
+                        counts.append(1)
+                if singles:
+                    next_levels[child].append(_Batch(level, child, singles, owners=single_owners))
+                if lists:
+                    next_levels[child].append(_Batch(
+                        level, child, list(chain.from_iterable(lists)),
+                        owners=list_owners, offsets=list(accumulate(map(len, lists)))))
+
+            # Все экземпляры по одному — проверяется одно значение кратности
+            if counts is None:
+                if low <= 1 and (high == MANY or high >= 1):
+                    continue
+                counts = [1] * len(values)
+            elif not counts or (min(counts) >= low and (high == MANY or max(counts) <= high)):
+                continue
+            limit = '*' if high == MANY else high
+            for i, count in enumerate(counts):
+                if objects[i] is not _INVALID and (count < low or (high != MANY and count > high)):
+                    found.append((f"{level.path(i)}/{child}",
+                                  f"число экземпляров {count} вне кратности {low}..{limit}"))
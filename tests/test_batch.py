@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from model.batch import discover_items, run_batch, summarize
+from model.config_processor import ConfigProcessor
+from model.exceptions import ConfigError
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        self.sites = self.root / 'sites'
+
+        for i in range(4):
+            site = self.sites / f"bts{i}"
+            site.mkdir(parents=True)
+            ConfigProcessor.save_config({"id": str(i), "old": "x"}, str(site / 'config.json'))
+            ConfigProcessor.save_config({"id": str(i * 10), "new": "y"}, str(site / 'patched_config.json'))
+
+        # Станция с повреждённой конфигурацией
+        (self.sites / 'bts2' / 'patched_config.json').write_text('{broken', encoding='utf-8')
+
+    def test_directory_batch(self):
+        items = discover_items(self.sites, self.root / 'out')
+        self.assertEqual([item.name for item in items], ['bts0', 'bts1', 'bts2', 'bts3'])
+
+        results = run_batch(items, workers=2, chunksize=1)
+
+        self.assertEqual([r.ok for r in results], [True, True, False, True])
+        self.assertIn("Ошибка конфигурации", results[2].error)
+        result_path = self.root / 'out' / 'bts3' / 'res_patched_config.json'
+        self.assertEqual(ConfigProcessor.load_config(str(result_path)), {"id": "30", "new": "y"})
+        self.assertTrue((self.root / 'out' / 'bts3' / 'delta.json').exists())
+
+        summary = summarize(results, elapsed=1.0)
+        self.assertIn("с ошибками: 1", summary)
+        self.assertIn("bts2", summary)
+
+    def test_manifest_batch(self):
+        manifest = self.root / 'pairs.json'
+        manifest.write_text(json.dumps([
+            {"name": "a", "config": "sites/bts0/config.json",
+             "patched_config": "sites/bts1/patched_config.json"},
+        ]), encoding='utf-8')
+
+        results = run_batch(discover_items(manifest, self.root / 'out'), workers=1)
+        self.assertTrue(results[0].ok)
+        self.assertEqual(results[0].operations, 3)
+        self.assertTrue(os.path.exists(self.root / 'out' / 'a' / 'delta.json'))
+
+    def test_manifest_names_checked(self):
+        manifest = self.root / 'pairs.json'
+        pair = {"config": "sites/bts0/config.json", "patched_config": "sites/bts1/patched_config.json"}
+        for names in (["../escaped"], ["a/b"], [".."], ["a", "a"]):
+            with self.subTest(names=names):
+                manifest.write_text(json.dumps([dict(pair, name=name) for name in names]), encoding='utf-8')
+                with self.assertRaises(ConfigError):
+                    discover_items(manifest, self.root / 'out')
+
+    def test_unexpected_error_does_not_abort_batch(self):
+        items = discover_items(self.sites, self.root / 'out')
+        original = ConfigProcessor.generate_delta
+
+        def generate_delta(a, b, *args, **kwargs):
+            if a["id"] == "1":
+                raise TypeError("неожиданный тип")
+            return original(a, b, *args, **kwargs)
+
+        with mock.patch.object(ConfigProcessor, 'generate_delta', staticmethod(generate_delta)):
+            results = run_batch(items, workers=1)
+        self.assertEqual([r.ok for r in results], [True, False, False, True])
+        self.assertIn("TypeError", results[1].error)
+        self.assertTrue(all(r.seconds > 0 for r in results))
@@ -0,0 +1,99 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import main
+
+ROOT = Path(__file__).resolve().parent.parent
+TEST_DATA = Path(__file__).parent / 'test_data'
+
+
+class TestCommandLine(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.dir = Path(temp_dir.name)
+        self.config = self.dir / 'config.json'
+        self.patched = self.dir / 'patched.json'
+        shutil.copy(TEST_DATA / 'config_original.json', self.config)
+        shutil.copy(TEST_DATA / 'config_patched.json', self.patched)
+
+    def _run(self, *args, code="import sys, main; sys.exit(main.main(sys.argv[1:]))"):
+        # Отдельный интерпретатор: проверяются импорты, app.log пишется во временный каталог
+        env = dict(os.environ, PYTHONPATH=str(ROOT))
+        return subprocess.run([sys.executable, '-c', code, *map(str, args)],
+                              cwd=self.dir, env=env, capture_output=True, text=True)
+
+    def test_delta_and_apply(self):
+        out = self.dir / 'out'
+        proc = self._run('--output-dir', out, 'delta', '--config', self.config, '--patched-config', self.patched)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        with open(out / 'res_patched_config.json', encoding='utf-8') as f:
+            expected = json.load(f)
+        self.assertFalse((out / 'config.xml').exists())
+
+        result = self.dir / 'applied.json'
+        proc = self._run('apply', '--config', self.config, '--delta', out / 'delta.json', '--result', result)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        with open(result, encoding='utf-8') as f:
+            self.assertEqual(json.load(f), expected)
+
+    def test_model_only(self):
+        meta = self.dir / 'meta.json'
+        proc = self._run('--output-dir', self.dir / 'out', 'model',
+                         '--xml', TEST_DATA / 'model.xml', '--meta', meta)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertTrue(meta.exists())
+        self.assertTrue((self.dir / 'out' / 'config.xml').exists())
+        self.assertFalse((self.dir / 'out' / 'delta.json').exists())
+
+    def test_missing_input(self):
+        proc = self._run('delta', '--config', self.dir / 'absent.json', '--patched-config', self.patched)
+        self.assertEqual(proc.returncode, 1)
+        self.assertIn('absent.json', proc.stderr)
+
+    def test_delta_does_not_import_model_parser(self):
+        code = (
+            "import sys, main\n"
+            "code = main.main(sys.argv[1:])\n"
+            "heavy = [m for m in sys.modules\n"
+            "         if m.startswith(('xml.etree', 'model.parser', 'multiprocessing', 'argparse', 'gzip'))]\n"
+            "print(heavy)\n"
+            "sys.exit(code)"
+        )
+        proc = self._run('--output-dir', self.dir / 'out', 'delta',
+                         '--config', self.config, '--patched-config', self.patched, code=code)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stdout.strip(), '[]')
+
+
+class TestArguments(unittest.TestCase):
+    def test_fast_parse_matches_argparse(self):
+        cases = [
+            [],
+            ['run'],
+            ['--output-dir', 'out', 'delta', '--config', 'a.json', '--patched-config', 'b.json'],
+            ['--input-dir', 'in', 'apply', '--delta', 'd.json', '--result', 'r.json', '--delta', 'e.json'],
+            ['model', '--xml', 'a.xml', 'b.xml', '--meta', 'meta.json'],
+        ]
+        for argv in cases:
+            with self.subTest(argv=argv):
+                expected = vars(main.build_arg_parser().parse_args(argv))
+                self.assertEqual(vars(main.parse_args_fast(argv)), expected)
+                self.assertEqual(vars(main.parse_args(argv)), expected)
+
+    def test_unusual_arguments_go_to_argparse(self):
+        for argv in (['-h'], ['delta', '--config'], ['delta', '--config=a.json'],
+                     ['delta', '--conf', 'a.json'], ['delta', 'extra'], ['run', '--xml', 'a.xml']):
+            with self.subTest(argv=argv):
+                self.assertIsNone(main.parse_args_fast(argv))
+        self.assertEqual(main.parse_args(['delta', '--config=a.json']).config, Path('a.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
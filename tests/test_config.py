@@ -1,10 +1,13 @@
 import unittest
 import os
+import shutil
 import tempfile
 from pathlib import Path
+from unittest import mock
 
-from main import ensure_dirs
+from main import ensure_dirs, run_stages
 from model.config import AppConfig
+from model.manifest import BuildManifest
 
 
 class TestAppConfig(unittest.TestCase):
@@ -62,6 +65,21 @@ class TestAppConfig(unittest.TestCase):
         # Теперь проверяем, что файлы есть
         self.assertTrue(AppConfig.validate_input_files())
 
+    def test_glob_input_paths(self):
+        """Модель из нескольких файлов задаётся шаблоном glob"""
+        self.addCleanup(AppConfig._INPUT_MAPPING.__setitem__, 'xml', AppConfig._INPUT_MAPPING['xml'])
+        AppConfig._INPUT_MAPPING['xml'] = 'model/*.xml'
+        self.assertEqual(AppConfig.get_input_paths('xml'), [])
+
+        shard_dir = AppConfig.INPUT_DIR / 'model'
+        shard_dir.mkdir()
+        for name in ('hwe.xml', 'bts.xml', 'notes.txt'):
+            (shard_dir / name).touch()
+        expected = [shard_dir / 'bts.xml', shard_dir / 'hwe.xml']
+        self.assertEqual(AppConfig.get_input_paths('xml'), expected)
+        self.assertEqual(AppConfig.get_stage_paths('model')[0], expected)
+        self.assertEqual(AppConfig.get_input_paths('config'), [AppConfig.get_input_path('config')])
+
     def test_ensure_dirs(self):
         """Тест создания директорий"""
         # Удаляем директории если существуют
@@ -77,3 +95,63 @@ class TestAppConfig(unittest.TestCase):
 
         # Проверяем повторный вызов (должен работать с exist_ok=True)
         ensure_dirs()  # Не должно вызывать ошибок
+
+    def test_run_stages(self):
+        """Тест параллельного выполнения стадий и пропуска актуальных"""
+        test_data = Path(__file__).parent / 'test_data'
+        shutil.copy(test_data / 'model.xml', AppConfig.get_input_path('xml'))
+        shutil.copy(test_data / 'config_original.json', AppConfig.get_input_path('config'))
+        shutil.copy(test_data / 'config_patched.json', AppConfig.get_input_path('patched_config'))
+        self.addCleanup(setattr, AppConfig, 'CACHE_DIR', AppConfig.CACHE_DIR)
+        AppConfig.CACHE_DIR = Path(self.temp_dir.name) / '.cache'
+
+        run_stages(BuildManifest.load(AppConfig.get_manifest_path()))
+        for file_type in ('config', 'meta', 'delta', 'result'):
+            self.assertTrue(AppConfig.get_output_path(file_type).exists())
+
+        # Изменилась только модель: стадия delta не перезапускается
+        with open(AppConfig.get_input_path('xml'), 'a', encoding='utf-8') as f:
+            f.write('\n')
+        delta_mtime = AppConfig.get_output_path('delta').stat().st_mtime_ns
+        manifest = BuildManifest.load(AppConfig.get_manifest_path())
+        self.assertFalse(manifest.is_stale('delta', *AppConfig.get_stage_paths('delta')))
+        self.assertTrue(manifest.is_stale('model', *AppConfig.get_stage_paths('model')))
+
+        # Одна устаревшая стадия выполняется без пула процессов
+        with mock.patch('concurrent.futures.ProcessPoolExecutor') as pool:
+            run_stages(manifest)
+        pool.assert_not_called()
+        self.assertEqual(AppConfig.get_output_path('delta').stat().st_mtime_ns, delta_mtime)
+
+        # Всё актуально — ни одна стадия не запускается
+        with mock.patch('concurrent.futures.ProcessPoolExecutor') as pool, \
+                mock.patch('main.execute_stage') as execute:
+            run_stages(BuildManifest.load(AppConfig.get_manifest_path()))
+        pool.assert_not_called()
+        execute.assert_not_called()
+
+    def test_run_stages_errors(self):
+        """Тест: ошибки всех стадий логируются, пробрасывается ошибка model"""
+        from concurrent.futures import ThreadPoolExecutor
+        import time
+
+        test_data = Path(__file__).parent / 'test_data'
+        shutil.copy(test_data / 'model.xml', AppConfig.get_input_path('xml'))
+        shutil.copy(test_data / 'config_original.json', AppConfig.get_input_path('config'))
+        shutil.copy(test_data / 'config_patched.json', AppConfig.get_input_path('patched_config'))
+        self.addCleanup(setattr, AppConfig, 'CACHE_DIR', AppConfig.CACHE_DIR)
+        AppConfig.CACHE_DIR = Path(self.temp_dir.name) / '.cache'
+
+        def fail(stage, *args):
+            # model завершается последней, чтобы порядок as_completed не совпал с PIPELINE
+            if stage == 'model':
+                time.sleep(0.05)
+            raise RuntimeError(f"сбой {stage}")
+
+        with mock.patch('concurrent.futures.ProcessPoolExecutor', ThreadPoolExecutor), \
+                mock.patch('main.execute_stage', side_effect=fail), \
+                self.assertLogs(level='ERROR') as logs:
+            with self.assertRaisesRegex(RuntimeError, 'сбой model'):
+                run_stages(BuildManifest.load(AppConfig.get_manifest_path()))
+        self.assertEqual(len(logs.records), 2)
+        self.assertTrue(any('сбой delta' in line for line in logs.output))
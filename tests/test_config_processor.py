@@ -1,7 +1,9 @@
 import os
 import unittest
+import random
 import tempfile
 from model.config_processor import ConfigProcessor
+from model.exceptions import ConfigValidationError
 
 
 class TestConfigProcessor(unittest.TestCase):
@@ -44,3 +46,341 @@ class TestConfigProcessor(unittest.TestCase):
         }
         result = self.processor.apply_delta(original, delta)
         self.assertEqual(result, {"a": 10, "c": 3})
+
+
+class TestNestedDelta(unittest.TestCase):
+    def setUp(self):
+        self.processor = ConfigProcessor()
+        self.original = {
+            "BTS": {
+                "id": 1,
+                "MGMT": {"jobs": [1, 2], "name": "mgmt"},
+                "HWE": {"RU": {"id": 7, "ip": "10.0.0.1"}},
+            },
+            "a/b": {"~x": 1},
+            "removed": True,
+        }
+        self.patched = {
+            "BTS": {
+                "id": 1,
+                "MGMT": {"jobs": [1, 2, 3], "name": "mgmt"},
+                "HWE": {"RU": {"id": 7, "ip": "10.0.0.2", "port": 80}},
+            },
+            "a/b": {"~x": 2},
+            "added": {"nested": {}},
+        }
+
+    def test_generate_nested_delta(self):
+        delta = self.processor.generate_nested_delta(self.original, self.patched)
+
+        self.assertEqual(delta["deletions"], ["/removed"])
+        self.assertEqual(
+            sorted(op["key"] for op in delta["additions"]),
+            ["/BTS/HWE/RU/port", "/added"]
+        )
+        updates = {op["key"]: (op["from_"], op["to"]) for op in delta["updates"]}
+        self.assertEqual(updates, {
+            "/BTS/MGMT/jobs": ([1, 2], [1, 2, 3]),
+            "/BTS/HWE/RU/ip": ("10.0.0.1", "10.0.0.2"),
+            "/a~1b/~0x": (1, 2),
+        })
+
+    def test_apply_nested_delta(self):
+        delta = self.processor.generate_nested_delta(self.original, self.patched)
+        result = self.processor.apply_nested_delta(self.original, delta)
+
+        self.assertEqual(result, self.patched)
+        # Исходная конфигурация не меняется, нетронутые поддеревья переиспользуются
+        self.assertEqual(self.original["BTS"]["HWE"]["RU"]["ip"], "10.0.0.1")
+        self.assertIs(result["BTS"]["MGMT"]["jobs"], self.patched["BTS"]["MGMT"]["jobs"])
+        self.assertIsNot(result["BTS"], self.original["BTS"])
+
+    def test_identical_configs(self):
+        delta = self.processor.generate_nested_delta(self.original, self.original)
+        self.assertEqual(delta, {"additions": [], "deletions": [], "updates": []})
+
+    def test_subtrees_not_compared_whole(self):
+        class Node(dict):
+            def __eq__(self, other):
+                raise AssertionError("поддерево сравнивается целиком")
+
+            __ne__ = __eq__
+
+        def chain(depth, leaf):
+            node = Node(value=leaf)
+            for i in range(depth):
+                node = Node(level=str(i), child=node)
+            return node
+
+        delta = self.processor.generate_nested_delta(chain(50, "old"), chain(50, "new"))
+        self.assertEqual(len(delta["updates"]), 1)
+        self.assertEqual(delta["updates"][0]["key"], "/child" * 50 + "/value")
+
+
+class TestDeltaOverlay(unittest.TestCase):
+    def setUp(self):
+        self.processor = ConfigProcessor()
+        self.original = {"a": "1", "b": "2", "c": "3", "d": {"x": [1, 2]}}
+        self.delta = {
+            "additions": [{"key": "e", "value": "5"}],
+            "deletions": ["b", "c"],
+            # "c" удалён и снова задан — как и в dict, он переезжает в конец
+            "updates": [{"key": "a", "to": "10"}, {"key": "c", "to": "30"}]
+        }
+
+    def test_matches_apply_delta(self):
+        expected = self.processor.apply_delta(self.original, self.delta)
+        overlay = self.processor.apply_delta_lazy(self.original, self.delta)
+
+        self.assertEqual(list(overlay.items()), list(expected.items()))
+        self.assertEqual(len(overlay), len(expected))
+        self.assertNotIn("b", overlay)
+        self.assertEqual(overlay.get("b", "missing"), "missing")
+        self.assertEqual(overlay["d"], {"x": [1, 2]})
+        # Исходная конфигурация не изменилась
+        self.assertEqual(self.original["a"], "1")
+
+    def test_in_place(self):
+        expected = self.processor.apply_delta(self.original, self.delta)
+        original = dict(self.original)
+        result = self.processor.apply_delta(original, self.delta, in_place=True)
+
+        self.assertIs(result, original)
+        self.assertEqual(list(result.items()), list(expected.items()))
+
+    def test_save_overlay(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            expected_path = os.path.join(tmp_dir, 'expected.json')
+            overlay_path = os.path.join(tmp_dir, 'overlay.json')
+            self.processor.save_config(
+                self.processor.apply_delta(self.original, self.delta), expected_path
+            )
+            self.processor.save_config(
+                self.processor.apply_delta_lazy(self.original, self.delta), overlay_path
+            )
+
+            with open(expected_path, encoding='utf-8') as f1, open(overlay_path, encoding='utf-8') as f2:
+                self.assertEqual(f2.read(), f1.read())
+
+    def test_empty_overlay(self):
+        delta = {"additions": [], "deletions": ["a"], "updates": []}
+        overlay = self.processor.apply_delta_lazy({"a": "1"}, delta)
+        self.assertEqual(len(overlay), 0)
+        self.assertEqual(dict(overlay), {})
+
+
+class TestCompactDelta(unittest.TestCase):
+    def setUp(self):
+        self.processor = ConfigProcessor()
+        self.original = {"a": "1", "b": "2", "c": {"nested": [1, 2]}}
+        self.patched = {"a": "10", "c": {"nested": [1, 2]}, "d": None, "e": "строка\nс переводом"}
+        self.delta = self.processor.generate_delta(self.original, self.patched)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def test_round_trip(self):
+        for name in ('delta.jsonl', 'delta.jsonl.gz'):
+            path = os.path.join(self.temp_dir.name, name)
+            count = self.processor.save_delta_compact(self.delta, path)
+            self.assertEqual(count, 4)
+            self.assertEqual(self.processor.load_delta_compact(path), self.delta)
+
+    def test_apply_stream(self):
+        path = os.path.join(self.temp_dir.name, 'delta.jsonl.gz')
+        self.processor.save_delta_compact(self.delta, path)
+
+        result = self.processor.apply_delta_stream(self.original, path)
+        self.assertEqual(result, self.processor.apply_delta(self.original, self.delta))
+        self.assertEqual(result, self.patched)
+        self.assertIn("b", self.original)
+
+    def test_smaller_than_delta_json(self):
+        compact_path = os.path.join(self.temp_dir.name, 'delta.jsonl')
+        json_path = os.path.join(self.temp_dir.name, 'delta.json')
+        self.processor.save_delta_compact(self.delta, compact_path)
+        self.processor.save_config(self.delta, json_path)
+        self.assertLess(os.path.getsize(compact_path) * 3, os.path.getsize(json_path))
+
+    def test_unknown_operation(self):
+        path = os.path.join(self.temp_dir.name, 'bad.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('["?", "a"]\n')
+        with self.assertRaises(ConfigValidationError):
+            self.processor.load_delta_compact(path)
+
+
+class TestComposeDeltas(unittest.TestCase):
+    def setUp(self):
+        self.processor = ConfigProcessor()
+
+    @staticmethod
+    def _mutate(config, rnd):
+        # Случайные удаления, изменения, добавления и возвраты старых ключей
+        result = {}
+        for key, value in config.items():
+            roll = rnd.random()
+            if roll < 0.15:
+                continue
+            result[key] = str(rnd.randint(0, 5)) if roll < 0.4 else value
+        for _ in range(rnd.randint(0, 4)):
+            result[f"k{rnd.randint(0, 30)}"] = str(rnd.randint(0, 5))
+        return result
+
+    def _chain(self, seed, length):
+        rnd = random.Random(seed)
+        configs = [{f"k{i}": str(rnd.randint(0, 5)) for i in range(20)}]
+        for _ in range(length):
+            configs.append(self._mutate(configs[-1], rnd))
+        deltas = [
+            self.processor.generate_delta(a, b)
+            for a, b in zip(configs, configs[1:])
+        ]
+        return configs, deltas
+
+    def test_squashed_equals_chain(self):
+        for seed in range(200):
+            configs, deltas = self._chain(seed, length=random.Random(seed).randint(1, 8))
+            base, expected = configs[0], configs[-1]
+
+            replayed = base
+            for delta in deltas:
+                replayed = self.processor.apply_delta(replayed, delta)
+            self.assertEqual(replayed, expected)
+
+            squashed = self.processor.compose_deltas(deltas)
+            self.assertEqual(self.processor.apply_delta(base, squashed), expected, seed)
+
+            exact = self.processor.compose_deltas(deltas, original=base)
+            self.assertEqual(self.processor.apply_delta(base, exact), expected, seed)
+            # С исходной конфигурацией результат минимален
+            direct = self.processor.generate_delta(base, expected)
+            self.assertEqual(
+                sorted(u["key"] for u in exact["updates"]),
+                sorted(u["key"] for u in direct["updates"]),
+                seed
+            )
+            self.assertEqual(sorted(exact["deletions"]), sorted(direct["deletions"]), seed)
+
+    def test_invert(self):
+        for seed in range(100):
+            configs, deltas = self._chain(seed, length=3)
+            base, patched = configs[0], configs[-1]
+            squashed = self.processor.compose_deltas(deltas, original=base)
+
+            inverse = self.processor.invert_delta(squashed, base)
+            self.assertEqual(self.processor.apply_delta(patched, inverse), base, seed)
+
+    def test_invert_without_original(self):
+        # Без original delete-then-add становится update с неизвестным from_
+        base = {"a": "1", "b": "2"}
+        deltas = [
+            {"additions": [], "deletions": ["a"], "updates": []},
+            {"additions": [{"key": "a", "value": "2"}, {"key": "b", "value": "3"}, {"key": "c", "value": "4"}],
+             "deletions": [], "updates": []},
+        ]
+        squashed = self.processor.compose_deltas(deltas)
+        patched = self.processor.apply_delta(base, squashed)
+        self.assertEqual(patched, {"a": "2", "b": "3", "c": "4"})
+
+        inverse = self.processor.invert_delta(squashed, base)
+        self.assertEqual(self.processor.apply_delta(patched, inverse), base)
+
+    def test_invert_deletion_of_missing_key(self):
+        # Удаление отсутствующего ключа apply_delta пропускает, обратная delta — тоже
+        base = {"a": "1"}
+        deltas = [
+            {"additions": [{"key": "b", "value": "2"}], "deletions": [], "updates": []},
+            {"additions": [], "deletions": ["b", "c"], "updates": []},
+        ]
+        squashed = self.processor.compose_deltas(deltas)
+        patched = self.processor.apply_delta(base, squashed)
+
+        inverse = self.processor.invert_delta(squashed, base)
+        self.assertEqual(inverse["additions"], [])
+        self.assertEqual(self.processor.apply_delta(patched, inverse), base)
+
+    def test_add_then_delete_of_existing_key(self):
+        # Добавление перезаписывает существующий ключ, удаление его убирает
+        base = {"k": "1", "x": "2"}
+        deltas = [
+            {"additions": [{"key": "k", "value": "5"}], "deletions": [], "updates": []},
+            {"additions": [], "deletions": ["k"], "updates": []},
+        ]
+        squashed = self.processor.compose_deltas(deltas)
+        self.assertEqual(squashed["deletions"], ["k"])
+        self.assertEqual(self.processor.apply_delta(base, squashed), {"x": "2"})
+
+        exact = self.processor.compose_deltas(deltas, original={"x": "2"})
+        self.assertEqual(exact["deletions"], [])
+
+    def test_edge_cases(self):
+        base = {"a": "1", "b": "2"}
+        deltas = [
+            {"additions": [{"key": "c", "value": "3"}], "deletions": ["a"], "updates": [{"key": "b", "from_": "2", "to": "5"}]},
+            {"additions": [{"key": "a", "value": "7"}], "deletions": ["c"], "updates": [{"key": "b", "from_": "5", "to": "6"}]},
+        ]
+        squashed = self.processor.compose_deltas(deltas)
+
+        # add-then-delete без original остаётся удалением,
+        # delete-then-add и update-then-update становятся update
+        self.assertEqual(squashed["additions"], [])
+        self.assertEqual(squashed["deletions"], ["c"])
+        self.assertEqual(
+            {u["key"]: u["to"] for u in squashed["updates"]},
+            {"a": "7", "b": "6"}
+        )
+        self.assertEqual(self.processor.apply_delta(base, squashed), {"a": "7", "b": "6"})
+
+
+class TestMerge3(unittest.TestCase):
+    def setUp(self):
+        self.processor = ConfigProcessor()
+
+    def test_non_overlapping_changes(self):
+        base = {"a": "1", "b": "2", "c": "3", "d": "4"}
+        ours = {"a": "10", "b": "2", "d": "4", "x": "new"}
+        theirs = {"a": "1", "b": "20", "c": "3", "y": "other"}
+
+        result = self.processor.merge3(base, ours, theirs)
+        expected = {"a": "10", "b": "20", "x": "new", "y": "other"}
+        self.assertEqual(result["merged"], expected)
+        self.assertEqual(result["conflicts"], [])
+        self.assertEqual(self.processor.apply_delta(base, result["delta"]), expected)
+        self.assertEqual(base["c"], "3")
+
+    def test_conflicts(self):
+        base = {"a": "1", "b": "2", "c": "3", "same": "0"}
+        ours = {"a": "10", "b": "20", "n": "x", "same": "5"}
+        theirs = {"a": "11", "c": "30", "n": "y", "same": "5"}
+
+        result = self.processor.merge3(base, ours, theirs)
+        conflicts = {c["key"]: c for c in result["conflicts"]}
+        self.assertEqual(sorted(conflicts), ["a", "b", "c", "n"])
+        self.assertEqual(conflicts["a"]["kind"], "update/update")
+        self.assertEqual(conflicts["b"]["kind"], "update/delete")
+        self.assertEqual(conflicts["c"]["kind"], "delete/update")
+        self.assertEqual((conflicts["n"]["kind"], conflicts["n"]["ours"], conflicts["n"]["theirs"]),
+                         ("add/add", "x", "y"))
+        # Конфликтующие ключи остаются как в base, одинаковые изменения применяются
+        self.assertEqual(result["merged"], {"a": "1", "b": "2", "c": "3", "same": "5"})
+
+    def test_random_against_sequential_apply(self):
+        for seed in range(200):
+            rnd = random.Random(seed)
+            base = {f"k{i}": str(rnd.randint(0, 3)) for i in range(30)}
+            ours = TestComposeDeltas._mutate(base, rnd)
+            theirs = TestComposeDeltas._mutate(base, rnd)
+
+            result = self.processor.merge3(base, ours, theirs)
+            self.assertEqual(self.processor.apply_delta(base, result["delta"]), result["merged"], seed)
+            conflicted = {c["key"] for c in result["conflicts"]}
+            for key in set(base) | set(ours) | set(theirs):
+                if key in conflicted:
+                    continue
+                # Без конфликта результат совпадает с изменившейся веткой
+                ours_changed = (key in ours, ours.get(key)) != (key in base, base.get(key))
+                source = ours if ours_changed else theirs
+                self.assertEqual(result["merged"].get(key), source.get(key), (seed, key))
+
+            in_place = self.processor.merge3(dict(base), ours, theirs, in_place=True)
+            self.assertEqual(in_place["merged"], result["merged"])
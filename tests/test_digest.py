@@ -0,0 +1,101 @@
+import os
+import random
+import tempfile
+import unittest
+
+from model.config_processor import ConfigProcessor
+from model.digest import ConfigDigest
+
+
+class TestConfigDigest(unittest.TestCase):
+    def setUp(self):
+        rnd = random.Random(0)
+        self.golden = {f"param{i}": str(rnd.randint(0, 100)) for i in range(2000)}
+        self.site = dict(self.golden)
+        self.site["param5"] = "changed"
+        del self.site["param7"]
+        self.site["extra"] = "1"
+
+    def test_identical_configs(self):
+        a = ConfigDigest.from_config(self.golden, buckets=256)
+        # Порядок ключей не влияет на дайджест
+        b = ConfigDigest.from_config(dict(reversed(list(self.golden.items()))), buckets=256)
+        self.assertEqual(a, b)
+        self.assertEqual(a.diff_buckets(b), [])
+
+    def test_differing_buckets(self):
+        golden = ConfigDigest.from_config(self.golden, buckets=256)
+        site = ConfigDigest.from_config(self.site, buckets=256)
+        expected = sorted({golden.bucket(k) for k in ("param5", "param7", "extra")})
+        self.assertEqual(sorted(golden.diff_buckets(site)), expected)
+
+    def test_generate_delta_on_buckets(self):
+        digests = (ConfigDigest.from_config(self.golden), ConfigDigest.from_config(self.site))
+        # Порядок ключей в delta по корзинам следует порядку корзин
+        normalized = lambda d: {kind: sorted(map(str, ops)) for kind, ops in d.items()}
+        self.assertEqual(
+            normalized(ConfigProcessor.generate_delta(self.golden, self.site, digests=digests)),
+            normalized(ConfigProcessor.generate_delta(self.golden, self.site))
+        )
+        same = (digests[0], ConfigDigest.from_config(self.golden))
+        delta = ConfigProcessor.generate_delta(self.golden, dict(self.golden), digests=same)
+        self.assertEqual(delta, {"additions": [], "deletions": [], "updates": []})
+
+    def test_incremental_update(self):
+        digest = ConfigDigest.from_config(self.golden, buckets=64)
+        delta = ConfigProcessor.generate_delta(self.golden, self.site)
+        result = ConfigProcessor.apply_delta(self.golden, delta, digest=digest)
+        self.assertEqual(result, self.site)
+        self.assertEqual(digest, ConfigDigest.from_config(self.site, buckets=64))
+
+    def test_select_reads_only_wanted_buckets(self):
+        class NoScan(dict):
+            def __iter__(self):
+                raise AssertionError("обход всей конфигурации")
+
+            items = keys = values = __iter__
+
+        digest = ConfigDigest.from_config(self.golden, buckets=256)
+        bucket = digest.bucket("param5")
+        selected = digest.select(NoScan(self.golden), [bucket])
+        self.assertIn("param5", selected)
+        self.assertEqual(selected, {k: v for k, v in self.golden.items() if digest.bucket(k) == bucket})
+
+    def test_delete_and_add_in_one_delta(self):
+        original = {"a": "1", "b": "2"}
+        delta = {"deletions": ["a"], "additions": [{"key": "a", "value": "3"}],
+                 "updates": [{"key": "b", "from_": "2", "to": "4"}, {"key": "b", "from_": "4", "to": "5"}]}
+        digest = ConfigDigest.from_config(original, buckets=16)
+        result = ConfigProcessor.apply_delta(original, delta, digest=digest)
+        self.assertEqual(result, {"a": "3", "b": "5"})
+        self.assertEqual(digest, ConfigDigest.from_config(result, buckets=16))
+        self.assertEqual(digest.keys, 2)
+
+    def test_equal_numbers_hash_equally(self):
+        # generate_delta считает 1, 1.0 и True равными — дайджест тоже
+        a = ConfigDigest.from_config({"x": 1, "y": [True, {"z": 2.0}]}, buckets=16)
+        b = ConfigDigest.from_config({"x": 1.0, "y": [1, {"z": 2}]}, buckets=16)
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, ConfigDigest.from_config({"x": 1.5, "y": [1, {"z": 2}]}, buckets=16))
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'config.json')
+            ConfigProcessor.save_config(self.golden, path)
+            self.assertIsNone(ConfigDigest.load_for(path))
+
+            digest = ConfigDigest.from_config(self.golden, buckets=128)
+            digest.save_for(path)
+            loaded = ConfigDigest.load_for(path)
+            self.assertEqual(loaded, digest)
+            # Индекс корзин загруженного дайджеста строится по конфигурации
+            bucket = digest.bucket("param5")
+            self.assertEqual(loaded.select(self.golden, [bucket]), digest.select(self.golden, [bucket]))
+
+            # Изменённая после записи дайджеста конфигурация делает его устаревшим
+            ConfigProcessor.save_config(self.site, path)
+            self.assertIsNone(ConfigDigest.load_for(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
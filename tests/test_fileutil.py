@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+from model.fileutil import atomic_write
+
+
+class TestAtomicWrite(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, 'out.json')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('old')
+
+    def test_replaces_file(self):
+        with atomic_write(self.path) as f:
+            f.write('new')
+            # До завершения записи читатели видят старый файл
+            with open(self.path, encoding='utf-8') as current:
+                self.assertEqual(current.read(), 'old')
+
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'new')
+        self.assertEqual(os.listdir(self.temp_dir.name), ['out.json'])
+
+    def test_error_keeps_old_file(self):
+        with self.assertRaises(RuntimeError):
+            with atomic_write(self.path) as f:
+                f.write('partial')
+                raise RuntimeError("сбой во время записи")
+
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'old')
+        self.assertEqual(os.listdir(self.temp_dir.name), ['out.json'])
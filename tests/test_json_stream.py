@@ -0,0 +1,84 @@
+import io
+import json
+import random
+import tracemalloc
+import unittest
+from unittest import mock
+
+from model import json_stream
+
+
+def random_value(rng: random.Random, depth: int = 0):
+    """Случайное JSON-значение с вложенными объектами и списками"""
+    roll = rng.random()
+    if depth > 3 or roll < 0.4:
+        return rng.choice([0, -7, 2.5, float('inf'), True, False, None, "", "строка", "q\"\\\n\t"])
+    if roll < 0.7:
+        return {f"k{i}": random_value(rng, depth + 1) for i in range(rng.randint(0, 6))}
+    return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 6))]
+
+
+class TestJsonStream(unittest.TestCase):
+    def _dump(self, value, **kwargs) -> str:
+        f = io.StringIO()
+        json_stream.dump(value, f, **kwargs)
+        return f.getvalue()
+
+    def test_matches_json_dump(self):
+        rng = random.Random(0)
+        values = [random_value(rng) for _ in range(500)]
+        values += [{}, [], {"a": {}}, [[]], {1: "a", None: "b", 2.5: "c"}, {"t": (1, (2, 3))}]
+
+        # Маленькие порции проверяют переходы между ними
+        for chunk in (json_stream._CHUNK, 2):
+            with mock.patch.object(json_stream, '_CHUNK', chunk):
+                for value in values:
+                    self.assertEqual(self._dump(value), json.dumps(value, indent=4, ensure_ascii=False))
+                    self.assertEqual(self._dump(value, compact=True),
+                                     json.dumps(value, separators=(',', ':'), ensure_ascii=False))
+
+    def test_records_with_brackets_in_strings(self):
+        # Списки плоских контейнеров кодируются целиком и переразмечаются по скобкам
+        values = [
+            [{"a": "},", "b": "{"}, ["]", "[", "},\n    {"], {"c": "x"}],
+            {"parameters": [{"name": "}{", "type": "class"}, {"name": 1, "type": None}], "min": "0"},
+            [[1], [2, "]"], {"k": "v"}, {}],
+            [{"a": 1}, [], {"b": [1]}],
+        ]
+        for value in values:
+            self.assertEqual(self._dump(value), json.dumps(value, indent=4, ensure_ascii=False))
+            self.assertEqual(''.join(json_stream.iter_encode(value, 1)),
+                             json.dumps(value, indent=4, ensure_ascii=False).replace('\n', '\n    '))
+
+    def test_nested_level(self):
+        value = {"a": [1, {"b": None}]}
+        expected = json.dumps(value, indent=4, ensure_ascii=False).replace('\n', '\n' + '    ' * 2)
+        self.assertEqual(''.join(json_stream.iter_encode(value, 2)), expected)
+
+    def test_large_object_is_written_in_parts(self):
+        config = {f"param{i}": str(i) for i in range(20_000)}
+        f = io.StringIO()
+        with mock.patch.object(f, 'write', wraps=f.write) as write:
+            json_stream.dump(config, f, buffer_size=1 << 12)
+        self.assertGreater(write.call_count, 1)
+        self.assertEqual(f.getvalue(), json.dumps(config, indent=4, ensure_ascii=False))
+
+    def test_peak_memory_bounded(self):
+        # Пиковая память записи не зависит от размера конфигурации
+        config = {f"param{i}": str(i) for i in range(100_000)}
+
+        class Sink:
+            def write(self, text):
+                pass
+
+        tracemalloc.start()
+        try:
+            json_stream.dump(config, Sink())
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 256 << 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
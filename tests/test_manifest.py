@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from model.manifest import BuildManifest
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        self.input = self.root / 'config.json'
+        self.output = self.root / 'delta.json'
+        self.input.write_text('{"a": 1}', encoding='utf-8')
+        self.output.write_text('{}', encoding='utf-8')
+        self.manifest_path = self.root / '.manifest.json'
+
+    def _recorded(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.record('delta', [self.input], [self.output])
+        manifest.save()
+        return BuildManifest.load(self.manifest_path)
+
+    def test_unknown_stage_is_stale(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertTrue(manifest.is_stale('delta', [self.input], [self.output]))
+
+    def test_unchanged_stage_is_fresh(self):
+        manifest = self._recorded()
+        self.assertFalse(manifest.is_stale('delta', [self.input], [self.output]))
+
+    def test_changed_input(self):
+        manifest = self._recorded()
+        self.input.write_text('{"a": 2}', encoding='utf-8')
+        self.assertTrue(manifest.is_stale('delta', [self.input], [self.output]))
+
+    def test_missing_or_changed_output(self):
+        manifest = self._recorded()
+        self.output.write_text('{"edited": true}', encoding='utf-8')
+        self.assertTrue(manifest.is_stale('delta', [self.input], [self.output]))
+
+        os.unlink(self.output)
+        self.assertTrue(manifest.is_stale('delta', [self.input], [self.output]))
+
+    def test_unchanged_file_is_not_rehashed(self):
+        manifest = self._recorded()
+        # Подменяем хэш в кэше: при неизменных размере и mtime файл не перечитывается
+        manifest.files[str(self.input)][2] = 'cached'
+        self.assertEqual(manifest.file_hash(self.input), 'cached')
+
+    def test_corrupted_manifest(self):
+        self.manifest_path.write_text('not json', encoding='utf-8')
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.stages, {})
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from model.config_processor import ConfigProcessor
+from model.metrics import instrumented, metrics
+from model.parser import ModelParser
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(metrics.records.clear)
+        self.addCleanup(metrics.configure, False)
+        self.was_tracing = tracemalloc.is_tracing()
+        self.addCleanup(self._stop_tracing)
+        self.data_dir = os.path.join(os.path.dirname(__file__), 'test_data')
+
+    def _stop_tracing(self):
+        if not self.was_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def test_disabled_records_nothing(self):
+        metrics.configure(False)
+        ConfigProcessor.generate_delta({"a": 1}, {"a": 2})
+        with metrics.stage("stage:test") as record:
+            record.counts["items"] = 1
+        self.assertEqual(metrics.records, [])
+
+    def test_public_methods_are_recorded(self):
+        metrics.configure(True)
+        parser = ModelParser(os.path.join(self.data_dir, 'sample.xml'))
+        with metrics.stage("stage:model"):
+            parser.parse()
+            parser.generate_meta_json()
+            ConfigProcessor.generate_delta({"a": 1, "b": 2}, {"a": 2, "c": 3})
+
+        by_name = {r["name"]: r for r in metrics.records}
+        self.assertEqual(by_name["ModelParser.parse"]["counts"]["classes"], len(parser.classes))
+        self.assertEqual(by_name["ConfigProcessor.generate_delta"]["counts"],
+                         {"additions": 1, "deletions": 1, "updates": 1})
+        self.assertEqual(by_name["ModelParser.parse"]["depth"], 1)
+
+        stage = by_name["stage:model"]
+        self.assertEqual(stage["depth"], 0)
+        self.assertEqual(metrics.records[-1], stage)
+        self.assertGreaterEqual(stage["wall_seconds"], by_name["ModelParser.parse"]["wall_seconds"])
+        self.assertGreaterEqual(stage["peak_bytes"], by_name["ModelParser.parse"]["peak_bytes"])
+
+    def test_counts_accept_keyword_arguments(self):
+        @instrumented("test.total", lambda r, items, *a, **k: {"items": len(items)})
+        def total(values, scale=1):
+            return sum(values) * scale
+
+        metrics.configure(True, trace_memory=False)
+        self.assertEqual(total(values=[1, 2, 3], scale=2), 12)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ConfigProcessor.save_config(file_path=os.path.join(temp_dir, 'c.json'), config={"a": 1, "b": 2})
+
+        by_name = {r["name"]: r for r in metrics.records}
+        self.assertEqual(by_name["test.total"]["counts"], {"items": 3})
+        self.assertEqual(by_name["ConfigProcessor.save_config"]["counts"], {"keys": 2})
+
+    def test_profile_dump(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            metrics.configure(True, trace_memory=False, profile_dir=temp_dir)
+            with metrics.stage("stage:delta", profile=True):
+                ConfigProcessor.generate_delta({"a": 1}, {"a": 2})
+            self.assertTrue(os.path.exists(os.path.join(temp_dir, 'stage_delta.prof')))
+            self.assertIsNone(metrics.records[-1]["peak_bytes"])
+
+    def test_take_since(self):
+        metrics.configure(True, trace_memory=False)
+        with metrics.stage("first"):
+            pass
+        start = len(metrics.records)
+        with metrics.stage("second"):
+            pass
+        self.assertEqual([r["name"] for r in metrics.take_since(start)], ["second"])
+        self.assertEqual([r["name"] for r in metrics.records], ["first"])
+
+
+if __name__ == '__main__':
+    unittest.main()
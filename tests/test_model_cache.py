@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from model.model_cache import ModelCache
+from model.parser import ModelParser
+
+
+class TestModelCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.xml_path = os.path.join(self.temp_dir.name, 'model.xml')
+        shutil.copy(os.path.join(os.path.dirname(__file__), 'test_data', 'model.xml'), self.xml_path)
+        self.cache = ModelCache(Path(self.temp_dir.name) / 'cache')
+
+    def test_warm_start_skips_xml_parsing(self):
+        cold = ModelParser(self.xml_path)
+        cold.parse(cache=self.cache)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+
+        warm = ModelParser(self.xml_path)
+        with mock.patch('model.parser.ET.parse', side_effect=AssertionError("XML разбирается повторно")):
+            warm.parse(cache=self.cache)
+
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(warm.classes, cold.classes)
+        self.assertEqual(warm.generate_config_xml(), cold.generate_config_xml())
+        self.assertEqual(warm.generate_meta_json(), cold.generate_meta_json())
+
+    def test_changed_model_invalidates(self):
+        ModelParser(self.xml_path).parse(cache=self.cache)
+        with open(self.xml_path, 'a', encoding='utf-8') as f:
+            f.write('\n')
+
+        ModelParser(self.xml_path).parse(cache=self.cache)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_corrupted_entry(self):
+        ModelParser(self.xml_path).parse(cache=self.cache)
+        for path in self.cache.cache_dir.glob('*.pickle'):
+            path.write_bytes(b'not a pickle')
+
+        parser = ModelParser(self.xml_path)
+        parser.parse(cache=self.cache)
+        self.assertEqual(parser.root_class, "BTS")
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_evict_by_size(self):
+        self.cache.put('a' * 64, list(range(100)))
+        self.cache.put('b' * 64, list(range(100)))
+        old_path = self.cache.cache_dir / ('a' * 64 + '.pickle')
+        os.utime(old_path, (0, 1))
+        entry_size = old_path.stat().st_size
+
+        # Вытесняется самая старая запись
+        ModelCache(self.cache.cache_dir, max_bytes=entry_size, max_age=float('inf')).evict()
+        self.assertEqual([p.name for p in self.cache.cache_dir.glob('*.pickle')], ['b' * 64 + '.pickle'])
+
+    def test_evict_by_age(self):
+        cache = ModelCache(self.cache.cache_dir, max_age=-1)
+        cache.put('a' * 64, [1])
+        self.assertEqual(list(cache.cache_dir.glob('*.pickle')), [])
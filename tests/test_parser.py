@@ -1,7 +1,10 @@
+import io
+import re
 import unittest
 import tempfile
 import os
-from model.parser import ModelParser
+from unittest import mock
+from model.parser import MANY, ClassInfo, ModelParser
 from model.exceptions import InvalidXMLError, NoRootClassError
 
 
@@ -62,6 +65,105 @@ class TestModelParser(unittest.TestCase):
             if os.path.exists(tmp_path):
                 os.unlink(tmp_path)
 
+    def test_meta_order_follows_aggregations(self):
+        # Порядок классов выводится из графа агрегаций: дочерние раньше родителей
+        xml_path = os.path.join(os.path.dirname(__file__), 'test_data', 'model.xml')
+        parser = ModelParser(xml_path)
+        parser.parse()
+
+        self.assertEqual(
+            [c["class"] for c in parser.generate_meta_json()],
+            ["MetricJob", "CPLANE", "MGMT", "RU", "HWE", "COMM", "BTS"]
+        )
+        self.assertEqual(parser.children["BTS"], ["MGMT", "HWE", "COMM"])
+        self.assertEqual(parser.parents["RU"], ["HWE"])
+
+    def test_config_xml_matches_reference(self):
+        xml_path = os.path.join(os.path.dirname(__file__), 'test_data', 'model.xml')
+        parser = ModelParser(xml_path)
+        parser.parse()
+
+        expected = "\n".join([
+            "<BTS>",
+            "    <id>uint32</id>",
+            "    <name>string</name>",
+            "    <MGMT>",
+            "        <MetricJob>",
+            "            <isFinished>boolean</isFinished>",
+            "            <jobId>uint32</jobId>",
+            "        </MetricJob>",
+            "        <CPLANE>",
+            "        </CPLANE>",
+            "    </MGMT>",
+            "    <HWE>",
+            "        <RU>",
+            "            <hwRevision>string</hwRevision>",
+            "            <id>uint32</id>",
+            "            <ipv4Address>string</ipv4Address>",
+            "            <manufacturerName>string</manufacturerName>",
+            "        </RU>",
+            "    </HWE>",
+            "    <COMM>",
+            "    </COMM>",
+            "</BTS>",
+        ])
+        self.assertEqual(parser.generate_config_xml(), expected)
+
+        buffer = io.StringIO()
+        parser.write_config_xml(buffer)
+        self.assertEqual(buffer.getvalue(), expected)
+
+    def test_deep_hierarchy(self):
+        # Глубина иерархии больше лимита рекурсии Python
+        depth = 3000
+        lines = ['<XMI>', '<Class name="C0" isRoot="true"/>']
+        for i in range(1, depth):
+            lines.append(f'<Class name="C{i}"/>')
+            lines.append(f'<Aggregation source="C{i}" target="C{i - 1}"/>')
+        lines.append('</XMI>')
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False) as tmp:
+            tmp.write('\n'.join(lines))
+        self.addCleanup(os.unlink, tmp.name)
+
+        parser = ModelParser(tmp.name)
+        parser.parse()
+        xml_content = parser.generate_config_xml()
+        self.assertEqual(xml_content.count('\n'), 2 * depth - 1)
+        self.assertTrue(xml_content.endswith('</C0>'))
+
+
+class TestModelParserExpansion(unittest.TestCase):
+    def setUp(self):
+        xml_path = os.path.join(os.path.dirname(__file__), 'test_data', 'model.xml')
+        self.parser = ModelParser(xml_path)
+        self.parser.parse()
+
+    def test_expand_to_max_multiplicity(self):
+        xml_content = self.parser.generate_config_xml(expand=True)
+        self.assertEqual(xml_content.count("<RU>"), 42)
+        self.assertEqual(xml_content.count("<MetricJob>"), 100)
+        self.assertEqual(xml_content.count("<CPLANE>"), 1)
+        self.assertEqual(xml_content.count("<BTS>"), 1)
+
+    def test_explicit_counts(self):
+        xml_content = self.parser.generate_config_xml(counts={"RU": 3, "MetricJob": 0})
+        self.assertEqual(xml_content.count("<RU>"), 3)
+        self.assertNotIn("<MetricJob>", xml_content)
+        self.assertIn("        <RU>\n            <hwRevision>", xml_content)
+
+    def test_memoized_matches_streamed(self):
+        # Без кэша поддеревьев результат должен совпадать побайтно
+        counts = {"HWE": 3, "RU": 5, "MetricJob": 2}
+        cached = self.parser.generate_config_xml(counts=counts)
+        with mock.patch('model.parser._SUBTREE_CACHE_LIMIT', 0):
+            streamed = self.parser.generate_config_xml(counts=counts)
+        self.assertEqual(cached, streamed)
+        self.assertEqual(cached.count("<RU>"), 15)
+        # Сдвинутые блоки сверх бюджета не кэшируются, но выводятся так же
+        with mock.patch('model.parser._SUBTREE_CACHE_BUDGET', 1):
+            self.assertEqual(self.parser.generate_config_xml(counts=counts), cached)
+
 
 class TestModelParserEdgeCases(unittest.TestCase):
     def test_invalid_xml(self):
@@ -96,3 +198,185 @@ class TestModelParserEdgeCases(unittest.TestCase):
         finally:
             if os.path.exists(tmp_path):
                 os.unlink(tmp_path)
+
+
+class TestModelParserStreaming(unittest.TestCase):
+    def _write_tmp(self, content):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False) as tmp:
+            tmp.write(content)
+        self.addCleanup(os.unlink, tmp.name)
+        return tmp.name
+
+    def test_streaming_matches_full_parse(self):
+        xml_path = os.path.join(os.path.dirname(__file__), 'test_data', 'sample.xml')
+
+        full = ModelParser(xml_path)
+        full.parse()
+        streamed = ModelParser(xml_path)
+        streamed.parse(streaming=True)
+
+        self.assertEqual(streamed.classes, full.classes)
+        self.assertEqual(streamed.aggregations, full.aggregations)
+        self.assertEqual(streamed.root_class, full.root_class)
+        self.assertEqual(streamed.generate_config_xml(), full.generate_config_xml())
+
+    def test_aggregation_before_class(self):
+        # Агрегация объявлена раньше своего класса-источника
+        tmp_path = self._write_tmp('''<?xml version="1.0"?>
+        <XMI>
+            <Aggregation source="RU" target="BTS" sourceMultiplicity="0..42"/>
+            <Class name="BTS" isRoot="true"/>
+            <Class name="RU">
+                <Attribute name="id" type="uint32"/>
+            </Class>
+        </XMI>''')
+
+        for streaming in (False, True):
+            parser = ModelParser(tmp_path)
+            parser.parse(streaming=streaming)
+            self.assertEqual(parser.classes["RU"].min_multiplicity, "0")
+            self.assertEqual(parser.classes["RU"].max_multiplicity, "42")
+
+    def test_reparse_resets_state(self):
+        first = self._write_tmp("""<?xml version="1.0"?>
+        <XMI>
+            <Aggregation source="RU" target="BTS" sourceMultiplicity="0..42"/>
+            <Class name="BTS" isRoot="true"/>
+            <Class name="HWE"/>
+            <Aggregation source="HWE" target="BTS"/>
+        </XMI>""")
+        second = self._write_tmp("""<?xml version="1.0"?>
+        <XMI>
+            <Class name="BTS" isRoot="true"/>
+            <Class name="RU"/>
+        </XMI>""")
+
+        parser = ModelParser(first)
+        parser.parse()
+        parser.xml_file = second
+        parser.parse()
+        # Кратность RU из первого файла не переносится, классы не смешиваются
+        self.assertEqual(set(parser.classes), {"BTS", "RU"})
+        self.assertIsNone(parser.classes["RU"].max_multiplicity)
+        self.assertEqual(parser.aggregations, [])
+
+    def test_compact_representation(self):
+        tmp_path = self._write_tmp('''<?xml version="1.0"?>
+        <XMI>
+            <Class name="BTS" isRoot="true">
+                <Attribute name="id" type="uint32"/>
+            </Class>
+            <Class name="RU">
+                <Attribute name="id" type="uint32"/>
+            </Class>
+            <Class name="HWE"/>
+            <Aggregation source="RU" target="BTS" sourceMultiplicity="1..*"/>
+            <Aggregation source="HWE" target="BTS" sourceMultiplicity="0..n"/>
+        </XMI>''')
+
+        parser = ModelParser(tmp_path)
+        parser.parse()
+        ru, hwe = parser.classes["RU"], parser.classes["HWE"]
+        # Одинаковые атрибуты разных классов — один объект
+        self.assertIs(ru.attributes[0], parser.classes["BTS"].attributes[0])
+        self.assertEqual((ru.min_code, ru.max_code), (1, MANY))
+        self.assertEqual((ru.min_multiplicity, ru.max_multiplicity), ("1", "*"))
+        # Нестандартная кратность выводится без изменений
+        self.assertEqual(hwe.max_multiplicity, "n")
+        self.assertFalse(hasattr(ru, '__dict__'))
+
+    def test_unicode_digit_multiplicity(self):
+        tmp_path = self._write_tmp('''<?xml version="1.0"?>
+        <XMI>
+            <Class name="BTS" isRoot="true"/>
+            <Class name="RU"/>
+            <Aggregation source="RU" target="BTS" sourceMultiplicity="0..²"/>
+        </XMI>''')
+
+        parser = ModelParser(tmp_path)
+        parser.parse()
+        # '²' — не число, граница сохраняется строкой без изменений
+        self.assertEqual(parser.classes["RU"].max_code, "²")
+        self.assertEqual(parser.classes["RU"].max_multiplicity, "²")
+        # При развёртке по кратности нечисловая граница даёт один экземпляр
+        self.assertEqual(parser.generate_config_xml(expand=True).count("<RU>"), 1)
+
+    def test_class_info_constructor(self):
+        # Кратности по-прежнему передаются строками
+        info = ClassInfo('A', False, '', [], min_multiplicity='0', max_multiplicity='*')
+        self.assertEqual((info.min_code, info.max_code), (0, MANY))
+        self.assertEqual((info.min_multiplicity, info.max_multiplicity), ('0', '*'))
+        self.assertEqual(info.attributes, ())
+        self.assertEqual(ClassInfo('A', False, '', [], '1', '7').max_multiplicity, '7')
+
+    def test_streaming_invalid_xml(self):
+        tmp_path = self._write_tmp("<invalid><unclosed>")
+        with self.assertRaises(InvalidXMLError):
+            ModelParser(tmp_path).parse(streaming=True)
+
+
+class TestModelParserShards(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.dir = temp_dir.name
+
+    def _write_shards(self, *bodies):
+        paths = []
+        for i, body in enumerate(bodies):
+            path = os.path.join(self.dir, f"shard{i}.xml")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f'<?xml version="1.0"?>\n<XMI>\n{body}\n</XMI>')
+            paths.append(path)
+        return paths
+
+    def test_shards_match_single_file(self):
+        xml_path = os.path.join(os.path.dirname(__file__), 'test_data', 'model.xml')
+        with open(xml_path, encoding='utf-8') as f:
+            text = f.read()
+        classes = {re.search(r'name="(\w+)"', c).group(1): c for c in re.findall(r'<Class .*?</Class>', text, re.S)}
+        aggregations = re.findall(r'<Aggregation .*?/>', text)
+
+        # Подсистема в отдельном файле: её классы и агрегации к ним
+        def shard(*names):
+            return '\n'.join([classes[name] for name in names] + [
+                agg for agg in aggregations
+                if re.search(r'target="(\w+)"', agg).group(1) in names
+            ])
+
+        bts = shard('BTS', 'COMM')
+        mgmt = shard('MGMT', 'MetricJob', 'CPLANE')
+        hwe = shard('HWE', 'RU')
+
+        full = ModelParser(xml_path)
+        full.parse()
+        for streaming in (False, True):
+            sharded = ModelParser(self._write_shards(bts, mgmt, hwe))
+            sharded.parse(streaming=streaming, max_workers=2)
+            self.assertEqual(sharded.classes, full.classes)
+            self.assertEqual(sharded.root_class, "BTS")
+            self.assertEqual(sharded.generate_meta_json(), full.generate_meta_json())
+            self.assertEqual(sharded.generate_config_xml(), full.generate_config_xml())
+
+    def test_multiplicity_across_shards(self):
+        paths = self._write_shards(
+            '<Aggregation source="RU" target="BTS" sourceMultiplicity="0..42"/>',
+            '<Class name="BTS" isRoot="true"/><Class name="RU"/>'
+        )
+        parser = ModelParser(paths)
+        parser.parse()
+        self.assertEqual(parser.classes["RU"].max_multiplicity, "42")
+
+    def test_merge_errors(self):
+        cases = {
+            "дубликат класса": ('<Class name="BTS" isRoot="true"/><Class name="RU"/>', '<Class name="RU"/>'),
+            "висячая агрегация": ('<Class name="BTS" isRoot="true"/>', '<Aggregation source="RU" target="BTS"/>'),
+            "два корня": ('<Class name="BTS" isRoot="true"/>', '<Class name="NB" isRoot="true"/>'),
+            "ошибка XML": ('<Class name="BTS" isRoot="true"/>', '<Class name="RU">'),
+        }
+        for case, bodies in cases.items():
+            with self.subTest(case), self.assertRaises(InvalidXMLError):
+                ModelParser(self._write_shards(*bodies)).parse()
+
+        with self.assertRaises(NoRootClassError):
+            ModelParser(self._write_shards('<Class name="BTS"/>', '<Class name="RU"/>')).parse()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+from model.exceptions import CyclicAggregationError
+from model.parser import ModelParser
+from model.query import find_cycle
+
+
+class TestModelIndex(unittest.TestCase):
+    def setUp(self):
+        data_dir = os.path.join(os.path.dirname(__file__), 'test_data')
+        self.parser = ModelParser(os.path.join(data_dir, 'model.xml'))
+        self.parser.parse()
+        self.query = self.parser.query
+
+    def _parse(self, xml: str) -> ModelParser:
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False) as tmp:
+            tmp.write(xml)
+        self.addCleanup(os.unlink, tmp.name)
+        parser = ModelParser(tmp.name)
+        parser.parse()
+        return parser
+
+    def test_parent_and_children(self):
+        self.assertEqual(self.query.parent('RU'), 'HWE')
+        self.assertIsNone(self.query.parent('BTS'))
+        self.assertEqual(self.query.children('MGMT'), ['MetricJob', 'CPLANE'])
+        self.assertEqual(self.query.children('RU'), [])
+
+    def test_root_path(self):
+        self.assertEqual(self.query.root_path('RU'), ['RU', 'HWE', 'BTS'])
+        self.assertEqual(self.query.root_path('BTS'), ['BTS'])
+        self.assertEqual(self.query.depth['MetricJob'], 2)
+
+    def test_subtree(self):
+        self.assertEqual(sorted(self.query.subtree('MGMT')), ['CPLANE', 'MGMT', 'MetricJob'])
+        self.assertEqual(sorted(self.query.subtree('BTS')), sorted(self.parser.classes))
+        self.assertTrue(self.query.is_descendant('MGMT', 'CPLANE'))
+        self.assertTrue(self.query.is_descendant('BTS', 'RU'))
+        self.assertFalse(self.query.is_descendant('MGMT', 'RU'))
+        self.assertFalse(self.query.is_descendant('RU', 'BTS'))
+
+    def test_attribute_lookup(self):
+        self.assertEqual(self.query.classes_with_attribute('id', 'uint32'), ['BTS', 'RU'])
+        self.assertIn('MetricJob', self.query.classes_with_attribute(type='boolean'))
+        self.assertEqual(self.query.classes_with_attribute('ipv4Address'), ['RU'])
+        self.assertEqual(self.query.classes_with_attribute('missing'), [])
+
+    def test_multiple_parents(self):
+        parser = self._parse("""<XMI>
+            <Class name="Root" isRoot="true"/>
+            <Class name="A"/>
+            <Class name="B"/>
+            <Class name="Shared"/>
+            <Class name="Leaf"/>
+            <Aggregation source="A" target="Root"/>
+            <Aggregation source="B" target="Root"/>
+            <Aggregation source="Shared" target="A"/>
+            <Aggregation source="Shared" target="B"/>
+            <Aggregation source="Leaf" target="Shared"/>
+        </XMI>""")
+        query = parser.query
+        self.assertEqual(query.parents('Shared'), ['A', 'B'])
+        self.assertTrue(query.is_descendant('A', 'Leaf'))
+        self.assertTrue(query.is_descendant('B', 'Leaf'))
+        self.assertEqual(sorted(query.subtree('B')), ['B', 'Leaf', 'Shared'])
+
+    def test_cycle_detected(self):
+        with self.assertRaises(CyclicAggregationError):
+            self._parse("""<XMI>
+                <Class name="Root" isRoot="true"/>
+                <Class name="A"/>
+                <Class name="B"/>
+                <Aggregation source="A" target="Root"/>
+                <Aggregation source="B" target="A"/>
+                <Aggregation source="A" target="B"/>
+            </XMI>""")
+
+    def test_find_cycle(self):
+        self.assertIsNone(find_cycle({'a': ['b', 'c'], 'b': ['c']}))
+        self.assertEqual(find_cycle({'a': ['b'], 'b': ['c'], 'c': ['b']}), ['b', 'c', 'b'])
+        self.assertEqual(find_cycle({'a': ['a']}), ['a', 'a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
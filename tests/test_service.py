@@ -0,0 +1,139 @@
+import asyncio
+import os
+import pickle
+import shutil
+import socket
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from model.config_processor import ConfigProcessor
+from model.exceptions import ConfigError
+from model.parser import ModelParser
+from model.service import ModelHolder, ModelService, ServiceClient, server_address
+
+
+class TestModelService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        data_dir = os.path.join(os.path.dirname(__file__), 'test_data')
+        self.xml_path = os.path.join(self.temp_dir.name, 'model.xml')
+        shutil.copy(os.path.join(data_dir, 'sample.xml'), self.xml_path)
+        self.model_xml = os.path.join(data_dir, 'model.xml')
+
+        executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(executor.shutdown)
+        self.service = ModelService(ModelHolder(self.xml_path), executor, inline_limit=2)
+        self.server = await self.service.start(os.path.join(self.temp_dir.name, 'service.sock'))
+        self.address = server_address(self.server)
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def _requests(self, *requests):
+        with ServiceClient(self.address) as client:
+            return [client.request(op, **payload) for op, payload in requests]
+
+    async def test_delta_roundtrip(self):
+        original = {"a": 1, "b": 2, "c": 3}
+        patched = {"a": 1, "b": 5, "d": 4}
+        delta, = await asyncio.to_thread(
+            self._requests, ('generate_delta', {"original": original, "patched": patched}))
+        self.assertEqual(delta, ConfigProcessor.generate_delta(original, patched))
+
+        result, = await asyncio.to_thread(
+            self._requests, ('apply_delta', {"original": original, "delta": delta}))
+        self.assertEqual(result, patched)
+
+    async def test_render_and_reload(self):
+        expected = ModelParser(self.xml_path)
+        expected.parse()
+        xml, = await asyncio.to_thread(self._requests, ('render_config', {}))
+        self.assertEqual(xml, expected.generate_config_xml())
+
+        # Замена модели подхватывается следующим запросом
+        shutil.copy(self.model_xml, self.xml_path)
+        os.utime(self.xml_path, ns=(time.time_ns(), time.time_ns() + 10**9))
+        expected = ModelParser(self.model_xml)
+        expected.parse()
+        xml, = await asyncio.to_thread(self._requests, ('render_config', {}))
+        self.assertEqual(xml, expected.generate_config_xml())
+        self.assertEqual(self.service.holder.reloads, 2)
+
+    async def test_touch_without_change_does_not_reload(self):
+        os.utime(self.xml_path, ns=(time.time_ns(), time.time_ns() + 10**9))
+        await asyncio.to_thread(self._requests, ('render_config', {}))
+        self.assertEqual(self.service.holder.reloads, 1)
+
+    async def test_errors(self):
+        def run():
+            with ServiceClient(self.address) as client:
+                with self.assertRaises(ConfigError):
+                    client.request('generate_delta', original=[], patched={})
+                with self.assertRaises(ConfigError):
+                    client.request('unknown')
+                # Операция без "to" — ошибка конфигурации, а не внутренняя ошибка
+                delta = {"additions": [], "deletions": [], "updates": [{"key": "a"}]}
+                with self.assertRaisesRegex(ConfigError, "Ошибка конфигурации"):
+                    client.request('apply_delta', original={"a": 1}, delta=delta)
+                # Соединение остаётся рабочим после ошибок
+                return client.request('ping')
+
+        self.assertEqual(await asyncio.to_thread(run), "pong")
+
+    async def test_large_apply_and_render_use_executor(self):
+        calls = []
+        run = self.service._run
+
+        async def tracked(func, *args):
+            calls.append(func.__name__)
+            return await run(func, *args)
+
+        self.service._run = tracked
+        delta = ConfigProcessor.generate_delta({"a": 1, "b": 2}, {"a": 3, "c": 4})
+        result = await self.service.handle({"op": "apply_delta", "original": {"a": 1, "b": 2}, "delta": delta})
+        self.assertEqual(result["result"], {"a": 3, "c": 4})
+        await self.service.handle({"op": "render_config"})
+        self.assertEqual(calls, ["apply_delta", "_render_config"])
+
+    def test_holder_is_passed_to_processes_by_file(self):
+        holder = pickle.loads(pickle.dumps(self.service.holder))
+        self.assertIsNot(holder, self.service.holder)
+        self.assertEqual(holder.xml_file, self.xml_path)
+        self.assertIs(pickle.loads(pickle.dumps(self.service.holder)), holder)
+
+    async def test_socket_path_must_not_be_regular_file(self):
+        path = os.path.join(self.temp_dir.name, 'data.txt')
+        with open(path, 'w') as f:
+            f.write('keep')
+        with self.assertRaises(ConfigError):
+            await self.service.start(path)
+        with open(path) as f:
+            self.assertEqual(f.read(), 'keep')
+
+    async def test_stale_socket_is_replaced(self):
+        path = os.path.join(self.temp_dir.name, 'stale.sock')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(path)
+        server = await self.service.start(path)
+        server.close()
+        await server.wait_closed()
+
+    async def test_live_socket_is_kept(self):
+        with self.assertRaises(ConfigError):
+            await self.service.start(self.address)
+        self.assertEqual(await asyncio.to_thread(self._requests, ('ping', {})), ["pong"])
+
+    async def test_concurrent_clients(self):
+        def run(i):
+            return self._requests(('generate_delta', {"original": {"k": i}, "patched": {"k": i + 1}}))[0]
+
+        results = await asyncio.gather(*(asyncio.to_thread(run, i) for i in range(8)))
+        self.assertEqual([r["updates"][0]["to"] for r in results], [i + 1 for i in range(8)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from model.config_processor import ConfigProcessor
+from model.exceptions import ConfigError
+from model.snapshot_store import SnapshotStore
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name) / 'store'
+
+        rnd = random.Random(0)
+        config = {f"param{i}": str(rnd.randint(0, 9)) for i in range(200)}
+        self.history = [config]
+        for _ in range(11):
+            config = dict(config)
+            for key in rnd.sample(sorted(config), 5):
+                config[key] = str(rnd.randint(0, 9))
+            del config[rnd.choice(sorted(config))]
+            config[f"new{rnd.randint(0, 10**6)}"] = "x"
+            self.history.append(config)
+
+    def _store(self) -> SnapshotStore:
+        store = SnapshotStore(self.root, checkpoint_interval=4)
+        for config in self.history:
+            store.commit(config)
+        return store
+
+    def test_get_every_version(self):
+        self._store()
+        # Новый экземпляр читает всё с диска
+        store = SnapshotStore(self.root)
+        self.assertEqual(store.checkpoint_interval, 4)
+        self.assertEqual(store.versions(), list(range(1, 13)))
+        for version, config in enumerate(self.history, start=1):
+            self.assertEqual(store.get(version), config)
+
+    def test_checkpoints(self):
+        store = self._store()
+        checkpoints = [e["version"] for e in store.entries if e["full"]]
+        self.assertEqual(checkpoints, [1, 5, 9])
+
+    def test_diff(self):
+        store = self._store()
+        for v1, v2 in ((1, 12), (3, 7), (12, 2), (6, 6)):
+            delta = store.diff(v1, v2)
+            self.assertEqual(
+                ConfigProcessor.apply_delta(self.history[v1 - 1], delta),
+                self.history[v2 - 1], (v1, v2)
+            )
+
+    def test_forward_diff_reads_only_deltas(self):
+        store = self._store()
+        with mock.patch.object(store, 'get', wraps=store.get) as get:
+            store.diff(3, 11)
+            get.assert_not_called()
+            store.diff(11, 3)
+            get.assert_called_once_with(3)
+
+    def test_unknown_version(self):
+        store = self._store()
+        with self.assertRaises(ConfigError):
+            store.get(13)
+        with self.assertRaises(ConfigError):
+            store.get(0)
+
+    def test_malformed_index(self):
+        self._store()
+        index = self.root / SnapshotStore.INDEX
+        for content in ('[]', '{"version": 1, "checkpoint_interval": 0, "entries": []}',
+                        '{"version": 1, "checkpoint_interval": 4, "entries": {}}'):
+            with self.subTest(content=content):
+                index.write_text(content, encoding='utf-8')
+                with self.assertRaises(ConfigError):
+                    SnapshotStore(self.root)
+
+    def test_gc(self):
+        store = self._store()
+        removed = store.gc(keep_last=3)
+        self.assertGreater(removed, 0)
+        self.assertEqual(store.versions(), [10, 11, 12])
+
+        store = SnapshotStore(self.root)
+        for version in (10, 11, 12):
+            self.assertEqual(store.get(version), self.history[version - 1])
+        with self.assertRaises(ConfigError):
+            store.get(9)
+        self.assertEqual(store.commit(self.history[0]), 13)
+
+    def test_object_address_is_content_hash(self):
+        store = self._store()
+        data = json.dumps(self.history[0], separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        self.assertEqual(store.entries[0]["full"], hashlib.sha256(data).hexdigest())
+        # Временные файлы записи не остаются
+        self.assertEqual([p.name for p in (self.root / 'objects').iterdir() if p.is_file()], [])
+
+    def test_identical_objects_stored_once(self):
+        store = SnapshotStore(self.root, checkpoint_interval=1)
+        for _ in range(5):
+            store.commit(self.history[0])
+        self.assertEqual(len(list((self.root / 'objects').glob('*/*.json.gz'))), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from model.config_processor import ConfigProcessor
+from model.exceptions import ConfigError, ConfigValidationError
+from model.json_stream import iter_object_items
+
+
+class TestIterObjectItems(unittest.TestCase):
+    def test_small_chunks(self):
+        # Блоки по одному символу: значения разрезаются на границах буфера
+        data = {"a": 12345, "b": [1, {"c": "x y"}], "d": None, "e": -1.5e3, "ключ": "значение"}
+        text = json.dumps(data, indent=4, ensure_ascii=False)
+        items = list(iter_object_items(io.StringIO(text), chunk_size=1))
+        self.assertEqual(dict(items), data)
+
+    def test_numbers_split_by_buffer(self):
+        # Числа, разрезанные границей блока ('1.' | '5e3'), дочитываются целиком
+        text = '{"a": 1.5e3, "b": -2E-7}'
+        for chunk_size in range(1, 9):
+            with self.subTest(chunk_size=chunk_size):
+                items = list(iter_object_items(io.StringIO(text), chunk_size=chunk_size))
+                self.assertEqual(items, [("a", 1.5e3), ("b", -2e-7)])
+
+    def test_empty_object(self):
+        self.assertEqual(list(iter_object_items(io.StringIO(" { } "))), [])
+
+    def test_not_object(self):
+        with self.assertRaises(ConfigValidationError):
+            list(iter_object_items(io.StringIO("[1, 2]")))
+
+    def test_truncated(self):
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_object_items(io.StringIO('{"a": 1, "b": ')))
+
+
+class TestStreamingDiff(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.processor = ConfigProcessor()
+
+    def _path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def _random_pair(self, size, seed):
+        rnd = random.Random(seed)
+        original = {f"param{i}": str(rnd.randint(0, 1000)) for i in range(size)}
+        patched = {}
+        for key, value in original.items():
+            roll = rnd.random()
+            if roll < 0.2:
+                continue
+            patched[key] = str(rnd.randint(0, 1000)) if roll < 0.5 else value
+        for i in range(size // 5):
+            patched[f"added_param{i}"] = {"nested": [i, None, True]}
+        return original, patched
+
+    def _assert_matches_in_memory(self, original, patched, run_size):
+        self.processor.save_config(original, self._path('config.json'))
+        self.processor.save_config(patched, self._path('patched.json'))
+        self.processor.save_config(
+            self.processor.generate_delta(original, patched), self._path('expected.json')
+        )
+
+        counts = self.processor.generate_delta_file(
+            self._path('config.json'), self._path('patched.json'),
+            self._path('delta.json'), run_size=run_size
+        )
+
+        with open(self._path('expected.json'), encoding='utf-8') as f:
+            expected = f.read()
+        with open(self._path('delta.json'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), expected)
+        return counts
+
+    def test_matches_generate_delta(self):
+        original, patched = self._random_pair(300, seed=1)
+        counts = self._assert_matches_in_memory(original, patched, run_size=7)
+        self.assertEqual(counts["additions"], 60)
+
+    def test_float_values(self):
+        # Конфигурации больше блока чтения, числа попадают на его границы
+        rnd = random.Random(3)
+        original = {f"param{i}": rnd.uniform(-1e6, 1e6) for i in range(6000)}
+        patched = {key: value * 1.5 if rnd.random() < 0.3 else value for key, value in original.items()}
+        self._assert_matches_in_memory(original, patched, run_size=1000)
+
+    def test_multi_pass_merge(self):
+        original, patched = self._random_pair(200, seed=2)
+        with mock.patch('model.stream_diff._MAX_FAN_IN', 2):
+            self._assert_matches_in_memory(original, patched, run_size=5)
+
+    def test_empty_delta(self):
+        counts = self._assert_matches_in_memory({"a": "1"}, {"a": "1"}, run_size=10)
+        self.assertEqual(counts, {"additions": 0, "deletions": 0, "updates": 0})
+
+    def test_invalid_json(self):
+        with open(self._path('bad.json'), 'w', encoding='utf-8') as f:
+            f.write('{"a": ')
+        self.processor.save_config({"a": 1}, self._path('config.json'))
+        with self.assertRaises(ConfigError):
+            self.processor.generate_delta_file(
+                self._path('config.json'), self._path('bad.json'), self._path('delta.json')
+            )
@@ -0,0 +1,116 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from model.config_processor import ConfigProcessor
+from model.exceptions import ConfigValidationError
+from model.model_cache import ModelCache
+from model.parser import ModelParser
+from model.validator import ConfigValidator
+
+
+class TestConfigValidator(unittest.TestCase):
+    def setUp(self):
+        parser = ModelParser(os.path.join(os.path.dirname(__file__), 'test_data', 'model.xml'))
+        parser.parse()
+        self.parser = parser
+        self.validator = ConfigValidator.for_model(parser)
+        ru = {"hwRevision": "A1", "id": 7, "ipv4Address": "10.0.0.1", "manufacturerName": "Yadro"}
+        self.config = {
+            "BTS": {
+                "id": 1,
+                "name": "site",
+                "MGMT": {
+                    "MetricJob": [{"isFinished": False, "jobId": 1}, {"isFinished": "true", "jobId": "2"}],
+                },
+                "HWE": {"RU": [ru, dict(ru, id=8)]},
+                "COMM": {},
+            }
+        }
+
+    def test_valid_config(self):
+        self.assertEqual(self.validator.violations(self.config), [])
+        self.validator.validate(self.config)
+
+    def test_cached_per_model(self):
+        self.assertIs(ConfigValidator.for_model(self.parser), self.validator)
+        # Другой парсер той же модели и повторный разбор используют тот же валидатор
+        other = ModelParser(self.parser.xml_file)
+        other.parse()
+        self.assertIs(ConfigValidator.for_model(other), self.validator)
+        self.parser.parse()
+        self.assertIs(ConfigValidator.for_model(self.parser), self.validator)
+
+    def test_key_from_model_cache(self):
+        # При разборе с кэшем модели ключ не вычисляется повторно
+        with tempfile.TemporaryDirectory() as cache_dir:
+            parser = ModelParser(self.parser.xml_file)
+            parser.parse(cache=ModelCache(Path(cache_dir)))
+            with mock.patch.object(ModelCache, 'key_for') as key_for:
+                self.assertIs(ConfigValidator.for_model(parser), self.validator)
+            key_for.assert_not_called()
+
+    def test_other_model_compiled_separately(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.xml', delete=False) as tmp:
+            tmp.write('<XMI><Class name="Root" isRoot="true"/></XMI>')
+        self.addCleanup(os.unlink, tmp.name)
+        parser = ModelParser(tmp.name)
+        parser.parse()
+        validator = ConfigValidator.for_model(parser)
+        self.assertIsNot(validator, self.validator)
+        self.assertEqual(validator.root_class, "Root")
+
+    def test_flat_config_not_supported(self):
+        # Плоские конфигурации delta-стадий не соответствуют структуре модели
+        with open(os.path.join(os.path.dirname(__file__), 'test_data', 'config_original.json'),
+                  encoding='utf-8') as f:
+            flat = json.load(f)
+        violations = self.validator.violations(flat)
+        self.assertIn(("/BTS", "отсутствует корневой класс"), violations)
+
+    def test_all_violations_reported(self):
+        config = copy.deepcopy(self.config)
+        bts = config["BTS"]
+        bts["id"] = 1 << 32
+        bts["extra"] = "?"
+        bts["MGMT"]["MetricJob"][1]["isFinished"] = "maybe"
+        bts["MGMT"]["MetricJob"][0]["jobId"] = -1
+        del bts["HWE"]["RU"][1]["ipv4Address"]
+        bts["HWE"]["RU"].extend([bts["HWE"]["RU"][0]] * 41)  # 43 > 0..42
+        del bts["COMM"]
+        bts["MGMT"]["MetricJob"].append(5)
+
+        with self.assertRaises(ConfigValidationError) as ctx:
+            self.validator.validate(config)
+        paths = {path for path, _ in ctx.exception.violations}
+        self.assertEqual(paths, {
+            "/BTS/id",
+            "/BTS/extra",
+            "/BTS/MGMT/MetricJob/1/isFinished",
+            "/BTS/MGMT/MetricJob/0/jobId",
+            "/BTS/MGMT/MetricJob/2",
+            "/BTS/HWE/RU/1/ipv4Address",
+            "/BTS/HWE/RU",
+            "/BTS/COMM",
+        })
+
+    def test_load_config_with_validator(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'config.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.config, f)
+            self.assertEqual(ConfigProcessor.load_config(path, validator=self.validator), self.config)
+
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"RU": {}}, f)
+            with self.assertRaises(ConfigValidationError) as ctx:
+                ConfigProcessor.load_config(path, validator=self.validator)
+            self.assertEqual(len(ctx.exception.violations), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()